@@ -0,0 +1,184 @@
+"""
+Lecture par lots de photos d'échiquier (qualité, redressement, FEN) sur tous les cœurs.
+
+Les fichiers sont lus par des threads du processus principal pendant que les processus de
+calcul travaillent : chaque processus reçoit les octets compressés d'une photo, la décode et
+exécute toute la chaîne avec un seul AnalysisContext. Le nombre de photos en cours est borné
+(quelques-unes par processus) pour ne pas charger toute une archive en mémoire. Les résultats
+sont écrits en JSON, une ligne par photo, dans l'ordre où ils sont terminés. Une lecture
+trop peu sûre (--min-confidence) a "fen": null et l'issue "low_confidence".
+
+Exemples :
+    python batch_to_fen.py photos/ > positions.jsonl
+    python batch_to_fen.py "archives/**/*.jpg" --workers 16 --output positions.jsonl
+    find archives -name "*.jpg" | python batch_to_fen.py -
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import cv2
+import numpy as np
+
+from img_to_fen import MIN_CONFIDENCE, AdvancedChessVision, AnalysisContext, default_classifier
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp")
+TASKS_PER_WORKER = 2   # Photos en attente par processus : la suivante est déjà lue quand il termine
+READ_THREADS = 4       # Threads de lecture des fichiers
+
+_vision = None
+
+
+def iter_image_paths(sources, recursive=True):
+    """
+    Chemins des photos désignées par `sources`.
+    :param sources: Répertoires, motifs glob ("archives/**/*.jpg"), fichiers, ou "-" pour lire
+                    un chemin par ligne sur l'entrée standard.
+    :param recursive: Parcourir aussi les sous-répertoires des répertoires donnés.
+    """
+    for source in sources:
+        if source == "-":
+            for line in sys.stdin:
+                if line.strip():
+                    yield line.strip()
+        elif os.path.isdir(source):
+            for root, directories, files in os.walk(source):
+                directories.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(IMAGE_EXTENSIONS):
+                        yield os.path.join(root, name)
+                if not recursive:
+                    break
+        elif glob.has_magic(source):
+            yield from sorted(glob.iglob(source, recursive=True))
+        else:
+            yield source
+
+
+def _init_worker(min_confidence=MIN_CONFIDENCE):
+    """Prépare un processus de calcul : OpenCV sur un seul thread, classifieur chargé une fois."""
+    global _vision
+    cv2.setNumThreads(1)   # Le parallélisme vient des processus : pas de sur-souscription
+    _vision = AdvancedChessVision()
+    _vision.min_confidence = min_confidence
+    default_classifier()
+
+
+def analyze_bytes(path, data):
+    """
+    Décode une photo et lui applique toute la chaîne (exécuté dans un processus de calcul).
+    :param data: Contenu du fichier image.
+    :return: Dictionnaire sérialisable en JSON (clé "error" si la photo n'a pu être traitée).
+    """
+    global _vision
+    if _vision is None:
+        _init_worker()
+    start = time.perf_counter()
+    try:
+        decode_start = time.perf_counter()
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return {"path": path, "error": "image illisible"}
+        context = AnalysisContext(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        context.timings["decode"] = (time.perf_counter() - decode_start) * 1000
+
+        quality = _vision.evaluate_angle_quality(context)
+        corners = _vision.detect_board_corners(context)
+        result = _vision.image_to_fen(context, corners=corners)
+        return {
+            "path": path,
+            "quality": quality["quality"],
+            "score": round(float(quality["score"]), 4),
+            "issues": quality["issues"] + result["issues"],
+            "corners": None if corners is None else np.round(corners.astype(float), 1).tolist(),
+            "fen": result["fen"],
+            "confidence": round(result["mean_confidence"], 4),
+            "timings": {stage: round(ms, 2) for stage, ms in context.timings.items()},
+            "time_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+    except Exception as e:  # Une photo défectueuse ne doit pas arrêter l'archive
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+
+
+def _read_file(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def process_images(paths, workers=None, read_threads=READ_THREADS, min_confidence=MIN_CONFIDENCE):
+    """
+    Traite des photos en parallèle et produit leurs résultats au fur et à mesure.
+    Lecture des fichiers (threads) et calcul (processus) se recouvrent ; au plus
+    TASKS_PER_WORKER photos par processus sont en mémoire à la fois.
+    :param paths: Itérable de chemins (consommé au fil de l'eau).
+    :param workers: Nombre de processus (par défaut : nombre de cœurs).
+    :param min_confidence: Seuil de rejet des lectures (fen à null, issue "low_confidence").
+    :return: Générateur de dictionnaires (voir analyze_bytes), dans l'ordre de fin de traitement.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = workers * TASKS_PER_WORKER
+    paths = iter(paths)
+    with ThreadPoolExecutor(read_threads) as readers, \
+            ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(min_confidence,)) as pool:
+        reading = {}    # Lecture en cours -> chemin
+        running = set()
+
+        def fill():
+            # Garde `limit` photos en lecture ou en calcul
+            while len(reading) + len(running) < limit:
+                path = next(paths, None)
+                if path is None:
+                    return
+                reading[readers.submit(_read_file, path)] = path
+
+        fill()
+        while reading or running:
+            done, _ = wait(set(reading) | running, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in reading:
+                    path = reading.pop(future)
+                    try:
+                        running.add(pool.submit(analyze_bytes, path, future.result()))
+                    except OSError as e:
+                        yield {"path": path, "error": f"{type(e).__name__}: {e}"}
+                else:
+                    running.discard(future)
+                    yield future.result()
+            fill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lecture par lots de photos d'échiquier en FEN (JSON lines)")
+    parser.add_argument("sources", nargs="+", help="Répertoires, motifs glob, fichiers ou - (chemins sur l'entrée standard)")
+    parser.add_argument("--workers", type=int, help="Nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--output", help="Fichier de sortie (par défaut : sortie standard)")
+    parser.add_argument("--no-recursive", action="store_true", help="Ne pas parcourir les sous-répertoires")
+    parser.add_argument("--min-confidence", type=float, default=MIN_CONFIDENCE,
+                        help=f"Confiance sous laquelle la FEN est rejetée (par défaut : {MIN_CONFIDENCE})")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.perf_counter()
+    count = errors = rejected = 0
+    try:
+        for result in process_images(iter_image_paths(args.sources, not args.no_recursive), args.workers,
+                                     min_confidence=args.min_confidence):
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            count += 1
+            errors += "error" in result
+            rejected += "low_confidence" in result.get("issues", ())
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{count} photos, {errors} erreurs, {rejected} lectures rejetées en {elapsed:.1f} s ({count / elapsed:.2f} photos/s)", file=sys.stderr)
+    return 0 if errors == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
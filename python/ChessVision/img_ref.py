@@ -87,22 +87,54 @@ def add_piece(img, row, col, color, piece_type, square_size):
     # Convertir la couleur en tuple (correction du bug)
     color_tuple = tuple(color.tolist()) if hasattr(color, 'tolist') else tuple(color)
     
-    # Dessiner la pièce (cercle pour les pions, formes plus complexes pour autres)
+    # Dessiner la pièce : une silhouette différente par type, pour que chaque pièce de la
+    # position initiale puisse être reconnue (img_to_fen apprend sur cette image)
+    border = (0, 0, 0) if color[0] > 128 else (255, 255, 255)
+    size = square_size // 3
     if piece_type == 'pawn':
+        # Cercle
         cv2.circle(img, (center_x, center_y), radius, color_tuple, -1)
-        # Contour pour la visibilité
-        border_color = (0, 0, 0) if color[0] > 128 else (255, 255, 255)
-        cv2.circle(img, (center_x, center_y), radius, border_color, 2)
+        cv2.circle(img, (center_x, center_y), radius, border, 2)
     
-    elif piece_type in ['rook', 'queen', 'king']:
-        # Forme rectangulaire pour les tours
-        size = square_size // 3
+    elif piece_type == 'rook':
+        # Carré
         x1, y1 = center_x - size, center_y - size
         x2, y2 = center_x + size, center_y + size
         cv2.rectangle(img, (x1, y1), (x2, y2), color_tuple, -1)
-        cv2.rectangle(img, (x1, y1), (x2, y2), (0, 0, 0), 2)
+        cv2.rectangle(img, (x1, y1), (x2, y2), border, 2)
     
-    else:  # knight, bishop
+    elif piece_type == 'queen':
+        # Losange
+        points = np.array([
+            [center_x, center_y - size - size // 4],
+            [center_x + size + size // 4, center_y],
+            [center_x, center_y + size + size // 4],
+            [center_x - size - size // 4, center_y]
+        ])
+        cv2.fillPoly(img, [points], color_tuple)
+        cv2.polylines(img, [points], True, border, 2)
+    
+    elif piece_type == 'king':
+        # Croix
+        arm = size // 3
+        points = np.array([
+            [center_x - arm, center_y - size], [center_x + arm, center_y - size],
+            [center_x + arm, center_y - arm], [center_x + size, center_y - arm],
+            [center_x + size, center_y + arm], [center_x + arm, center_y + arm],
+            [center_x + arm, center_y + size], [center_x - arm, center_y + size],
+            [center_x - arm, center_y + arm], [center_x - size, center_y + arm],
+            [center_x - size, center_y - arm], [center_x - arm, center_y - arm]
+        ])
+        cv2.fillPoly(img, [points], color_tuple)
+        cv2.polylines(img, [points], True, border, 2)
+    
+    elif piece_type == 'bishop':
+        # Ellipse verticale
+        axes = (size // 2, size + size // 4)
+        cv2.ellipse(img, (center_x, center_y), axes, 0, 0, 360, color_tuple, -1)
+        cv2.ellipse(img, (center_x, center_y), axes, 0, 0, 360, border, 2)
+    
+    else:  # knight
         # Forme triangulaire
         points = np.array([
             [center_x, center_y - radius],
@@ -110,7 +142,7 @@ def add_piece(img, row, col, color, piece_type, square_size):
             [center_x + radius, center_y + radius]
         ])
         cv2.fillPoly(img, [points], color_tuple)
-        cv2.polylines(img, [points], True, (0, 0, 0), 2)
+        cv2.polylines(img, [points], True, border, 2)
 
 def create_simple_chessboard(save_path="simple_chessboard.jpg"):
     """Crée un échiquier simple sans pièces (pour tester la détection de base)"""
@@ -1,37 +1,416 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
 import cv2
 import numpy as np
 import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import as_strided
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(MODULE_DIR, "square_classifier.npz")        # Modèle entraîné (optionnel)
+REFERENCE_IMAGE = os.path.join(MODULE_DIR, "reference_chessboard.jpg")  # Image de img_ref.py
+START_PLACEMENT = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR"
+
+TILE_MARGIN = 0.12        # Part de chaque bord de case ignorée (lignes, débordements)
+BORDER_WIDTH = 0.08       # Bande du bord de case servant à estimer la couleur de la case
+FG_THRESHOLD = 45         # Écart de couleur (0-255) au-delà duquel un pixel appartient à une pièce
+EDGE_THRESHOLD = 40       # Gradient au-delà duquel un pixel est un contour
+OCCUPIED_FG = 0.10        # Part minimale de pixels « pièce » pour une case occupée
+OCCUPIED_EDGES = 0.06     # ... ou part minimale de pixels de contour
+WHITE_PIECE_LUMA = 128    # Luminance moyenne des pixels « pièce » au-delà de laquelle la pièce est blanche
+FEATURE_NAMES = ("fg_fraction", "fill", "height", "width", "center", "edges")
+BOARD_SIDE = 400          # Côté (pixels) de tout échiquier redressé, à l'apprentissage comme à la lecture
+SILHOUETTE_SIDE = 16      # Côté de la silhouette réduite d'une pièce comparée aux modèles
+MATCH_TEMPERATURE = 0.05  # Écart de silhouette (part de pixels) qui divise la probabilité par e
+MIN_CONFIDENCE = 0.7      # Confiance moyenne des cases occupées sous laquelle la lecture est rejetée
+# Nombre maximal de pièces de chaque type par camp (promotions comprises)
+PIECE_LIMITS = {"k": 1, "q": 9, "r": 10, "b": 10, "n": 10, "p": 8}
+
+CANNY_THRESHOLDS = (50, 150)  # Seuils de cv2.Canny pour la carte de contours
+QUALITY_VOTES = 100       # Votes de Hough des lignes analysées par evaluate_angle_quality
+SYMMETRY_SIDE = 256       # Côté de l'image réduite sur laquelle evaluate_symmetry compare les quarts
+
+DETECTION_SIDE = 512      # Côté maximal de l'image réduite utilisée pour trouver les coins
+HOUGH_VOTES = 0.25        # Votes de Hough minimaux, en part du petit côté de l'image
+LINE_MERGE = 0.02         # Écart de rho (part du petit côté) sous lequel deux lignes sont confondues
+GRID_TOLERANCE = 0.2      # Écart toléré entre une ligne et la grille régulière, en part de case
+GRID_PERSPECTIVE = 0.2    # Variation maximale (log) d'un écart de case au suivant due à la perspective
+MIN_GRID_LINES = 5        # Lignes de la grille qui doivent être confirmées par une détection
+MIN_FAMILY_ANGLE = 20     # Angle minimal (degrés) entre les deux familles de lignes de la grille
+RECTIFIED_ANGLE = 10      # Écart (degrés) à l'horizontale / la verticale des lignes cherchées après redressement
+RECTIFIED_SQUARE = 48     # Taille d'une case (pixels) de l'échiquier redressé pour l'affinage
+RECTIFIED_MARGIN = 1.5    # Marge (en cases) gardée autour de l'échiquier redressé
+MIN_BOARD_AREA = 0.05     # Surface minimale de l'échiquier, en part de l'image
+BOARD_OVERFLOW = 0.1      # Débordement toléré des coins hors de l'image
+
+
+def board_tiles(board):
+    """
+    Découpe une image d'échiquier redressée en 8 × 8 cases sans copie.
+    :param board: Tableau (H, W) ou (H, W, C) ; les pixels au-delà d'un multiple de 8 sont ignorés.
+    :return: Vue (8, 8, t, t[, C]) partageant la mémoire de `board` (cases[rangée][colonne]).
+    """
+    tile = min(board.shape[0], board.shape[1]) // 8
+    row_stride, col_stride = board.strides[:2]
+    shape = (8, 8, tile, tile) + board.shape[2:]
+    strides = (tile * row_stride, tile * col_stride, row_stride, col_stride) + board.strides[2:]
+    return as_strided(board, shape=shape, strides=strides, writeable=False)
+
+
+def tile_features(board):
+    """
+    Calcule en un seul passage vectorisé les caractéristiques des 64 cases.
+    :param board: Image RGB redressée (H, W, 3), uint8.
+    :return: (features (8, 8, len(FEATURE_NAMES)) float32, luminance moyenne des pixels « pièce » (8, 8),
+             silhouettes (8, 8, SILHOUETTE_SIDE²)) ; voir square_features.
+    """
+    side = min(board.shape[:2]) // 8 * 8
+    if board.shape[:2] != (side, side):
+        # Cases alignées sur la grille : sinon le reste de la division par 8 décale les dernières
+        board = cv2.resize(board, (side, side), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(np.ascontiguousarray(board), cv2.COLOR_RGB2GRAY)
+    return square_features(board_tiles(board), board_tiles(gray))
+
+
+def square_features(tiles, gray_tiles=None):
+    """
+    Caractéristiques d'un lot quelconque de cases (toutes d'un coup, ou seulement certaines).
+    :param tiles: Cases RGB (..., t, t, 3), par exemple board_tiles(board)[changed].
+    :param gray_tiles: Mêmes cases en niveaux de gris (calculées depuis `tiles` si None).
+    :return: (features (..., len(FEATURE_NAMES)) float32, luminance des pixels « pièce » (...),
+             silhouettes (..., SILHOUETTE_SIDE²) float32 : part de pixels « pièce » de chaque cellule
+             d'une grille SILHOUETTE_SIDE × SILHOUETTE_SIDE, indépendante de la taille des cases).
+    """
+    lead, t = tiles.shape[:-3], tiles.shape[-2]
+    if gray_tiles is None:
+        flat = np.ascontiguousarray(tiles).reshape(-1, t, 3)
+        gray_tiles = cv2.cvtColor(flat, cv2.COLOR_RGB2GRAY).reshape(tiles.shape[:-1])
+    margin, band = max(1, int(t * TILE_MARGIN)), max(1, int(t * BORDER_WIDTH))
+
+    # Couleur de la case : médiane de la bande extérieure (rarement couverte par la pièce)
+    border = np.concatenate([tiles[..., :band, :, :].reshape(lead + (-1, 3)),
+                             tiles[..., -band:, :, :].reshape(lead + (-1, 3)),
+                             tiles[..., :, :band, :].reshape(lead + (-1, 3)),
+                             tiles[..., :, -band:, :].reshape(lead + (-1, 3))], axis=-2)
+    background = np.median(border, axis=-2).astype(np.int16)                         # (..., 3)
+
+    inner = tiles[..., margin:t - margin, margin:t - margin, :].astype(np.int16)      # (..., h, w, 3)
+    gray = gray_tiles[..., margin:t - margin, margin:t - margin].astype(np.int16)     # (..., h, w)
+    fg = np.abs(inner - background[..., None, None, :]).max(axis=-1) > FG_THRESHOLD
+    h, w = fg.shape[-2:]
+
+    fg_count = fg.sum(axis=(-2, -1))
+    fg_fraction = fg_count / (h * w)
+    height = fg.any(axis=-1).sum(axis=-1) / h
+    width = fg.any(axis=-2).sum(axis=-1) / w
+    fill = fg_count / np.maximum(height * width * h * w, 1)
+    qh, qw = h // 4, w // 4
+    center = fg[..., qh:h - qh, qw:w - qw].sum(axis=(-2, -1)) / np.maximum(fg_count, 1)
+    gx = np.abs(np.diff(gray, axis=-1))[..., :-1, :]
+    gy = np.abs(np.diff(gray, axis=-2))[..., :, :-1]
+    edges = ((gx + gy) > EDGE_THRESHOLD).mean(axis=(-2, -1))
+
+    luma = (gray * fg).sum(axis=(-2, -1)) / np.maximum(fg_count, 1)
+    features = np.stack([fg_fraction, fill, height, width, center, edges], axis=-1).astype(np.float32)
+    side = SILHOUETTE_SIDE
+    silhouettes = np.array([cv2.resize(mask, (side, side), interpolation=cv2.INTER_AREA)
+                            for mask in fg.reshape(-1, h, w).astype(np.float32)]).reshape(lead + (side * side,))
+    return features, luma, silhouettes
+
+
+def region_correlation(region1, region2):
+    """
+    Corrélation de Pearson de deux régions de même forme, bornée à [0, 1].
+    Calculée par sommes (moyennes, variances, covariance) directement sur les vues, y compris
+    retournées ([:, ::-1]) : ni copie aplatie, ni matrice empilée comme np.corrcoef.
+    """
+    n = region1.size
+    sum1 = region1.sum(dtype=np.float64)
+    sum2 = region2.sum(dtype=np.float64)
+    products = [np.einsum("ij,ij->", a, b, dtype=np.float64, casting="unsafe")
+                for a, b in ((region1, region1), (region2, region2), (region1, region2))]
+    variance1 = products[0] - sum1 * sum1 / n
+    variance2 = products[1] - sum2 * sum2 / n
+    if variance1 <= 0 or variance2 <= 0:
+        return 0.0   # Région uniforme : corrélation indéfinie
+    covariance = products[2] - sum1 * sum2 / n
+    return max(0.0, covariance / np.sqrt(variance1 * variance2))
+
+
+def hough_lines(edges, threshold=None, theta_range=None):
+    """
+    Lignes de Hough (rho, theta) d'une carte de contours, par votes décroissants.
+    :param threshold: Votes minimaux (par défaut proportionnels à la taille de l'image).
+    :param theta_range: (min, max) des angles explorés en radians (par défaut : tous) ; le coût
+                        de la transformée est proportionnel à l'étendue explorée.
+    :return: Tableau (n, 2), vide si aucune ligne n'est trouvée.
+    """
+    if threshold is None:
+        threshold = max(50, int(min(edges.shape) * HOUGH_VOTES))
+    if theta_range is None:
+        lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=threshold)
+    else:
+        lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=threshold,
+                               min_theta=theta_range[0], max_theta=theta_range[1])
+    return np.empty((0, 2), dtype=np.float32) if lines is None else lines[:, 0]
+
+
+class AnalysisContext:
+    """
+    Données d'une image partagées par toutes les étapes (qualité, symétrie, coins,
+    classification) : niveaux de gris, contours, pyramide et lignes sont calculés une seule
+    fois, à la première demande. Les méthodes d'AdvancedChessVision acceptent indifféremment
+    une image ou un contexte.
+    `timings` donne la durée cumulée (ms) de chaque étape ; une étape imbriquée dans une autre
+    n'est comptée que pour elle-même.
+    :param image: Image RGB.
+    """
+
+    def __init__(self, image):
+        self.image = image
+        self.timings = {}
+        self._cache = {}
+        self._stages = []   # Pile des étapes en cours : [nom, instant de (re)prise]
+
+    @contextmanager
+    def stage(self, name):
+        """Chronomètre un bloc sous le nom `name` (l'étape englobante est suspendue pendant ce temps)."""
+        now = time.perf_counter()
+        if self._stages:
+            self._add_time(*self._stages[-1], now)
+        self._stages.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._add_time(*self._stages.pop(), now)
+            if self._stages:
+                self._stages[-1][1] = now
+
+    def _add_time(self, name, start, now):
+        self.timings[name] = self.timings.get(name, 0.0) + (now - start) * 1000
+
+    def _cached(self, key, compute):
+        """Valeur `key` du cache, calculée (et chronométrée sous key[0]) au premier appel."""
+        if key not in self._cache:
+            with self.stage(key[0]):
+                self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def gray(self):
+        """Image en niveaux de gris (pleine résolution)."""
+        return self._cached(("gray",), lambda: cv2.cvtColor(self.image, cv2.COLOR_RGB2GRAY))
+
+    @property
+    def edges(self):
+        """Carte de contours de Canny (pleine résolution)."""
+        gray = self.gray
+        return self._cached(("edges",), lambda: cv2.Canny(gray, *CANNY_THRESHOLDS))
+
+    def lines(self, threshold=QUALITY_VOTES):
+        """Lignes de Hough de la carte de contours pleine résolution."""
+        edges = self.edges
+        return self._cached(("lines", threshold), lambda: hough_lines(edges, threshold))
+
+    def pyramid(self, level):
+        """Niveau `level` de la pyramide (niveaux de gris, côté divisé par 2 à chaque niveau)."""
+        if level == 0:
+            return self.gray
+        parent = self.pyramid(level - 1)
+        return self._cached(("pyramid", level), lambda: cv2.pyrDown(parent))
+
+    def downscaled(self, max_side):
+        """
+        Niveaux de gris réduits à un côté maximal `max_side`, depuis le plus petit niveau de la
+        pyramide qui reste assez grand.
+        :return: (image réduite, facteur d'échelle par rapport à la pleine résolution).
+        """
+        scale = min(1.0, max_side / max(self.gray.shape))
+        level = 0
+        while scale * 2 ** (level + 1) <= 1:
+            level += 1
+        source = self.pyramid(level)
+        if scale == 1:
+            return source, 1.0
+        size = (max(1, round(self.gray.shape[1] * scale)), max(1, round(self.gray.shape[0] * scale)))
+        small = self._cached(("downscale", max_side), lambda: cv2.resize(source, size, interpolation=cv2.INTER_AREA))
+        return small, scale
+
+    def small_lines(self, max_side):
+        """Lignes de Hough de l'image réduite à `max_side` (seuil de votes proportionnel)."""
+        small, _ = self.downscaled(max_side)
+        edges = self._cached(("small_edges", max_side), lambda: cv2.Canny(small, *CANNY_THRESHOLDS))
+        return self._cached(("small_lines", max_side), lambda: hough_lines(edges))
+
+
+def analysis_context(image):
+    """Contexte d'analyse de `image` (ou `image` elle-même si c'est déjà un contexte)."""
+    return image if isinstance(image, AnalysisContext) else AnalysisContext(image)
+
+
+def placement_to_grid(placement):
+    """Convertit le premier champ d'une FEN en grille 8 × 8 de caractères ('.' = case vide)."""
+    grid = []
+    for rank in placement.split("/"):
+        row = []
+        for char in rank:
+            row.extend("." * int(char) if char.isdigit() else char)
+        grid.append(row)
+    return np.array(grid)
+
+
+def grid_to_placement(grid):
+    """Convertit une grille 8 × 8 de caractères ('.' = case vide) en premier champ de FEN."""
+    ranks = []
+    for row in grid:
+        text, empty = "", 0
+        for char in row:
+            if char == ".":
+                empty += 1
+                continue
+            if empty:
+                text += str(empty)
+                empty = 0
+            text += char
+        ranks.append(text + (str(empty) if empty else ""))
+    return "/".join(ranks)
+
+
+class SquareClassifier:
+    """
+    Classifieur du type de pièce (p, n, b, r, q, k) par plus proche voisin : la silhouette
+    d'une case (voir square_features) est comparée à chaque silhouette apprise, et chaque
+    type est noté par son modèle le plus proche.
+    """
+
+    def __init__(self, labels=None, templates=None, template_labels=None):
+        self.labels = labels                    # Types connus (ordre des colonnes de probabilities)
+        self.templates = templates              # Silhouettes apprises (n, SILHOUETTE_SIDE²)
+        self.template_labels = template_labels  # Index dans labels du type de chaque modèle (n,)
+
+    def fit(self, silhouettes, labels):
+        """
+        Mémorise les silhouettes annotées.
+        :param silhouettes: Tableau (n, SILHOUETTE_SIDE²).
+        :param labels: Tableau (n,) de lettres minuscules.
+        """
+        self.templates = np.asarray(silhouettes, dtype=np.float32)
+        self.labels, self.template_labels = np.unique(np.asarray(labels), return_inverse=True)
+        return self
+
+    def probabilities(self, silhouettes):
+        """
+        :return: Tableau (n, len(labels)) : probabilité de chaque type pour chaque silhouette.
+        """
+        silhouettes = np.asarray(silhouettes, dtype=np.float32)
+        distances = np.abs(silhouettes[:, None, :] - self.templates[None, :, :]).mean(axis=2)
+        nearest = np.full((len(silhouettes), len(self.labels)), np.inf, dtype=np.float32)
+        for index in range(len(self.labels)):
+            nearest[:, index] = distances[:, self.template_labels == index].min(axis=1)
+        weights = np.exp(-(nearest - nearest.min(axis=1, keepdims=True)) / MATCH_TEMPERATURE)
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    def predict(self, silhouettes):
+        """
+        :return: (lettres prédites, confiance entre 0 et 1) pour chaque ligne de `silhouettes`.
+        """
+        probabilities = self.probabilities(silhouettes)
+        best = probabilities.argmax(axis=1)
+        return self.labels[best], probabilities[np.arange(len(best)), best]
+
+    def save(self, path=MODEL_PATH):
+        np.savez(path, labels=self.labels, templates=self.templates, template_labels=self.template_labels)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        data = np.load(path)
+        return cls(data["labels"], data["templates"], data["template_labels"])
+
+
+def assign_pieces(probabilities, labels, white, back_rank):
+    """
+    Choisit le type de chaque pièce en respectant les effectifs possibles d'une partie :
+    un roi par camp (la case la plus probable), au plus PIECE_LIMITS de chaque type, aucun pion
+    sur les rangées 1 et 8. Les couples (case, type) sont retenus par probabilité décroissante.
+    :param probabilities: Tableau (n, len(labels)) (SquareClassifier.probabilities).
+    :param white: Tableau (n,) de booléens : pièce blanche.
+    :param back_rank: Tableau (n,) de booléens : case sur la première ou la dernière rangée.
+    :return: (lettres minuscules (n,), probabilité du type retenu (n,)).
+    """
+    probabilities = np.array(probabilities, dtype=np.float64)
+    labels = list(labels)
+    if "p" in labels:
+        probabilities[back_rank, labels.index("p")] = 0
+    chosen = np.full(len(probabilities), -1)
+    for side in (white, ~white):
+        squares = np.flatnonzero(side)
+        if not len(squares):
+            continue
+        remaining = {index: PIECE_LIMITS.get(label, len(probabilities)) for index, label in enumerate(labels)}
+        if "k" in labels:
+            king = labels.index("k")
+            chosen[squares[probabilities[squares, king].argmax()]] = king
+            remaining[king] = 0
+        order = np.argsort(-probabilities[squares], axis=None, kind="stable")
+        for square, label in zip(squares[order // len(labels)], order % len(labels)):
+            if chosen[square] < 0 and remaining[label] > 0:
+                chosen[square] = label
+                remaining[label] -= 1
+    return np.array(labels)[chosen], probabilities[np.arange(len(chosen)), chosen]
+
+
+_default_classifier = None
+
+
+def default_classifier():
+    """
+    Classifieur par défaut : square_classifier.npz s'il existe, sinon appris une fois sur
+    reference_chessboard.jpg (position initiale connue, générée par img_ref.py).
+    """
+    global _default_classifier
+    if _default_classifier is None:
+        if os.path.exists(MODEL_PATH):
+            _default_classifier = SquareClassifier.load(MODEL_PATH)
+        else:
+            reference = cv2.cvtColor(cv2.imread(REFERENCE_IMAGE), cv2.COLOR_BGR2RGB)
+            # L'image est l'échiquier entier ; warp_board la ramène à BOARD_SIDE comme à la lecture
+            _default_classifier = AdvancedChessVision().train_classifier([(reference, None, START_PLACEMENT)])
+    return _default_classifier
+
 
 class AdvancedChessVision:
     def __init__(self):
-        self.min_confidence = 0.8  # Seuil de confiance pour la détection
+        self.min_confidence = MIN_CONFIDENCE  # Seuil de rejet de la lecture (image_to_fen)
         
-    def evaluate_angle_quality(self, image):
-        """Évalue la qualité de l'angle de prise de vue"""
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    def evaluate_angle_quality(self, image, symmetry_side=SYMMETRY_SIDE):
+        """Évalue la qualité de l'angle de prise de vue (image RGB ou AnalysisContext)"""
+        context = analysis_context(image)
         
-        # Détection des lignes avec Hough
-        edges = cv2.Canny(gray, 50, 150)
-        lines = cv2.HoughLines(edges, 1, np.pi/180, threshold=100)
+        # Détection des lignes avec Hough (partagées par le contexte)
+        lines = context.lines()
         
-        if lines is None:
+        if not len(lines):
             return {"quality": "poor", "score": 0, "issues": ["Aucune ligne détectée"]}
         
-        # Analyse des angles des lignes
-        horizontal_angles = []
-        vertical_angles = []
-        
-        for rho, theta in lines[:, 0]:
-            angle = theta * 180 / np.pi
-            if 0 <= angle <= 30 or 150 <= angle <= 180:
-                horizontal_angles.append(angle)
-            elif 60 <= angle <= 120:
-                vertical_angles.append(angle)
-        
-        angle_score = self.calculate_angle_score(horizontal_angles, vertical_angles)
+        with context.stage("angles"):
+            # Analyse des angles des lignes
+            horizontal_angles = []
+            vertical_angles = []
+            
+            for rho, theta in lines:
+                angle = theta * 180 / np.pi
+                if 0 <= angle <= 30 or 150 <= angle <= 180:
+                    horizontal_angles.append(angle)
+                elif 60 <= angle <= 120:
+                    vertical_angles.append(angle)
+            
+            angle_score = self.calculate_angle_score(horizontal_angles, vertical_angles)
         
         # Évaluation de la symétrie
-        symmetry_score = self.evaluate_symmetry(image)
+        symmetry_score = self.evaluate_symmetry(context, symmetry_side)
         
         overall_score = (angle_score + symmetry_score) / 2
         
@@ -70,33 +449,53 @@ class AdvancedChessVision:
         
         return (angle_std_score + line_count_score) / 2
     
-    def evaluate_symmetry(self, image):
-        """Évalue la symétrie de l'image"""
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        h, w = gray.shape
+    def evaluate_symmetry(self, image, max_side=SYMMETRY_SIDE):
+        """
+        Évalue la symétrie de l'image (image RGB ou AnalysisContext)
+        max_side : côté de l'image réduite (pyramide du contexte) sur laquelle les quarts sont
+        comparés, ou None pour la pleine résolution (plus lent, mêmes catégories de qualité).
+        """
+        context = analysis_context(image)
+        if max_side is not None:
+            small, _ = context.downscaled(max_side)
+            with context.stage("symmetry"):
+                h, w = small.shape
+                h2, w2 = h // 2, w // 2
+                # Quarts de même taille ; les miroirs sont des vues retournées, sans copie
+                top_left = small[:h2, :w2]
+                top_right = small[:h2, w - w2:]
+                bottom_left = small[h - h2:, :w2]
+                bottom_right = small[h - h2:, w - w2:]
+                return np.mean([region_correlation(top_left, top_right[:, ::-1]),
+                                region_correlation(bottom_left, bottom_right[:, ::-1]),
+                                region_correlation(top_left, bottom_left[::-1]),
+                                region_correlation(top_right, bottom_right[::-1])])
         
-        # Compare les quarts de l'image
-        top_left = gray[:h//2, :w//2]
-        top_right = gray[:h//2, w//2:]
-        bottom_left = gray[h//2:, :w//2]
-        bottom_right = gray[h//2:, w//2:]
-        
-        # Calcul de la similarité entre les régions symétriques
-        similarity1 = self.compare_regions(top_left, cv2.flip(top_right, 1))
-        similarity2 = self.compare_regions(bottom_left, cv2.flip(bottom_right, 1))
-        similarity3 = self.compare_regions(top_left, cv2.flip(bottom_left, 0))
-        similarity4 = self.compare_regions(top_right, cv2.flip(bottom_right, 0))
+        gray = context.gray
+        h, w = gray.shape
         
-        return np.mean([similarity1, similarity2, similarity3, similarity4])
+        with context.stage("symmetry"):
+            # Compare les quarts de l'image
+            top_left = gray[:h//2, :w//2]
+            top_right = gray[:h//2, w//2:]
+            bottom_left = gray[h//2:, :w//2]
+            bottom_right = gray[h//2:, w//2:]
+            
+            # Calcul de la similarité entre les régions symétriques
+            similarity1 = self.compare_regions(top_left, cv2.flip(top_right, 1))
+            similarity2 = self.compare_regions(bottom_left, cv2.flip(bottom_right, 1))
+            similarity3 = self.compare_regions(top_left, cv2.flip(bottom_left, 0))
+            similarity4 = self.compare_regions(top_right, cv2.flip(bottom_right, 0))
+            
+            return np.mean([similarity1, similarity2, similarity3, similarity4])
     
     def compare_regions(self, region1, region2):
         """Compare deux régions d'image"""
         if region1.shape != region2.shape:
             region2 = cv2.resize(region2, (region1.shape[1], region1.shape[0]))
         
-        # Correlation pour mesurer la similarité
-        correlation = np.corrcoef(region1.flatten(), region2.flatten())[0, 1]
-        return max(0, correlation)  # Retourne entre 0 et 1
+        # Correlation pour mesurer la similarité (entre 0 et 1)
+        return region_correlation(region1, region2)
     
     def correct_perspective(self, image, corners):
         """Correction avancée de la perspective"""
@@ -142,18 +541,341 @@ class AdvancedChessVision:
     
     def order_points(self, pts):
         """Ordonne les points dans le bon ordre"""
-        rect = np.zeros((4, 2), dtype="float32")
-        
-        s = pts.sum(axis=1)
-        rect[0] = pts[np.argmin(s)]  # haut-gauche
-        rect[2] = pts[np.argmax(s)]  # bas-droit
+        pts = np.asarray(pts, dtype="float32")
         
-        diff = np.diff(pts, axis=1)
-        rect[1] = pts[np.argmin(diff)]  # haut-droit
-        rect[3] = pts[np.argmax(diff)]  # bas-gauche
+        # Sens horaire autour du centre (fonctionne aussi pour un échiquier tourné de 45°)
+        center = pts.mean(axis=0)
+        rect = pts[np.argsort(np.arctan2(pts[:, 1] - center[1], pts[:, 0] - center[0]))]
         
-        return rect
+        # Le premier point est le haut-gauche : puis haut-droit, bas-droit, bas-gauche
+        return np.roll(rect, -int(np.argmin(rect.sum(axis=1))), axis=0)
     
+    def detect_lines(self, gray, threshold=None):
+        """Lignes de Hough (rho, theta) d'une image en niveaux de gris (voir hough_lines)."""
+        return hough_lines(cv2.Canny(gray, *CANNY_THRESHOLDS), threshold)
+
+    def detect_board_corners(self, image, max_side=DETECTION_SIDE, refine=True):
+        """
+        Trouve automatiquement les 4 coins de l'échiquier (ordre de order_points).
+        La détection se fait sur une copie réduite (côté max_side) : grille intérieure 7 × 7
+        (cv2.findChessboardCorners) sur un échiquier dégagé, sinon lignes de Hough. Les coins
+        sont ensuite affinés depuis l'image pleine résolution (cornerSubPix sur la grille, ou
+        une passe de lignes de Hough sur l'échiquier redressé) sans refaire de détection de
+        contours sur l'image entière.
+        :param image: Image RGB ou AnalysisContext (image réduite et lignes partagées).
+        :return: Tableau (4, 2) float32 en coordonnées de l'image, ou None si rien n'est trouvé.
+        """
+        context = analysis_context(image)
+        gray = context.gray
+        small, scale = context.downscaled(max_side)
+
+        with context.stage("corners"):
+            # FAST_CHECK : abandon rapide quand des pièces masquent la grille
+            found, inner = cv2.findChessboardCorners(small, (7, 7), flags=cv2.CALIB_CB_FAST_CHECK)
+            if found:
+                inner = inner.reshape(-1, 2) / scale
+                if refine:
+                    window = max(2, int(np.linalg.norm(inner[1] - inner[0]) / 4))
+                    inner = self.refine_points(gray, inner, window)
+                return self.order_points(self.grid_outer_corners(inner))
+
+            corners = self.corners_from_lines(context.small_lines(max_side), small.shape)
+            if corners is None:
+                return None
+            corners = corners / scale
+            if refine:
+                corners = self.rectify_corners(gray, corners)
+            return self.order_points(corners)
+
+    def rectify_corners(self, gray, corners):
+        """
+        Affine des coins approchés : l'échiquier est redressé depuis l'image pleine résolution
+        (avec une marge autour), où la perspective n'écarte plus les lignes de la grille de
+        l'espacement régulier, puis les coins retrouvés sont ramenés dans l'image. Les lignes de
+        la grille y sont presque horizontales et verticales : la transformée de Hough ne
+        parcourt que RECTIFIED_ANGLE degrés de part et d'autre de ces deux directions.
+        """
+        square = RECTIFIED_SQUARE
+        margin = int(RECTIFIED_MARGIN * square)
+        size = 8 * square + 2 * margin
+        target = np.array([[margin, margin], [margin + 8 * square, margin],
+                           [margin + 8 * square, margin + 8 * square], [margin, margin + 8 * square]],
+                          dtype=np.float32)
+        homography = cv2.getPerspectiveTransform(self.order_points(corners), target)
+        warped = cv2.warpPerspective(gray, homography, (size, size), borderMode=cv2.BORDER_REPLICATE)
+        edges = cv2.Canny(warped, *CANNY_THRESHOLDS)
+        spread = np.radians(RECTIFIED_ANGLE)
+        lines = np.concatenate([hough_lines(edges, theta_range=(direction - spread, direction + spread))
+                                for direction in (0, np.pi / 2)])
+        found = self.corners_from_lines(lines, warped.shape, target)
+        if found is None:
+            return corners
+        return cv2.perspectiveTransform(found.reshape(1, -1, 2), np.linalg.inv(homography))[0]
+
+    def refine_points(self, gray, points, window):
+        """
+        Affine des points à la sous-précision du pixel dans une fenêtre locale (pleine résolution).
+        Les points trop près du bord de l'image (ou en dehors) sont laissés tels quels.
+        """
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
+        points = np.array(points, dtype=np.float32).reshape(-1, 2)
+        height, width = gray.shape
+        inside = np.all((points >= window) & (points < np.array([width, height]) - window), axis=1)
+        if inside.any():
+            refined = cv2.cornerSubPix(gray, points[inside].reshape(-1, 1, 2), (window, window), (-1, -1), criteria)
+            points[inside] = refined.reshape(-1, 2)
+        return points
+
+    def grid_outer_corners(self, inner):
+        """
+        Extrapole les coins extérieurs à partir des 49 coins intérieurs (grille 7 × 7)
+        par l'homographie case → image.
+        """
+        grid = np.array([(col + 1, row + 1) for row in range(7) for col in range(7)], dtype=np.float32)
+        homography, _ = cv2.findHomography(grid, inner.astype(np.float32))
+        outer = np.array([[[0, 0], [8, 0], [8, 8], [0, 8]]], dtype=np.float32)
+        return cv2.perspectiveTransform(outer, homography)[0]
+
+    def corners_from_lines(self, lines, shape, expected=None):
+        """
+        Coins de l'échiquier à partir de lignes de Hough : les lignes sont séparées en deux
+        familles d'orientation, dédoublonnées, puis on garde dans chaque famille les 9 lignes
+        consécutives les plus régulièrement espacées (ce qui écarte le bord du plateau, la
+        table...). Les coins sont les intersections des lignes extrêmes.
+        :param shape: Dimensions (hauteur, largeur) de l'image des lignes.
+        :param expected: Coins attendus (4, 2), qui départagent les grilles aussi plausibles.
+        """
+        if len(lines) < 4:
+            return None
+        families = self.split_line_families(lines)
+        if families is None:
+            return None
+        borders = [self.grid_borders(family, shape, expected) for family in families]
+        if any(border is None for border in borders):
+            return None
+        corners = np.array([self.intersect(a, b) for a in borders[0] for b in borders[1]], dtype=np.float32)
+        if not np.all(np.isfinite(corners)):
+            return None
+        height, width = shape[:2]
+        ordered = self.order_points(corners)
+        inside = np.all((ordered > -BOARD_OVERFLOW * np.array([width, height])) &
+                        (ordered < (1 + BOARD_OVERFLOW) * np.array([width, height])))
+        if not inside or cv2.contourArea(ordered) < MIN_BOARD_AREA * width * height or \
+                not cv2.isContourConvex(ordered.reshape(-1, 1, 2)):
+            return None
+        return ordered
+
+    def split_line_families(self, lines):
+        """Sépare les lignes en deux familles d'orientation (k-moyennes sur l'angle doublé)."""
+        doubled = np.stack([np.cos(2 * lines[:, 1]), np.sin(2 * lines[:, 1])], axis=1).astype(np.float32)
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1e-3)
+        _, labels, centers = cv2.kmeans(doubled, 2, None, criteria, 3, cv2.KMEANS_PP_CENTERS)
+        families = []
+        for index, center in enumerate(centers):
+            family = lines[labels.ravel() == index].copy()
+            # Même paramétrage pour toute la famille : theta proche de la direction moyenne
+            direction = np.arctan2(center[1], center[0]) / 2
+            flip = np.abs(np.angle(np.exp(1j * (family[:, 1] - direction)))) > np.pi / 2
+            family[flip, 0] *= -1
+            family[flip, 1] -= np.pi * np.sign(family[flip, 1] - direction)
+            families.append(family)
+        if min(len(family) for family in families) < 2:
+            return None
+        # Les deux familles d'un échiquier sont nettement sécantes
+        if np.dot(centers[0], centers[1]) > np.cos(np.radians(2 * MIN_FAMILY_ANGLE)):
+            return None
+        return families
+
+    def grid_borders(self, family, shape, expected=None):
+        """
+        Première et dernière des 9 lignes de la grille dans une famille de lignes.
+        Modèle de grille : positions a + g·S(m), m = 0..8, où S(m) = (q^m - 1) / (q - 1) rend
+        compte de la perspective (écarts en progression géométrique de raison q ; q = 1 de face).
+        Les grilles candidates passent par deux lignes détectées voisines et sont évaluées en une
+        passe vectorisée : on garde celle dont le plus de positions sont confirmées par une ligne,
+        puis la moins débordante hors de l'image, puis la plus proche de l'échiquier attendu,
+        puis celle où les lignes manquantes se répartissent aux deux bords (les bords de
+        l'échiquier sont les lignes les plus souvent perdues), puis la plus proche des lignes.
+        :param expected: Points (n, 2) de l'échiquier attendu (coins déjà estimés), ou None.
+        """
+        tolerance = LINE_MERGE * min(shape[:2])
+        kept = []
+        for rho, theta in family:  # Votes décroissants : on garde la ligne la plus votée de chaque groupe
+            if all(abs(rho - r) > tolerance for r, _ in kept):
+                kept.append((rho, theta))
+        if len(kept) < 2:
+            return None
+        kept = np.array(sorted(kept))
+        rhos = kept[:, 0]
+
+        ratios = np.exp(np.linspace(-GRID_PERSPECTIVE, GRID_PERSPECTIVE, 9))
+        flat = np.isclose(ratios, 1)
+        ranks = np.arange(9)
+        spans = np.where(flat[:, None], ranks,
+                         (ratios[:, None] ** ranks - 1) / np.where(flat, 1, ratios - 1)[:, None])   # S(m)
+
+        # Candidats : (ligne i, ligne j proche) placées aux rangs (mi, mj) de la grille, pour chaque q
+        first = np.concatenate([np.arange(len(rhos) - d) for d in range(1, 4)])
+        second = np.concatenate([np.arange(d, len(rhos)) for d in range(1, 4)])
+        slots = np.array([(mi, mj) for mi in range(9) for mj in range(mi + 1, min(mi + 4, 9))])
+        pair, slot, ratio = (axis.ravel() for axis in np.meshgrid(np.arange(len(first)), np.arange(len(slots)),
+                                                                   np.arange(len(ratios)), indexing="ij"))
+        low, high = spans[ratio, slots[slot, 0]], spans[ratio, slots[slot, 1]]
+        gaps = (rhos[second[pair]] - rhos[first[pair]]) / (high - low)
+        starts = rhos[first[pair]] - gaps * low
+        valid = gaps > min(shape[:2]) / 40
+        gaps, starts, ratio = gaps[valid], starts[valid], ratio[valid]
+        grids = starts[:, None] + gaps[:, None] * spans[ratio]                      # (n, 9)
+        local_gaps = gaps[:, None] * ratios[ratio, None] ** ranks                    # Écart après chaque ligne
+        above = np.clip(np.searchsorted(rhos, grids), 1, len(rhos) - 1)             # Ligne détectée la plus proche
+        distances = np.minimum(np.abs(grids - rhos[above - 1]), np.abs(grids - rhos[above]))
+        matched = distances < GRID_TOLERANCE * local_gaps
+
+        height, width = shape[:2]
+        theta = kept[:, 1].mean()
+        extent = np.array([0, width * np.cos(theta), height * np.sin(theta),
+                           width * np.cos(theta) + height * np.sin(theta)])
+        overflow = np.maximum(extent.min() - grids[:, 0], 0) + np.maximum(grids[:, -1] - extent.max(), 0)
+        count = matched.sum(axis=1)
+        residual = (np.where(matched, distances / local_gaps, 0)).sum(axis=1) / np.maximum(count, 1)
+        shift = np.zeros(len(grids))
+        if expected is not None:
+            projected = expected[:, 0] * np.cos(theta) + expected[:, 1] * np.sin(theta)
+            shift = np.abs(grids[:, 0] - projected.min()) + np.abs(grids[:, -1] - projected.max())
+        first_seen, last_seen = matched.argmax(axis=1), 8 - matched[:, ::-1].argmax(axis=1)
+        balance = np.abs(first_seen - (8 - last_seen))
+        best = np.lexsort((residual, balance, shift, overflow, -count))[0]
+        if count[best] < MIN_GRID_LINES:
+            return None
+
+        # Ajustement par moindres carrés sur les lignes confirmées : position et orientation
+        # (les lignes convergent en perspective) de chaque ligne selon son rang dans la grille
+        span = spans[ratio[best]]
+        index = np.abs(grids[best][:, None] - rhos[None, :]).argmin(axis=0)
+        confirmed = np.abs(grids[best][index] - rhos) < GRID_TOLERANCE * local_gaps[best][index]
+        start, gap = starts[best], gaps[best]
+        slope, intercept = 0.0, theta
+        if np.unique(index[confirmed]).size >= 2:
+            gap, start = np.polyfit(span[index[confirmed]], rhos[confirmed], 1)
+            slope, intercept = np.polyfit(index[confirmed], kept[confirmed, 1], 1)
+        return (start, intercept), (start + gap * span[-1], intercept + 8 * slope)
+
+    def intersect(self, line1, line2):
+        """Intersection de deux lignes (rho, theta)."""
+        (r1, t1), (r2, t2) = line1, line2
+        matrix = np.array([[np.cos(t1), np.sin(t1)], [np.cos(t2), np.sin(t2)]])
+        if abs(np.linalg.det(matrix)) < 1e-6:
+            return (np.inf, np.inf)
+        return np.linalg.solve(matrix, [r1, r2])
+
+    def warp_board(self, image, corners="auto"):
+        """
+        Redresse l'échiquier délimité par `corners` ("auto" : detect_board_corners).
+        L'image entière est prise comme échiquier si corners vaut None ou si rien n'est détecté.
+        Le résultat fait toujours BOARD_SIDE pixels de côté : les caractéristiques des cases ne
+        dépendent pas de la taille de la photo.
+        :param image: Image RGB ou AnalysisContext.
+        """
+        context = analysis_context(image)
+        if isinstance(corners, str) and corners == "auto":
+            corners = self.detect_board_corners(context)
+        with context.stage("warp"):
+            board = context.image
+            if corners is not None:
+                board, _ = self.correct_perspective(board, np.asarray(corners, dtype="float32"))
+            if board.shape[:2] != (BOARD_SIDE, BOARD_SIDE):
+                board = cv2.resize(board, (BOARD_SIDE, BOARD_SIDE), interpolation=cv2.INTER_AREA)
+        return board
+
+    def train_classifier(self, samples):
+        """
+        Apprend un SquareClassifier sur des photos annotées (silhouettes aussi tournées d'un,
+        deux et trois quarts de tour).
+        :param samples: Liste de (image RGB, coins ou None, premier champ de FEN).
+        """
+        silhouettes, labels = [], []
+        for image, corners, placement in samples:
+            _, _, board_silhouettes = tile_features(self.warp_board(image, corners))
+            grid = placement_to_grid(placement)
+            occupied = grid != "."
+            side = SILHOUETTE_SIDE
+            shapes = board_silhouettes[occupied].reshape(-1, side, side)
+            for turns in range(4):   # Échiquier photographié depuis n'importe quel côté
+                silhouettes.append(np.rot90(shapes, turns, axes=(1, 2)).reshape(-1, side * side))
+                labels.append(np.char.lower(grid[occupied]))
+        return SquareClassifier().fit(np.concatenate(silhouettes), np.concatenate(labels))
+
+    def image_to_fen(self, image, corners="auto", orientation="auto", classifier=None, min_confidence=None):
+        """
+        Convertit une photo d'échiquier en FEN.
+        Étapes : redressement (correct_perspective) à BOARD_SIDE pixels, découpe en 64 cases (vue
+        sans copie), caractéristiques calculées en un seul passage, occupation et couleur par
+        seuils, orientation d'après les couleurs, puis type de pièce par le classifieur sous les
+        contraintes d'effectifs d'une partie (assign_pieces : un roi par camp, pas de pion sur
+        les rangées extrêmes).
+        :param image: Image RGB ou AnalysisContext (étapes déjà calculées réutilisées).
+        :param corners: 4 coins de l'échiquier dans l'image, "auto" pour les détecter
+                        (detect_board_corners) ou None si l'image est déjà l'échiquier.
+        :param orientation: Nombre de quarts de tour à appliquer (0-3), ou "auto" pour placer
+                            les blancs en bas.
+        :param classifier: SquareClassifier (par défaut : default_classifier()).
+        :param min_confidence: Confiance moyenne des cases occupées sous laquelle la lecture est
+                               rejetée (par défaut : self.min_confidence).
+        :return: Dictionnaire {fen, placement, grid, confidence, mean_confidence, issues,
+                 orientation, time_ms, timings} ; timings détaille la durée (ms) de chaque étape
+                 du contexte. Une lecture rejetée a fen et placement à None et l'issue
+                 "low_confidence" (grid et confidence restent fournis pour l'inspection).
+        """
+        start = time.perf_counter()
+        context = analysis_context(image)
+        classifier = classifier or default_classifier()
+        board = self.warp_board(context, corners)
+        with context.stage("features"):
+            features, luma, silhouettes = tile_features(board)
+        with context.stage("classification"):
+            occupied = (features[:, :, 0] > OCCUPIED_FG) | (features[:, :, 5] > OCCUPIED_EDGES)
+            white = occupied & (luma > WHITE_PIECE_LUMA)
+
+            # Orientation d'après les seules couleurs, puis types choisis dans la grille finale
+            if orientation == "auto":
+                orientation = self.guess_orientation(np.where(occupied, np.where(white, "P", "p"), "."))
+            occupied, white = np.rot90(occupied, orientation), np.rot90(white, orientation)
+            silhouettes = np.rot90(silhouettes, orientation)
+
+            grid = np.full((8, 8), ".", dtype="<U1")
+            confidence = np.ones((8, 8), dtype=np.float32)
+            if occupied.any():
+                back_rank = np.zeros((8, 8), dtype=bool)
+                back_rank[[0, 7]] = True
+                kinds, scores = assign_pieces(classifier.probabilities(silhouettes[occupied]), classifier.labels,
+                                              white[occupied], back_rank[occupied])
+                grid[occupied] = np.where(white[occupied], np.char.upper(kinds), kinds)
+                confidence[occupied] = scores
+            # Pièces hors du domaine du modèle (vraie photo, autre jeu) : rien de fiable à écrire
+            mean_confidence = float(confidence[occupied].mean()) if occupied.any() else 1.0
+            issues = []
+            if mean_confidence < (self.min_confidence if min_confidence is None else min_confidence):
+                issues.append("low_confidence")
+            placement = None if issues else grid_to_placement(grid)
+        return {
+            "fen": None if placement is None else f"{placement} w - - 0 1",
+            "placement": placement,
+            "grid": grid,
+            "confidence": confidence,
+            "mean_confidence": mean_confidence,
+            "issues": issues,
+            "orientation": int(orientation),
+            "time_ms": (time.perf_counter() - start) * 1000,
+            "timings": dict(context.timings),
+        }
+
+    def guess_orientation(self, grid):
+        """Nombre de quarts de tour (np.rot90) qui amène le plus de pièces blanches en bas."""
+        white = np.char.isupper(grid).astype(np.int8)
+        black = (np.char.islower(grid) & (grid != ".")).astype(np.int8)
+        scores = [np.rot90(white, k)[4:].sum() + np.rot90(black, k)[:4].sum() for k in range(4)]
+        return int(np.argmax(scores))
+
     def get_photography_guidance(self, quality_report):
         """Donne des conseils pour améliorer la photo"""
         guidance = []
@@ -176,13 +898,12 @@ class AdvancedChessVision:
         return guidance
 
 # Exemple d'utilisation complète
-def complete_example():
+def complete_example(path="APCS_1_large.jpg"):
+    """Analyse d'une seule photo (pour un répertoire ou une archive : batch_to_fen.py)"""
     vision = AdvancedChessVision()
     
     # Charger l'image
-    image1 = cv2.imread("APCS_1_large.jpg")
-    image2 = cv2.imread("APCS_1_large.jpg")
-    image_rgb = cv2.cvtColor(image2, cv2.COLOR_BGR2RGB)
+    image_rgb = cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB)
     
 
     test_images = {
@@ -201,8 +922,11 @@ def complete_example():
         print(f"Analyse : {name}")
         print(f"{'='*50}")
         
+        # Niveaux de gris, contours et lignes calculés une fois pour toutes les étapes
+        context = AnalysisContext(test_image)
+        
         # Évaluation de la qualité
-        quality_report = vision.evaluate_angle_quality(test_image)
+        quality_report = vision.evaluate_angle_quality(context)
         
         print(f"Qualité: {quality_report['quality']} (score: {quality_report['score']:.2f})")
         print(f"Score angle: {quality_report['angle_score']:.2f}")
@@ -219,6 +943,88 @@ def complete_example():
             for advice in guidance:
                 print(advice)
 
+        # Lecture de la position (coins de l'échiquier détectés automatiquement)
+        corners = vision.detect_board_corners(context)
+        print(f"Coins: {None if corners is None else corners.round().tolist()}")
+        result = vision.image_to_fen(context, corners=corners)
+        print(f"FEN: {result['fen']} (confiance {result['mean_confidence']:.2f})")
+        if result["issues"]:
+            print("Lecture rejetée : " + ", ".join(result["issues"]))
+        print("Durées (ms): " + ", ".join(f"{stage} {ms:.1f}" for stage, ms in context.timings.items()))
+
+def check_reference():
+    """
+    Vérifie que l'image de référence (celle de l'apprentissage) se relit comme la position
+    initiale : image prise telle quelle, coins détectés, et tournée d'un quart de tour.
+    :return: True si toutes les lectures donnent START_PLACEMENT.
+    """
+    vision = AdvancedChessVision()
+    reference = cv2.cvtColor(cv2.imread(REFERENCE_IMAGE), cv2.COLOR_BGR2RGB)
+    cases = {
+        "entière": (reference, None),
+        "coins détectés": (reference, "auto"),
+        "agrandie": (cv2.resize(reference, (1200, 1200)), None),
+        "quart de tour": (np.ascontiguousarray(np.rot90(reference)), None),
+    }
+    ok = True
+    for name, (image, corners) in cases.items():
+        placement = vision.image_to_fen(image, corners=corners)["placement"]
+        print(f"{name:15s} {placement} {'ok' if placement == START_PLACEMENT else 'ÉCHEC'}")
+        ok &= placement == START_PLACEMENT
+    return ok
+
+def benchmark_quality(images=None, repeat=5):
+    """
+    Compare le calcul de symétrie réduit (SYMMETRY_SIDE) au calcul pleine résolution :
+    durée, scores de symétrie, score global et catégorie de qualité obtenus, pour chaque image.
+    :param images: Dictionnaire nom -> image RGB (par défaut : photo d'exemple, sa version
+                   12 Mpx, image de référence, images générées et grilles de diagramme notées
+                   « good » ou « excellent » en pleine résolution).
+    :return: Une ligne par image ; un résumé (catégories identiques, plus grand écart du score
+             global) est affiché à la fin.
+    """
+    if images is None:
+        photo = cv2.cvtColor(cv2.imread(os.path.join(MODULE_DIR, "APCS_1_large.jpg")), cv2.COLOR_BGR2RGB)
+        images = {
+            "APCS_1_large": photo,
+            "APCS_1_12mp": cv2.resize(photo, (4000, 3000)),
+            "reference": cv2.cvtColor(cv2.imread(REFERENCE_IMAGE), cv2.COLOR_BGR2RGB),
+            "bon_angle": create_good_angle_image(),
+            "angle_incliné": create_tilted_angle_image(),
+            "angle_latéral": create_side_angle_image(),
+            "grille_nette": create_grid_image(thickness=24, tilt=-1, blur=2),
+            "grille_12mp": cv2.resize(create_grid_image(thickness=24, tilt=-1), (3464, 3464)),
+            "grille_inclinée": create_grid_image(thickness=24, tilt=2),
+            "grille_fine": create_grid_image(thickness=8, tilt=-1),
+        }
+    vision = AdvancedChessVision()
+    rows = []
+    for name, image in images.items():
+        row = {"image": name}
+        for mode, side in (("full", None), ("fast", SYMMETRY_SIDE)):
+            elapsed = []
+            for _ in range(repeat):
+                context = AnalysisContext(image)
+                context.gray   # Niveaux de gris communs aux deux modes : hors chronométrage
+                start = time.perf_counter()
+                row[f"symmetry_{mode}"] = vision.evaluate_symmetry(context, side)
+                elapsed.append((time.perf_counter() - start) * 1000)
+            row[f"ms_{mode}"] = min(elapsed)
+            report = vision.evaluate_angle_quality(image, side)
+            row[f"score_{mode}"] = report["score"]
+            row[f"quality_{mode}"] = report["quality"]
+        row["score_delta"] = row["score_fast"] - row["score_full"]
+        rows.append(row)
+        print(f"{name:15s} pleine résolution {row['ms_full']:8.2f} ms | réduite {row['ms_fast']:6.2f} ms "
+              f"(x{row['ms_full'] / max(row['ms_fast'], 1e-9):.0f}) | symétrie {row['symmetry_full']:.3f} / "
+              f"{row['symmetry_fast']:.3f} | score {row['score_full']:.3f} / {row['score_fast']:.3f} "
+              f"({row['score_delta']:+.3f}) | qualité {row['quality_full']} / {row['quality_fast']}")
+    same = sum(row["quality_full"] == row["quality_fast"] for row in rows)
+    qualities = sorted({row["quality_full"] for row in rows})
+    print(f"catégories identiques : {same}/{len(rows)} (pleine résolution : {', '.join(qualities)}) | "
+          f"plus grand écart du score global : {max(abs(row['score_delta']) for row in rows):.3f}")
+    return rows
+
 def create_good_angle_image():
     """Crée une image avec un bon angle (vue de dessus)"""
     size = 400
@@ -274,5 +1080,32 @@ def create_side_angle_image():
     
     return img
 
+def create_grid_image(thickness=24, tilt=-1, blur=0):
+    """
+    Crée un diagramme d'échiquier (grille 8 × 8 tracée, centrée) vu de face : image symétrique
+    aux lignes régulières, notée « good » ou « excellent » par evaluate_angle_quality.
+    :param thickness: Épaisseur des lignes (pixels).
+    :param tilt: Rotation (degrés) de la grille.
+    :param blur: Écart-type du flou gaussien appliqué (0 : aucun).
+    """
+    size, margin = 800, 80
+    img = np.full((size, size, 3), 235, dtype=np.uint8)
+    step = (size - 2 * margin) / 8
+    for i in range(9):
+        p = int(round(margin + i * step))
+        cv2.line(img, (margin, p), (size - margin, p), (40, 40, 40), thickness)
+        cv2.line(img, (p, margin), (p, size - margin), (40, 40, 40), thickness)
+    if tilt:
+        rotation = cv2.getRotationMatrix2D((size / 2, size / 2), tilt, 1)
+        img = cv2.warpAffine(img, rotation, (size, size), borderValue=(235, 235, 235))
+    if blur:
+        img = cv2.GaussianBlur(img, (0, 0), blur)
+    return img
+
 if __name__ == "__main__":
-    complete_example()
\ No newline at end of file
+    if sys.argv[1:] == ["--benchmark"]:
+        benchmark_quality()
+    elif sys.argv[1:] == ["--check"]:
+        sys.exit(0 if check_reference() else 1)
+    else:
+        complete_example(*sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+Suivi d'un échiquier dans une vidéo ou un flux de caméra, coup par coup.
+
+La détection complète (detect_board_corners + classification des 64 cases) n'est faite qu'au
+premier plan ou quand le suivi est perdu. Ensuite, pour chaque image :
+  - des points d'intérêt du plateau sont suivis par flux optique (Lucas-Kanade) et
+    l'homographie entre deux images (RANSAC) met à jour les coins de l'échiquier ;
+  - l'échiquier redressé est comparé, case par case, à l'image précédente : tant qu'une case
+    bouge (main du joueur), on attend ;
+  - une fois l'image stable, seules les cases qui diffèrent de la dernière position reconnue
+    sont reclassées, et un coup est déduit des cases vidées et remplies.
+
+Exemples :
+    python video_tracker.py partie.mp4
+    python video_tracker.py 0            # caméra /dev/video0
+"""
+import argparse
+import json
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from img_to_fen import (AdvancedChessVision, AnalysisContext, board_tiles, default_classifier,
+                        grid_to_placement, square_features, OCCUPIED_EDGES, OCCUPIED_FG, WHITE_PIECE_LUMA)
+
+TRACK_SQUARE = 48          # Taille (pixels) d'une case de l'échiquier redressé
+TRACK_POINTS = 200         # Points d'intérêt suivis sur le plateau
+MIN_TRACK_POINTS = 12      # En dessous, le suivi est perdu : nouvelle détection complète
+MOTION_THRESHOLD = 12      # Écart moyen (0-255) d'une case entre deux images au-delà duquel elle bouge
+CHANGE_THRESHOLD = 18      # Écart moyen d'une case avec la dernière position reconnue : case à reclasser
+SETTLE_FRAMES = 3          # Images stables consécutives avant de lire la position
+
+
+def color_grid(grid):
+    """Grille des couleurs ('w', 'b', '.') d'une grille de pièces."""
+    return np.where(grid == ".", ".", np.where(np.char.isupper(grid), "w", "b"))
+
+
+def square_label(row, col):
+    """Nom de la case (row 0 = 8e rangée, col 0 = colonne a)."""
+    return "abcdefgh"[col] + str(8 - row)
+
+
+def infer_move(before, after):
+    """
+    Déduit un coup (notation UCI) de deux grilles de pièces successives.
+    Seules les couleurs sont utilisées (plus sûres que le type de pièce) : déplacement ou
+    prise (1 case vidée, 1 remplie), prise en passant (2 vidées, 1 remplie), roque (2 et 2).
+    :return: Coup UCI, ou None si le changement ne correspond à aucun coup.
+    """
+    old, new = color_grid(before), color_grid(after)
+    emptied = list(zip(*np.nonzero((old != ".") & (new == "."))))
+    filled = list(zip(*np.nonzero((new != ".") & (old != new))))
+    if not emptied or not filled:
+        return None
+    mover = new[filled[0]]
+    sources = [sq for sq in emptied if old[sq] == mover]
+    if len(filled) == 1 and len(sources) == 1 and len(emptied) <= 2:
+        src, dst = sources[0], filled[0]
+        move = square_label(*src) + square_label(*dst)
+        piece = after[dst].lower()
+        if before[src].lower() == "p" and dst[0] in (0, 7) and piece not in ("p", "k"):
+            move += piece
+        return move
+    if len(filled) == 2 and len(sources) == 2 and all(sq[0] == sources[0][0] for sq in sources + filled):
+        # Roque : la case de départ du roi est en colonne e, sa destination en colonne c ou g
+        king = next((sq for sq in sources if sq[1] == 4), None)
+        target = next((sq for sq in filled if sq[1] in (2, 6)), None)
+        if king is not None and target is not None:
+            return square_label(*king) + square_label(*target)
+    return None
+
+
+class BoardTracker:
+    """
+    Suit un échiquier d'image en image et signale les changements de position.
+    :param vision: AdvancedChessVision à utiliser (créé si None).
+    :param classifier: SquareClassifier (par défaut : default_classifier()).
+    :param change_threshold: Écart moyen d'une case (0-255) qui la fait reclasser.
+    :param settle_frames: Images stables consécutives avant de lire la position.
+    """
+
+    def __init__(self, vision=None, classifier=None, change_threshold=CHANGE_THRESHOLD,
+                 settle_frames=SETTLE_FRAMES):
+        self.vision = vision or AdvancedChessVision()
+        self.classifier = classifier or default_classifier()
+        self.change_threshold = change_threshold
+        self.settle_frames = settle_frames
+        self.size = 8 * TRACK_SQUARE
+        self.target = np.array([[0, 0], [self.size, 0], [self.size, self.size], [0, self.size]], dtype=np.float32)
+        self.reset()
+
+    def reset(self):
+        """Oublie l'échiquier : la prochaine image relance une détection complète."""
+        self.corners = None         # Coins de l'échiquier dans l'image courante
+        self.points = None          # Points suivis par flux optique
+        self.previous_gray = None
+        self.previous_board = None  # Échiquier redressé (niveaux de gris) de l'image précédente
+        self.reference = None       # Échiquier redressé lors de la dernière lecture de la position
+        self.grid = None            # Dernière position reconnue (lettres, '.' = vide), blancs en bas
+        self.orientation = 0        # Quarts de tour (np.rot90) de l'image redressée vers la grille
+        self.still = 0
+        self.stats = {"frames": 0, "detections": 0, "reclassified": 0}
+
+    # --- Suivi ---
+
+    def process(self, frame, frame_index=None):
+        """
+        Traite une image RGB.
+        :return: Événement (dict) si une position est lue pour la première fois ("board") ou
+                 si elle change ("move"), sinon None.
+        """
+        self.stats["frames"] += 1
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        if self.corners is None or not self._track(gray):
+            return self._detect(frame, gray, frame_index)
+        self.previous_gray = gray
+
+        board = self._warp(frame)
+        board_gray = cv2.cvtColor(board, cv2.COLOR_RGB2GRAY)
+        motion = self._square_difference(board_gray, self.previous_board)
+        self.previous_board = board_gray
+        if motion.max() > MOTION_THRESHOLD:
+            self.still = 0
+            return None
+        self.still += 1
+        if self.still != self.settle_frames:
+            return None
+
+        changed = self._square_difference(board_gray, self.reference) > self.change_threshold
+        if not changed.any():
+            return None
+        self.reference = board_gray
+        before = self.grid
+        view = np.rot90(before, -self.orientation).copy()
+        view[changed] = self._classify(board_tiles(board)[changed])
+        self.stats["reclassified"] += int(changed.sum())
+        after = np.rot90(view, self.orientation)
+        if np.array_equal(after, before):
+            return None
+        self.grid = after
+        return {"event": "move", "frame": frame_index, "move": infer_move(before, after),
+                "placement": grid_to_placement(after),
+                "squares": [square_label(*sq) for sq in zip(*np.nonzero(np.rot90(changed, self.orientation)))]}
+
+    def _detect(self, frame, gray, frame_index):
+        """Détection complète : coins, lecture des 64 cases et points à suivre."""
+        self.stats["detections"] += 1
+        corners = self.vision.detect_board_corners(AnalysisContext(frame))
+        if corners is None:
+            self.corners = None
+            return None
+        self.corners = corners.astype(np.float32)
+        self.previous_gray = gray
+        self._seed_points(gray)
+        board = self._warp(frame)
+        self.previous_board = self.reference = cv2.cvtColor(board, cv2.COLOR_RGB2GRAY)
+        self.still = self.settle_frames
+
+        # Lecture complète sous les contraintes d'effectifs (un roi par camp...) de image_to_fen
+        result = self.vision.image_to_fen(board, corners=None, classifier=self.classifier,
+                                          orientation="auto" if self.grid is None else self.orientation)
+        if result["placement"] is None:
+            self.corners = None   # Lecture rejetée (confiance trop faible) : nouvelle détection à l'image suivante
+            return None
+        self.orientation = result["orientation"]
+        grid = result["grid"]
+        if self.grid is not None and np.array_equal(grid, self.grid):
+            return None   # Suivi retrouvé, position inchangée
+        before, self.grid = self.grid, grid
+        event = "board" if before is None else "move"
+        return {"event": event, "frame": frame_index, "move": None if before is None else infer_move(before, grid),
+                "placement": grid_to_placement(grid), "corners": np.round(self.corners.astype(float), 1).tolist()}
+
+    def _track(self, gray):
+        """Met à jour les coins par l'homographie entre l'image précédente et `gray` ; False si perdu."""
+        if self.points is None or len(self.points) < MIN_TRACK_POINTS:
+            return False
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self.previous_gray, gray, self.points, None)
+        found = status.ravel() == 1
+        if found.sum() < MIN_TRACK_POINTS:
+            return False
+        homography, inliers = cv2.findHomography(self.points[found], moved[found], cv2.RANSAC, 3.0)
+        if homography is None or inliers.sum() < MIN_TRACK_POINTS:
+            return False
+        self.corners = cv2.perspectiveTransform(self.corners.reshape(1, -1, 2), homography)[0]
+        self.points = moved[found][inliers.ravel() == 1].reshape(-1, 1, 2)
+        if len(self.points) < TRACK_POINTS // 2:
+            self._seed_points(gray)
+        return True
+
+    def _seed_points(self, gray):
+        """Choisit de nouveaux points d'intérêt sur le plateau (et sa bordure)."""
+        mask = np.zeros_like(gray)
+        center = self.corners.mean(axis=0)
+        border = center + (self.corners - center) * 1.1
+        cv2.fillConvexPoly(mask, border.astype(np.int32), 255)
+        points = cv2.goodFeaturesToTrack(gray, TRACK_POINTS, 0.01, 8, mask=mask)
+        self.points = None if points is None else points.astype(np.float32)
+
+    def _warp(self, frame):
+        """Échiquier redressé (RGB, 8 × TRACK_SQUARE pixels de côté) dans l'image courante."""
+        homography = cv2.getPerspectiveTransform(self.vision.order_points(self.corners), self.target)
+        return cv2.warpPerspective(frame, homography, (self.size, self.size))
+
+    def _square_difference(self, board_gray, other):
+        """Écart absolu moyen de chaque case entre deux échiquiers redressés (8, 8)."""
+        difference = cv2.absdiff(board_gray, other)
+        return board_tiles(difference).mean(axis=(2, 3))
+
+    def _classify(self, tiles):
+        """Lettres des pièces ('.' = vide) d'un lot de cases RGB (n, t, t, 3)."""
+        features, luma, silhouettes = square_features(tiles)
+        letters = np.full(len(tiles), ".", dtype="<U1")
+        occupied = (features[:, 0] > OCCUPIED_FG) | (features[:, 5] > OCCUPIED_EDGES)
+        if occupied.any():
+            kinds, _ = self.classifier.predict(silhouettes[occupied])
+            letters[occupied] = np.where(luma[occupied] > WHITE_PIECE_LUMA, np.char.upper(kinds), kinds)
+        return letters
+
+
+def track_video(source, tracker=None, frame_step=1):
+    """
+    Lit une vidéo (fichier) ou une caméra (numéro de périphérique) et produit les événements
+    de BoardTracker.process, complétés du temps de la vidéo (secondes).
+    :param frame_step: Ne traiter qu'une image sur `frame_step`.
+    """
+    tracker = tracker or BoardTracker()
+    capture = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    if not capture.isOpened():
+        raise OSError(f"Source vidéo illisible : {source}")
+    fps = capture.get(cv2.CAP_PROP_FPS) or 0
+    index = -1
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                return
+            index += 1
+            if index % frame_step:
+                continue
+            event = tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), index)
+            if event is not None:
+                event["time"] = round(index / fps, 3) if fps else None
+                yield event
+    finally:
+        capture.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suivi d'un échiquier dans une vidéo (un événement JSON par ligne)")
+    parser.add_argument("source", help="Fichier vidéo ou numéro de caméra")
+    parser.add_argument("--step", type=int, default=1, help="Ne traiter qu'une image sur N")
+    parser.add_argument("--threshold", type=float, default=CHANGE_THRESHOLD, help="Écart d'une case qui la fait reclasser")
+    args = parser.parse_args(argv)
+
+    tracker = BoardTracker(change_threshold=args.threshold)
+    start = time.perf_counter()
+    for event in track_video(args.source, tracker, args.step):
+        print(json.dumps(event, ensure_ascii=False), flush=True)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    stats = tracker.stats
+    print(f"{stats['frames']} images en {elapsed:.1f} s ({stats['frames'] / elapsed:.1f} images/s), "
+          f"{stats['detections']} détections complètes, {stats['reclassified']} cases reclassées", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
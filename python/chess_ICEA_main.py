@@ -1,3 +1,4 @@
+import os
 import tkinter as tk
 from classes.MenuUI import *
 
@@ -5,6 +6,8 @@ BOARD_SIZE = 8
 SQUARE_SIZE = 60
 LIGHT_COLOR = "#EEEED2"
 DARK_COLOR = "#769656"
+BOT_MOVE_TIME = 0.5    # Temps de réflexion du bot (secondes)
+BOT_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books", "book.bin")  # Livre Polyglot (facultatif)
 
 PIECE_SYMBOLS = {
     "wp": "♙", "wr": "♖", "wn": "♘", "wb": "♗", "wq": "♕", "wk": "♔",
@@ -0,0 +1,286 @@
+"""
+Outils en ligne de commande pour le moteur d'échecs (sans interface Tkinter).
+
+Exemples :
+    python chess_engine_cli.py perft --depth 4
+    python chess_engine_cli.py perft --fen "<FEN>" --depth 3 --divide
+    python chess_engine_cli.py perft --suite
+    python chess_engine_cli.py search --movetime 2
+    python chess_engine_cli.py search --fen "<FEN>" --depth 6
+    python chess_engine_cli.py search --movetime 5 --threads 8
+    python chess_engine_cli.py smp-bench --depth 6 --workers 1,2,4,8,16
+    python chess_engine_cli.py pgn parties.pgn --replay
+    python chess_engine_cli.py check-bench
+    python chess_engine_cli.py selfplay --games 20 --nodes 2000
+    python chess_engine_cli.py book-build parties.pgn autres.pgn --output livre.bin --max-ply 20
+    python chess_engine_cli.py book livre.bin --fen "<FEN>"
+    python chess_engine_cli.py uci
+"""
+import argparse
+import random
+import sys
+import time
+
+from classes.Book import OpeningBook, build_book, polyglot_key
+from classes.Check_pieces import benchmark as check_benchmark
+from classes.Engine import Engine
+from classes.GameStatus import GameStatus
+from classes.ParallelSearch import ParallelSearch, benchmark
+from classes.Pgn import PgnError, iter_games
+from classes.Position import Position, START_FEN, move_to_uci
+from classes.Uci import UciEngine
+
+# Positions de référence et nombres de feuilles attendus par profondeur
+# (https://www.chessprogramming.org/Perft_Results)
+PERFT_SUITE = [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902, 197281, 4865609]),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862, 4085603]),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467, 422333]),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890, 3894594]),
+]
+
+# Positions lues en mode non strict (comme la commande UCI « position ») : droits de roque
+# sans tour sur sa case d'origine, qui doivent être ignorés
+LENIENT_PERFT_SUITE = [
+    ("4k3/8/8/8/8/8/8/4K2R w KQkq - 0 1", [15, 66, 1197, 7059]),
+]
+
+
+def run_perft(fen, depth, divide=False, strict=True):
+    """Lance un perft et affiche le nombre de feuilles, la durée et les nœuds par seconde."""
+    position = Position.from_fen(fen, strict)
+    start = time.perf_counter()
+    if divide:
+        result = position.perft_divide(depth)
+        for move, count in sorted(result.items()):
+            print(f"{move}: {count}")
+        nodes = sum(result.values())
+    else:
+        nodes = position.perft(depth)
+    elapsed = time.perf_counter() - start
+    print(f"perft({depth}) = {nodes}  {elapsed:.3f} s  {nodes / max(elapsed, 1e-9):,.0f} nœuds/s")
+    return nodes
+
+
+def run_perft_suite(max_depth):
+    """Compare le générateur aux valeurs de référence ; retourne False en cas d'écart."""
+    ok = True
+    suite = [(fen, expected, True) for fen, expected in PERFT_SUITE]
+    suite += [(fen, expected, False) for fen, expected in LENIENT_PERFT_SUITE]
+    for fen, expected, strict in suite:
+        print(fen)
+        for depth, count in enumerate(expected[:max_depth], 1):
+            nodes = run_perft(fen, depth, strict=strict)
+            if nodes != count:
+                print(f"  ÉCHEC : attendu {count}")
+                ok = False
+    return ok
+
+
+def print_info(info):
+    """Affiche le rapport d'une itération : profondeur, score, nœuds, temps et nœuds/s."""
+    print(f"profondeur {info['depth']:2d}  score {info['score']:6d}  nœuds {info['nodes']:9d}  "
+          f"temps {info['time']:7.3f} s  {info['nps']:7d} nœuds/s  pv {' '.join(info['pv'])}")
+
+
+def run_search(fen, depth=None, movetime=None, nodes=None, hash_mb=16, threads=1):
+    """Lance une recherche et affiche chaque itération, le meilleur coup et l'usage de la table."""
+    position = Position.from_fen(fen)
+    if threads > 1:
+        with ParallelSearch(threads=threads, hash_mb=hash_mb) as search:
+            result = search.search(position, depth=depth, movetime=movetime, nodes=nodes,
+                                   on_info=print_info)
+            print(f"{threads} processus, profondeurs atteintes : "
+                  f"{[worker['depth'] for worker in result['workers']]}")
+    else:
+        result = Engine(hash_mb=hash_mb).search(position, depth=depth, movetime=movetime, nodes=nodes, on_info=print_info)
+    best = move_to_uci(result["move"]) if result["move"] is not None else "(aucun)"
+    print(f"meilleur coup {best}  ({result['nodes']} nœuds en {result['time']:.3f} s, "
+          f"{result['nps']} nœuds/s)")
+    if result["tt"]:
+        tt = result["tt"]
+        print(f"table de transposition : {tt['hits']} succès, {tt['misses']} échecs, "
+              f"{tt['collisions']} collisions, remplissage {tt['hashfull']}‰")
+    return result
+
+
+def run_smp_bench(fen, depth, worker_counts, hash_mb):
+    """Compare le temps pour atteindre une profondeur fixe selon le nombre de processus."""
+    print(f"temps pour atteindre la profondeur {depth} : {fen}")
+
+    def print_row(row):
+        print(f"{row['threads']:3d} processus  {row['time']:8.3f} s  {row['nodes']:10d} nœuds  "
+              f"{row['nps']:8d} nœuds/s  accélération x{row['speedup']:.2f}  {move_to_uci(row['move'])}")
+
+    return benchmark(Position.from_fen(fen), depth, worker_counts, hash_mb, on_result=print_row)
+
+
+def run_pgn(path, replay=False):
+    """Lit une base PGN au fil de l'eau et affiche le débit (parties et demi-coups par seconde)."""
+    start = time.perf_counter()
+    games = plies = errors = 0
+    for game in iter_games(path):
+        games += 1
+        try:
+            if replay:
+                for _ in game.iter_moves():
+                    plies += 1
+            else:
+                plies += len(game.moves)
+        except PgnError as e:
+            errors += 1
+            print(f"partie {games} : {e}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{games} parties, {plies} demi-coups, {errors} erreurs en {elapsed:.3f} s : "
+          f"{games / elapsed:,.0f} parties/s, {plies / elapsed:,.0f} demi-coups/s")
+    return errors == 0
+
+
+def run_check_bench(calls):
+    """Coût par appel de CheckPieces.verify_move (tables pré-calculées)."""
+    for case, ns in check_benchmark(calls).items():
+        print(f"{case:28} {ns:8.0f} ns/appel")
+
+
+def run_selfplay(games, depth=None, nodes=None, random_plies=4, max_plies=400, seed=0):
+    """
+    Fait jouer le moteur contre lui-même ; l'état de la partie (mat, nulles) est tenu par
+    GameStatus à chaque demi-coup. Les premiers demi-coups sont tirés au hasard pour varier
+    les parties.
+    :return: Dictionnaire {résultat PGN: nombre de parties}.
+    """
+    rng = random.Random(seed)
+    engine = Engine()
+    results = {}
+    plies = 0
+    status_time = 0.0
+    start = time.perf_counter()
+    for number in range(1, games + 1):
+        engine.reset()
+        game = GameStatus()
+        while not game.is_over and len(game.keys) <= max_plies:
+            if len(game.keys) <= random_plies:
+                move = rng.choice(game.position.legal_moves())
+            else:
+                move = engine.search(game.position, depth=depth, nodes=nodes)["move"]
+            push_start = time.perf_counter()
+            game.push(move)
+            status_time += time.perf_counter() - push_start
+            plies += 1
+        result = game.result()
+        results[result] = results.get(result, 0) + 1
+        print(f"partie {number} : {result} ({game.status}) en {len(game.keys) - 1} demi-coups")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{games} parties, {plies} demi-coups en {elapsed:.1f} s ; résultats {results} ; "
+          f"coup joué + état : {status_time / max(plies, 1) * 1e6:.1f} µs/demi-coup")
+    return results
+
+
+def run_book_build(paths, output, max_ply, min_games):
+    """Construit un livre Polyglot depuis des fichiers PGN et affiche le débit."""
+    start = time.perf_counter()
+    games = (game for path in paths for game in iter_games(path))
+    stats = build_book(games, output, max_ply=max_ply, min_games=min_games)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{stats['games']} parties ({stats['errors']} erreurs), {stats['entries']} entrées "
+          f"écrites dans {output} en {elapsed:.1f} s")
+    return stats
+
+
+def run_book(path, fen, probes=1000):
+    """Affiche les coups du livre pour une position et le coût d'une consultation."""
+    position = Position.from_fen(fen)
+    with OpeningBook(path) as book:
+        moves = book.moves(position)
+        total = sum(weight for _, weight in moves) or 1
+        print(f"{len(book)} entrées ; clé {polyglot_key(position):016x}")
+        for move, weight in moves:
+            print(f"  {move_to_uci(move):6} poids {weight:6d}  {100 * weight / total:5.1f} %")
+        if not moves:
+            print("  position absente du livre")
+        start = time.perf_counter()
+        for _ in range(probes):
+            book.choose(position)
+        print(f"consultation : {(time.perf_counter() - start) / probes * 1e6:.1f} µs")
+    return moves
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Moteur d'échecs en ligne de commande")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    perft = commands.add_parser("perft", help="Compte les feuilles de l'arbre des coups légaux")
+    perft.add_argument("--fen", default=START_FEN, help="Position de départ (FEN)")
+    perft.add_argument("--depth", type=int, default=4, help="Profondeur en demi-coups")
+    perft.add_argument("--divide", action="store_true", help="Détail par coup racine")
+    perft.add_argument("--suite", action="store_true", help="Vérifie les positions de référence")
+
+    search = commands.add_parser("search", help="Cherche le meilleur coup d'une position")
+    search.add_argument("--fen", default=START_FEN, help="Position à analyser (FEN)")
+    search.add_argument("--depth", type=int, help="Profondeur maximale")
+    search.add_argument("--movetime", type=float, help="Budget en secondes")
+    search.add_argument("--nodes", type=int, help="Budget en nœuds")
+    search.add_argument("--hash", type=float, default=16, help="Taille de la table de transposition (Mo)")
+    search.add_argument("--threads", type=int, default=1, help="Nombre de processus de recherche (Lazy SMP)")
+
+    smp = commands.add_parser("smp-bench", help="Temps pour atteindre une profondeur selon le nombre de processus")
+    smp.add_argument("--fen", default=PERFT_SUITE[1][0], help="Position de test (FEN)")
+    smp.add_argument("--depth", type=int, default=5, help="Profondeur à atteindre")
+    smp.add_argument("--workers", default="1,2,4,8,16", help="Nombres de processus à comparer")
+    smp.add_argument("--hash", type=float, default=64, help="Taille de la table partagée (Mo)")
+
+    pgn = commands.add_parser("pgn", help="Lit une base PGN et mesure le débit de lecture")
+    pgn.add_argument("file", help="Fichier PGN")
+    pgn.add_argument("--replay", action="store_true", help="Rejoue et vérifie chaque coup")
+
+    check = commands.add_parser("check-bench", help="Mesure le coût d'un appel à CheckPieces.verify_move")
+    check.add_argument("--calls", type=int, default=200000, help="Nombre d'appels mesurés")
+
+    selfplay = commands.add_parser("selfplay", help="Parties du moteur contre lui-même (mat et nulles détectés)")
+    selfplay.add_argument("--games", type=int, default=10, help="Nombre de parties")
+    selfplay.add_argument("--depth", type=int, help="Profondeur de recherche par coup")
+    selfplay.add_argument("--nodes", type=int, default=2000, help="Budget en nœuds par coup")
+    selfplay.add_argument("--random-plies", type=int, default=4, help="Demi-coups d'ouverture tirés au hasard")
+    selfplay.add_argument("--seed", type=int, default=0, help="Graine du tirage des ouvertures")
+
+    book_build = commands.add_parser("book-build", help="Construit un livre d'ouvertures Polyglot depuis des PGN")
+    book_build.add_argument("files", nargs="+", help="Fichiers PGN")
+    book_build.add_argument("--output", default="book.bin", help="Livre à écrire (.bin)")
+    book_build.add_argument("--max-ply", type=int, default=24, help="Demi-coups retenus par partie")
+    book_build.add_argument("--min-games", type=int, default=2, help="Parties minimales par coup")
+
+    book = commands.add_parser("book", help="Coups d'un livre Polyglot pour une position")
+    book.add_argument("file", help="Livre (.bin)")
+    book.add_argument("--fen", default=START_FEN, help="Position à consulter (FEN)")
+
+    commands.add_parser("uci", help="Moteur au protocole UCI sur l'entrée et la sortie standard")
+
+    args = parser.parse_args(argv)
+    if args.command == "perft":
+        if args.suite:
+            return 0 if run_perft_suite(args.depth) else 1
+        run_perft(args.fen, args.depth, args.divide)
+    elif args.command == "search":
+        run_search(args.fen, args.depth, args.movetime, args.nodes, args.hash, args.threads)
+    elif args.command == "smp-bench":
+        counts = [int(count) for count in args.workers.split(",")]
+        run_smp_bench(args.fen, args.depth, counts, args.hash)
+    elif args.command == "pgn":
+        return 0 if run_pgn(args.file, args.replay) else 1
+    elif args.command == "check-bench":
+        run_check_bench(args.calls)
+    elif args.command == "selfplay":
+        run_selfplay(args.games, args.depth, args.nodes, args.random_plies, seed=args.seed)
+    elif args.command == "book-build":
+        run_book_build(args.files, args.output, args.max_ply, args.min_games)
+    elif args.command == "book":
+        run_book(args.file, args.fen)
+    elif args.command == "uci":
+        UciEngine().run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
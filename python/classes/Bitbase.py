@@ -0,0 +1,491 @@
+"""
+Bases de finales gain/nulle/perte (« bitbases ») : génération rétrograde et consultation.
+
+Une finale est nommée par ses pièces, camp fort en premier : "KQK", "KRK", "KPK", "KBNK",
+"KQKR"... Chaque position est un index : trait, roi blanc, roi noir puis les autres pièces
+(blanches puis noires, dans l'ordre du nom), chacun sur 6 bits (a1 = 0). Le résultat du point
+de vue du camp au trait tient sur 2 bits (DRAW, WIN, LOSS, ILLEGAL) : un fichier
+bitbases/<finale>.bin contient 4 positions par octet, soit 128 Kio pour une finale à trois
+pièces. Les fichiers sont projetés en mémoire : une consultation est un calcul d'index et
+la lecture d'un octet.
+
+La génération part des mats et des conversions (prises, promotions, dont le résultat est lu
+dans les finales plus petites) et remonte les coups à l'envers : une position dont un coup
+mène à une perte de l'adversaire est gagnée, une position dont tous les coups mènent à un
+gain de l'adversaire est perdue, le reste est nul. La première passe (coups de chaque
+position) est répartie sur plusieurs processus. La prise en passant est ignorée (elle ne
+concerne que les finales avec des pions des deux côtés).
+
+Exemple :
+    python -m classes.Bitbase KQK KRK KPK --workers 8
+"""
+import argparse
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from classes.Position import (BISHOP, BLACK, KING, KING_ATTACKS, KNIGHT, KNIGHT_ATTACKS, PAWN,
+                              PAWN_ATTACKS, QUEEN, ROOK, WHITE, bishop_attacks, queen_attacks,
+                              rook_attacks)
+
+DRAW, WIN, LOSS, ILLEGAL = 0, 1, 2, 3
+UNKNOWN = DRAW   # Pendant la génération, une position non résolue finit nulle
+
+BITBASE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bitbases")
+DEFAULT_ENDINGS = ("KQK", "KRK", "KPK")
+
+PIECE_LETTERS = "PNBRQ"   # Index = type de pièce
+_LETTER_ORDER = "QRBNP"   # Ordre des pièces dans un nom de finale
+_SLIDERS = {BISHOP: bishop_attacks, ROOK: rook_attacks, QUEEN: queen_attacks}
+_PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+# Finales sans possibilité de mat : nulles, sans fichier
+DRAWN_ENDINGS = frozenset(("KK", "KNK", "KBK", "KKN", "KKB"))
+
+
+def _name_order(kind):
+    return _LETTER_ORDER.index(PIECE_LETTERS[kind])
+
+
+def ending_name(white, black):
+    """Nom d'une finale depuis les types des pièces (hors rois) de chaque camp."""
+    def letters(types):
+        return "".join(PIECE_LETTERS[kind] for kind in sorted(types, key=_name_order))
+    return "K" + letters(white) + "K" + letters(black)
+
+
+class Ending:
+    """
+    Description d'une finale et conversion index <-> placement.
+    :param name: Nom ("KRK", "KBNK"...).
+    """
+
+    def __init__(self, name):
+        if not name.startswith("K") or name.count("K") != 2 or any(c not in "KPNBRQ" for c in name):
+            raise ValueError(f"Nom de finale invalide : {name!r}")
+        second = name.index("K", 1)
+        white = [PIECE_LETTERS.index(c) for c in name[1:second]]
+        black = [PIECE_LETTERS.index(c) for c in name[second + 1:]]
+        self.name = ending_name(white, black)
+        # Pièces dans l'ordre de l'index : (couleur, type)
+        self.pieces = ([(WHITE, KING), (BLACK, KING)]
+                       + [(WHITE, kind) for kind in sorted(white, key=_name_order)]
+                       + [(BLACK, kind) for kind in sorted(black, key=_name_order)])
+        self.count = len(self.pieces)
+        self.size = 2 << (6 * self.count)
+
+    def decode(self, index):
+        """Index -> (trait, liste des cases dans l'ordre de self.pieces)."""
+        squares = [0] * self.count
+        for slot in range(self.count - 1, -1, -1):
+            squares[slot] = index & 63
+            index >>= 6
+        return index, squares
+
+    def encode(self, turn, squares):
+        """(trait, cases) -> index."""
+        index = turn
+        for sq in squares:
+            index = (index << 6) | sq
+        return index
+
+    def sub_endings(self):
+        """Finales atteintes par une prise ou une promotion (hors finales nulles d'office)."""
+        result = set()
+        white = [kind for color, kind in self.pieces[2:] if color == WHITE]
+        black = [kind for color, kind in self.pieces[2:] if color == BLACK]
+        for side, other, flip in ((white, black, False), (black, white, True)):
+            for i, kind in enumerate(side):
+                rest = side[:i] + side[i + 1:]
+                candidates = [(rest, other)]   # Pièce prise
+                if kind == PAWN:
+                    candidates += [(rest + [promotion], other) for promotion in _PROMOTIONS]
+                for mine, theirs in candidates:
+                    name = ending_name(theirs, mine) if flip else ending_name(mine, theirs)
+                    if name not in DRAWN_ENDINGS:
+                        result.add(_canonical(name))
+        result.discard(self.name)
+        return result
+
+
+def _canonical(name):
+    """Nom de la finale telle qu'elle est stockée (camp fort en blanc)."""
+    second = name.index("K", 1)
+    white, black = name[1:second], name[second + 1:]
+    strength = [sum(10 ** (5 - _LETTER_ORDER.index(c)) for c in side) for side in (white, black)]
+    if strength[1] > strength[0] or (strength[1] == strength[0] and black > white):
+        return "K" + black + "K" + white
+    return name
+
+
+class Bitbases:
+    """
+    Ensemble de bitbases projetées en mémoire depuis un répertoire.
+    Les finales absentes du répertoire sont simplement ignorées (probe renvoie None).
+    :param directory: Répertoire des fichiers <finale>.bin.
+    """
+
+    def __init__(self, directory=BITBASE_DIR):
+        self.directory = directory
+        self.tables = {}    # Nom -> (Ending, mmap)
+        self._files = []
+        self.max_pieces = 0
+        if os.path.isdir(directory):
+            for file_name in sorted(os.listdir(directory)):
+                name, extension = os.path.splitext(file_name)
+                if extension == ".bin":
+                    try:
+                        self.load(name)
+                    except (OSError, ValueError):
+                        continue
+
+    def load(self, name):
+        """Projette le fichier d'une finale (ValueError si sa taille ne correspond pas)."""
+        ending = Ending(name)
+        path = os.path.join(self.directory, ending.name + ".bin")
+        file = open(path, "rb")
+        if os.fstat(file.fileno()).st_size != ending.size // 4:
+            file.close()
+            raise ValueError(f"Taille inattendue pour {path}")
+        self._files.append(file)
+        self.tables[ending.name] = (ending, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        self.max_pieces = max(self.max_pieces, ending.count)
+
+    def close(self):
+        """Libère les projections et les fichiers."""
+        for _, data in self.tables.values():
+            data.close()
+        for file in self._files:
+            file.close()
+        self.tables.clear()
+        self._files = []
+
+    def __len__(self):
+        return len(self.tables)
+
+    def probe_placement(self, placement, turn):
+        """
+        Résultat d'une position décrite par ses pièces.
+        :param placement: Liste de (index de pièce Position, case).
+        :param turn: Camp au trait.
+        :return: WIN, DRAW ou LOSS pour le camp au trait, None si la finale n'est pas disponible.
+        """
+        white = [piece % 6 for piece, _ in placement if piece < 6 and piece != KING]
+        black = [piece % 6 for piece, _ in placement if piece >= 6 and piece != 6 + KING]
+        name = ending_name(white, black)
+        if name in DRAWN_ENDINGS:
+            return DRAW
+        table = self.tables.get(name)
+        if table is None:
+            # Même finale couleurs inversées : symétrie haut/bas de l'échiquier
+            table = self.tables.get(ending_name(black, white))
+            if table is None:
+                return None
+            placement = [((piece + 6) % 12, sq ^ 56) for piece, sq in placement]
+            turn ^= 1
+        ending, data = table
+        squares = []
+        remaining = list(placement)
+        for color, kind in ending.pieces:
+            piece = color * 6 + kind
+            for i, (other, sq) in enumerate(remaining):
+                if other == piece:
+                    squares.append(sq)
+                    del remaining[i]
+                    break
+        index = ending.encode(turn, squares)
+        value = (data[index >> 2] >> ((index & 3) << 1)) & 3
+        return None if value == ILLEGAL else value
+
+    def probe(self, position):
+        """Résultat (WIN, DRAW, LOSS pour le camp au trait) d'une Position, ou None."""
+        if not self.tables or bin(position.occupied).count("1") > self.max_pieces:
+            return None
+        placement = [(piece, sq) for sq, piece in enumerate(position.squares) if piece >= 0]
+        return self.probe_placement(placement, position.turn)
+
+
+_default = None
+
+
+def default_bitbases():
+    """Bitbases du répertoire bitbases/ (chargées une fois ; None si aucune n'est disponible)."""
+    global _default
+    if _default is None:
+        _default = Bitbases()
+    return _default if len(_default) else None
+
+
+# --- Génération ---
+
+def _attacks(kind, color, sq, occupied):
+    if kind == KING:
+        return KING_ATTACKS[sq]
+    if kind == KNIGHT:
+        return KNIGHT_ATTACKS[sq]
+    if kind == PAWN:
+        return PAWN_ATTACKS[color][sq]
+    return _SLIDERS[kind](sq, occupied)
+
+
+def _is_attacked(pieces, squares, target, by_color, occupied, skip=-1):
+    """True si une pièce de by_color (sauf l'emplacement skip, prise) attaque la case target."""
+    for slot, (color, kind) in enumerate(pieces):
+        if color == by_color and slot != skip and _attacks(kind, color, squares[slot], occupied) >> target & 1:
+            return True
+    return False
+
+
+def _is_legal(ending, turn, squares):
+    """Cases distinctes, pas de pion sur la 1re/8e rangée, camp qui n'a pas le trait hors d'échec."""
+    occupied = 0
+    for sq in squares:
+        if occupied >> sq & 1:
+            return False
+        occupied |= 1 << sq
+    for (color, kind), sq in zip(ending.pieces, squares):
+        if kind == PAWN and not 8 <= sq < 56:
+            return False
+    king = squares[1 - turn]   # Roi du camp qui vient de jouer
+    return not _is_attacked(ending.pieces, squares, king, turn, occupied)
+
+
+class _Generator:
+    """Coups et coups inverses d'une finale ; les sous-finales sont lues dans `bitbases`."""
+
+    def __init__(self, ending, bitbases):
+        self.ending = ending
+        self.bitbases = bitbases
+
+    def successors(self, turn, squares):
+        """
+        Coups légaux du camp au trait.
+        :return: (index internes des positions atteintes, résultats des conversions pour
+                 l'adversaire, nombre total de coups, camp au trait en échec).
+        """
+        ending = self.ending
+        pieces = ending.pieces
+        occupied = 0
+        own = 0
+        for (color, _), sq in zip(pieces, squares):
+            occupied |= 1 << sq
+            if color == turn:
+                own |= 1 << sq
+        king = squares[turn]
+        in_check = _is_attacked(pieces, squares, king, turn ^ 1, occupied)
+        inside, outside = [], []
+        for slot, (color, kind) in enumerate(pieces):
+            if color != turn:
+                continue
+            src = squares[slot]
+            if kind == PAWN:
+                step = 8 if color == WHITE else -8
+                targets = PAWN_ATTACKS[color][src] & occupied & ~own
+                if not occupied >> (src + step) & 1:
+                    targets |= 1 << (src + step)
+                    start = 8 <= src < 16 if color == WHITE else 48 <= src < 56
+                    if start and not occupied >> (src + 2 * step) & 1:
+                        targets |= 1 << (src + 2 * step)
+            else:
+                targets = _attacks(kind, color, src, occupied) & ~own
+            while targets:
+                low = targets & -targets
+                targets ^= low
+                dst = low.bit_length() - 1
+                captured = -1
+                if occupied & low:
+                    captured = squares.index(dst)
+                    if captured < 2:
+                        continue   # Prise du roi : position illégale, ne se produit pas
+                after = squares[:]
+                after[slot] = dst
+                after_occupied = occupied ^ (1 << src) | low
+                moved_king = dst if slot == turn else king
+                if _is_attacked(pieces, after, moved_king, turn ^ 1, after_occupied, captured):
+                    continue
+                promotion = kind == PAWN and (dst >= 56 or dst < 8)
+                if captured < 0 and not promotion:
+                    inside.append(ending.encode(turn ^ 1, after))
+                    continue
+                placement = [(c * 6 + k, sq) for slot2, ((c, k), sq) in enumerate(zip(pieces, after))
+                             if slot2 != captured and not (promotion and slot2 == slot)]
+                for new_kind in (_PROMOTIONS if promotion else (None,)):
+                    extra = [(color * 6 + new_kind, dst)] if promotion else []
+                    value = self.bitbases.probe_placement(placement + extra, turn ^ 1)
+                    if value is None:
+                        raise ValueError(f"{ending.name} : finale manquante pour une conversion")
+                    outside.append(value)
+        return inside, outside, len(inside) + len(outside), in_check
+
+    def predecessors(self, turn, squares):
+        """Index des positions dont un coup sans prise ni promotion mène à (turn, squares)."""
+        ending = self.ending
+        pieces = ending.pieces
+        mover = turn ^ 1
+        occupied = 0
+        for sq in squares:
+            occupied |= 1 << sq
+        result = []
+        for slot, (color, kind) in enumerate(pieces):
+            if color != mover:
+                continue
+            dst = squares[slot]
+            if kind == PAWN:
+                step = 8 if color == WHITE else -8
+                sources = 0
+                back = dst - step
+                if 8 <= back < 56 and not occupied >> back & 1:
+                    sources |= 1 << back
+                    double = dst - 2 * step
+                    if (24 <= dst < 32 if color == WHITE else 32 <= dst < 40) and not occupied >> double & 1:
+                        sources |= 1 << double
+            else:
+                sources = _attacks(kind, color, dst, occupied) & ~occupied
+            while sources:
+                low = sources & -sources
+                sources ^= low
+                before = squares[:]
+                before[slot] = low.bit_length() - 1
+                if _is_legal(ending, mover, before):
+                    result.append(ending.encode(mover, before))
+        return result
+
+
+_worker_generator = None
+
+
+def _init_worker(name, directory):
+    global _worker_generator
+    _worker_generator = _Generator(Ending(name), Bitbases(directory))
+
+
+def _first_pass(start, stop):
+    """
+    Première passe sur les index [start, stop) : résultats immédiats (mats, pats, conversions)
+    et nombre de coups encore à réfuter pour les autres positions.
+    """
+    generator = _worker_generator
+    ending = generator.ending
+    values = bytearray(stop - start)
+    remaining = bytearray(stop - start)
+    for index in range(start, stop):
+        turn, squares = ending.decode(index)
+        if not _is_legal(ending, turn, squares):
+            values[index - start] = ILLEGAL
+            continue
+        inside, outside, total, in_check = generator.successors(turn, squares)
+        if LOSS in outside:
+            values[index - start] = WIN
+        elif total == 0:
+            values[index - start] = LOSS if in_check else DRAW   # Mat ou pat
+        elif not inside and DRAW not in outside:
+            values[index - start] = LOSS   # Toutes les conversions perdent
+        else:
+            # Une conversion nulle n'est jamais réfutée : elle garde la position hors de la perte
+            remaining[index - start] = len(inside) + (DRAW in outside)
+    return start, bytes(values), bytes(remaining)
+
+
+def generate_ending(name, directory=BITBASE_DIR, workers=None, chunks_per_worker=8, log=print):
+    """
+    Calcule une finale et écrit <directory>/<finale>.bin (les sous-finales doivent exister).
+    :param workers: Nombre de processus pour la première passe (par défaut : nombre de cœurs).
+    :return: Dictionnaire {name, win, draw, loss, illegal, time}.
+    """
+    start_time = time.perf_counter()
+    ending = Ending(name)
+    workers = workers or os.cpu_count() or 1
+    values = bytearray(ending.size)
+    remaining = bytearray(ending.size)
+    chunk = max(4096, ending.size // (workers * chunks_per_worker))
+    bounds = [(start, min(start + chunk, ending.size)) for start in range(0, ending.size, chunk)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(ending.name, directory)) as pool:
+        for start, chunk_values, chunk_remaining in pool.map(_first_pass, *zip(*bounds)):
+            values[start:start + len(chunk_values)] = chunk_values
+            remaining[start:start + len(chunk_remaining)] = chunk_remaining
+    first_pass = time.perf_counter() - start_time
+
+    # Rétrogradation : chaque position résolue met à jour ses prédécesseurs non résolus
+    generator = _Generator(ending, None)
+    queue = deque(index for index, value in enumerate(values) if value == WIN or value == LOSS)
+    while queue:
+        index = queue.popleft()
+        value = values[index]
+        for previous in generator.predecessors(*ending.decode(index)):
+            if values[previous] != UNKNOWN or not remaining[previous]:
+                continue
+            if value == LOSS:
+                values[previous] = WIN
+                queue.append(previous)
+            else:
+                remaining[previous] -= 1
+                if not remaining[previous]:
+                    values[previous] = LOSS
+                    queue.append(previous)
+
+    os.makedirs(directory, exist_ok=True)
+    packed = bytearray(ending.size // 4)
+    for shift in range(4):
+        view = values[shift::4]
+        for i, value in enumerate(view):
+            if value:
+                packed[i] |= value << (2 * shift)
+    path = os.path.join(directory, ending.name + ".bin")
+    with open(path + ".tmp", "wb") as file:
+        file.write(packed)
+    os.replace(path + ".tmp", path)
+
+    stats = {"name": ending.name, "win": values.count(WIN), "draw": values.count(DRAW),
+             "loss": values.count(LOSS), "illegal": values.count(ILLEGAL),
+             "time": time.perf_counter() - start_time}
+    log(f"{ending.name} : {stats['win']} gains, {stats['draw']} nulles, {stats['loss']} pertes "
+        f"en {stats['time']:.1f} s (première passe {first_pass:.1f} s)")
+    return stats
+
+
+def generation_order(names):
+    """Finales demandées et leurs sous-finales, chaque finale après celles dont elle dépend."""
+    ordered, visiting = [], set()
+
+    def visit(name):
+        name = _canonical(Ending(name).name)
+        if name in ordered or name in DRAWN_ENDINGS:
+            return
+        if name in visiting:
+            raise ValueError(f"Dépendance circulaire : {name}")
+        visiting.add(name)
+        for sub in sorted(Ending(name).sub_endings()):
+            visit(sub)
+        ordered.append(name)
+
+    for name in names:
+        visit(name)
+    return ordered
+
+
+def generate(names=DEFAULT_ENDINGS, directory=BITBASE_DIR, workers=None, force=False, log=print):
+    """Génère les finales demandées (et leurs sous-finales manquantes) dans l'ordre des dépendances."""
+    results = []
+    for name in generation_order(names):
+        if not force and os.path.exists(os.path.join(directory, name + ".bin")):
+            log(f"{name} : déjà présente")
+            continue
+        results.append(generate_ending(name, directory, workers, log=log))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Génération des bitbases de finales (gain/nulle/perte)")
+    parser.add_argument("endings", nargs="*", default=list(DEFAULT_ENDINGS), help="Finales (KQK, KRK, KPK...)")
+    parser.add_argument("--directory", default=BITBASE_DIR, help="Répertoire de sortie")
+    parser.add_argument("--workers", type=int, help="Nombre de processus (par défaut : nombre de cœurs)")
+    parser.add_argument("--force", action="store_true", help="Recalcule les finales déjà présentes")
+    args = parser.parse_args(argv)
+    generate(args.endings, args.directory, args.workers, args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
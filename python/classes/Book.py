@@ -0,0 +1,209 @@
+"""
+Livres d'ouvertures au format Polyglot (.bin) : lecture et construction.
+
+Un livre est une suite d'entrées de 16 octets (big-endian) triées par clé :
+clé Polyglot (8 octets), coup (2), poids (2), apprentissage (4). Le fichier est projeté en
+mémoire (mmap) et la clé de la position est cherchée par dichotomie : une consultation ne lit
+que la vingtaine d'entrées visitées, donc quelques pages du fichier, quelle que soit sa taille.
+
+La clé Polyglot n'est pas la clé de Zobrist de Position (nombres aléatoires différents) :
+elle est recalculée depuis les bitboards à chaque consultation (quelques microsecondes).
+"""
+import mmap
+import os
+import random
+import struct
+
+from classes.PolyglotRandom import RANDOM64
+from classes.Position import CASTLING_ROOK, MOVE_CASTLING, MOVE_PROMOTION, PAWN, PAWN_ATTACKS, WHITE, iter_bits
+
+ENTRY = struct.Struct(">QHHI")   # Clé, coup, poids, apprentissage
+KEY = struct.Struct(">Q")
+MAX_WEIGHT = 0xFFFF
+
+# Index Polyglot d'une pièce : 2 * type + 1 pour les blancs (pion noir = 0, pion blanc = 1, ...)
+PIECE_KEYS = tuple(RANDOM64[64 * (2 * (piece % 6) + (piece // 6 == WHITE)):][:64] for piece in range(12))
+CASTLING_KEYS = RANDOM64[768:772]   # Petit et grand roque blancs, puis noirs (bits CASTLE_*)
+EP_KEYS = RANDOM64[772:780]
+TURN_KEY = RANDOM64[780]
+
+# Polyglot note le roque « roi prend sa tour » : case d'arrivée du roi -> case de la tour
+_CASTLING_TARGET = {king_to: rook_from for king_to, (rook_from, _) in CASTLING_ROOK.items()}
+
+
+def polyglot_key(position):
+    """Clé Polyglot d'une position (en passant compté seulement si un pion peut prendre)."""
+    key = 0
+    for piece, bb in enumerate(position.pieces):
+        keys = PIECE_KEYS[piece]
+        for sq in iter_bits(bb):
+            key ^= keys[sq]
+    for bit in range(4):
+        if position.castling >> bit & 1:
+            key ^= CASTLING_KEYS[bit]
+    ep = position.ep_square
+    us = position.turn
+    if ep >= 0 and PAWN_ATTACKS[us ^ 1][ep] & position.pieces[us * 6 + PAWN]:
+        key ^= EP_KEYS[ep & 7]
+    if us == WHITE:
+        key ^= TURN_KEY
+    return key
+
+
+def encode_book_move(move):
+    """Coup encodé (Position) -> coup Polyglot sur 16 bits."""
+    src, dst, flag = move & 63, (move >> 6) & 63, (move >> 12) & 3
+    if flag == MOVE_CASTLING:
+        dst = _CASTLING_TARGET[dst]
+    promotion = move >> 14 if flag == MOVE_PROMOTION else 0   # Cavalier 1 ... dame 4, comme Polyglot
+    return dst | (src << 6) | (promotion << 12)
+
+
+def decode_book_move(position, raw):
+    """
+    Coup Polyglot -> coup légal encodé de la position.
+    :return: Coup encodé, ou None si le coup du livre n'est pas légal ici (collision de clé).
+    """
+    return legal_book_moves(position).get(raw)
+
+
+def legal_book_moves(position):
+    """Coups légaux de la position indexés par leur codage Polyglot."""
+    return {encode_book_move(move): move for move in position.legal_moves()}
+
+
+class OpeningBook:
+    """
+    Livre Polyglot projeté en mémoire (lecture seule).
+    :param path: Fichier .bin.
+    :raises OSError: Si le fichier ne peut être ouvert.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self.count = size // ENTRY.size
+        self._map = b""
+        if self.count:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+                self._map.madvise(mmap.MADV_RANDOM)  # Pas de lecture anticipée autour des pages visitées
+
+    def __len__(self):
+        """Nombre d'entrées du livre."""
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Libère la projection et le fichier."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._map = b""
+        self.count = 0
+        self._file.close()
+
+    def _first_index(self, key):
+        """Index de la première entrée de clé >= key (dichotomie sur les clés seules)."""
+        data, low, high = self._map, 0, self.count
+        unpack = KEY.unpack_from
+        while low < high:
+            middle = (low + high) >> 1
+            if unpack(data, middle * 16)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def entries(self, key):
+        """
+        Entrées brutes d'une clé Polyglot.
+        :return: Liste de (coup Polyglot, poids, apprentissage).
+        """
+        result = []
+        index = self._first_index(key)
+        data = self._map
+        while index < self.count:
+            entry_key, raw, weight, learn = ENTRY.unpack_from(data, index * 16)
+            if entry_key != key:
+                break
+            result.append((raw, weight, learn))
+            index += 1
+        return result
+
+    def moves(self, position):
+        """
+        Coups du livre pour une position, convertis en coups légaux.
+        :return: Liste de (coup encodé, poids), par poids décroissant.
+        """
+        entries = self.entries(polyglot_key(position))
+        if not entries:
+            return []
+        legal = legal_book_moves(position)   # Une seule génération pour toutes les entrées
+        moves = [(legal[raw], weight) for raw, weight, _ in entries if raw in legal]
+        moves.sort(key=lambda item: -item[1])
+        return moves
+
+    def choose(self, position, rng=random, minimum_weight=1):
+        """
+        Tire un coup du livre au hasard, proportionnellement aux poids.
+        :param minimum_weight: Les coups de poids inférieur sont ignorés.
+        :return: Coup encodé, ou None si la position n'est pas dans le livre.
+        """
+        moves = [(move, weight) for move, weight in self.moves(position) if weight >= minimum_weight]
+        if not moves:
+            return None
+        return rng.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+
+def _result_scores(result):
+    """Points (sur 2) du camp blanc puis noir selon le résultat PGN."""
+    if result == "1-0":
+        return 2, 0
+    if result == "0-1":
+        return 0, 2
+    return 1, 1   # Nulle ou résultat inconnu
+
+
+def build_book(games, output, max_ply=24, min_games=1):
+    """
+    Construit un livre Polyglot depuis des parties (classes/Pgn.py).
+    Poids d'un coup = 2 × victoires + nulles du camp qui l'a joué (ramené à 16 bits si besoin).
+    :param games: Itérable de PgnGame (par exemple iter_games(chemin)).
+    :param output: Fichier .bin à écrire.
+    :param max_ply: Nombre de demi-coups retenus au début de chaque partie.
+    :param min_games: Nombre minimal de parties où le coup a été joué.
+    :return: Dictionnaire {games, errors, entries}.
+    """
+    from classes.Pgn import PgnError
+
+    stats = {}   # (clé, coup Polyglot) -> [poids, parties]
+    games_read = errors = 0
+    for game in games:
+        games_read += 1
+        scores = _result_scores(game.result)
+        try:
+            for ply, (position, move) in enumerate(game.iter_moves()):
+                if ply >= max_ply:
+                    break
+                entry = stats.setdefault((polyglot_key(position), encode_book_move(move)), [0, 0])
+                entry[0] += scores[position.turn]
+                entry[1] += 1
+        except PgnError:
+            errors += 1   # Les coups lus avant l'erreur sont conservés
+
+    kept = [(key, raw, weight) for (key, raw), (weight, count) in stats.items()
+            if count >= min_games and weight > 0]
+    heaviest = max((weight for _, _, weight in kept), default=0)
+    if heaviest > MAX_WEIGHT:
+        kept = [(key, raw, max(1, weight * MAX_WEIGHT // heaviest)) for key, raw, weight in kept]
+    kept.sort(key=lambda entry: (entry[0], -entry[2]))
+    with open(output, "wb") as file:
+        for key, raw, weight in kept:
+            file.write(ENTRY.pack(key, raw, weight, 0))
+    return {"games": games_read, "errors": errors, "entries": len(kept)}
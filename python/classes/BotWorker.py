@@ -0,0 +1,83 @@
+"""
+Calcul des coups du bot hors de la boucle d'événements Tk.
+
+La recherche tourne dans un thread de travail sur une copie de la position ; le
+résultat est déposé dans une file (queue.Queue) que l'interface relève avec after().
+Toute recherche peut être annulée : son résultat est alors ignoré.
+"""
+import queue
+import threading
+
+
+class BotWorker:
+    """
+    Exécute Engine.search dans un thread et transmet les résultats de façon thread-safe.
+    :param engine: Moteur utilisé pour les recherches (un seul thread l'utilise à la fois).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.results = queue.Queue()
+        self._thread = None
+        self._stop_event = None
+        self._request_id = 0
+
+    @property
+    def busy(self):
+        """True si une recherche est en cours ou si son résultat n'a pas encore été relevé."""
+        return (self._thread is not None and self._thread.is_alive()) or not self.results.empty()
+
+    def start(self, position, movetime=None, depth=None, nodes=None):
+        """
+        Lance une recherche en arrière-plan (annule la précédente s'il y en a une).
+        :param position: Position à analyser ; elle est copiée, l'appelant peut continuer à la modifier.
+        """
+        self.cancel()
+        # L'ancienne recherche s'arrête au prochain contrôle de budget (quelques ms)
+        self.join()
+        self._request_id += 1
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(position.copy(), movetime, depth, nodes, self._request_id, self._stop_event),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, position, movetime, depth, nodes, request_id, stop_event):
+        """Corps du thread : recherche puis dépôt du résultat dans la file."""
+        try:
+            result = self.engine.search(position, depth=depth, movetime=movetime, nodes=nodes,
+                                        stop_event=stop_event)
+        except Exception as e:
+            result = {"move": None, "error": e}
+        if not stop_event.is_set():
+            self.results.put((request_id, result))
+
+    def cancel(self):
+        """Interrompt la recherche en cours ; un résultat déjà calculé est abandonné."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        self._request_id += 1
+        while not self.results.empty():
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                break
+
+    def join(self):
+        """Attend la fin du thread de recherche (après cancel(), quelques ms au plus)."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll(self):
+        """
+        Relève le résultat sans bloquer (à appeler depuis after()).
+        :return: Dictionnaire renvoyé par Engine.search, ou None si rien n'est prêt.
+        """
+        try:
+            request_id, result = self.results.get_nowait()
+        except queue.Empty:
+            return None
+        return result if request_id == self._request_id else None
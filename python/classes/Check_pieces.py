@@ -1,17 +1,118 @@
+"""
+Vérification rapide des cases d'arrivée des pièces pour ChessUI.
+
+Toutes les tables sont calculées une seule fois à l'import. Les cases sont numérotées dans
+les coordonnées de l'interface : index = row * 8 + col (row 0 = 8e rangée, col 0 = colonne a).
+Un ensemble de cases est un entier de 64 bits, si bien qu'une vérification se résume à une
+recherche dans un dictionnaire et à un test de bit.
+"""
+import time
+
+SQUARE_NAMES = tuple(f"{chr(ord('a') + col)}{8 - row}" for row in range(8) for col in range(8))
+SQUARE_INDEX = {name: index for index, name in enumerate(SQUARE_NAMES)}
+
+PIECE_TYPES = {
+    "wp": "pion", "wn": "cavalier", "wb": "fou blanc", "wr": "tour", "wq": "reine", "wk": "roi",
+    "bp": "pion", "bn": "cavalier", "bb": "fou noir", "br": "tour", "bq": "reine", "bk": "roi",
+}
+
+ALL_SQUARES = (1 << 64) - 1
+LIGHT_SQUARES = sum(1 << (row * 8 + col) for row in range(8) for col in range(8) if (row + col) % 2 == 0)
+DARK_SQUARES = ALL_SQUARES ^ LIGHT_SQUARES
+
+# Cases d'arrivée autorisées par type de pièce (un fou reste sur la couleur de ses cases)
+TARGET_MASKS = {
+    "pion": ALL_SQUARES, "cavalier": ALL_SQUARES, "tour": ALL_SQUARES,
+    "reine": ALL_SQUARES, "roi": ALL_SQUARES,
+    "fou blanc": LIGHT_SQUARES, "fou noir": DARK_SQUARES,
+}
+PIECE_TARGETS = {piece: TARGET_MASKS[piece_type] for piece, piece_type in PIECE_TYPES.items()}
+
+ROOK_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+KNIGHT_STEPS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_STEPS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+
+def _step_mask(row, col, steps):
+    return sum(1 << ((row + dr) * 8 + col + dc) for dr, dc in steps
+               if 0 <= row + dr < 8 and 0 <= col + dc < 8)
+
+
+def _ray(row, col, dr, dc):
+    """Cases (index) rencontrées depuis (row, col) dans la direction (dr, dc), dans l'ordre."""
+    squares = []
+    row, col = row + dr, col + dc
+    while 0 <= row < 8 and 0 <= col < 8:
+        squares.append(row * 8 + col)
+        row, col = row + dr, col + dc
+    return squares
+
+
+def _pawn_mask(row, col, forward, start_row):
+    mask = _step_mask(row, col, ((forward, -1), (forward, 0), (forward, 1)))
+    if row == start_row:
+        mask |= 1 << ((row + 2 * forward) * 8 + col)
+    return mask
+
+
+# Rayons des pièces à longue portée : RAYS[direction][origine] = masque des cases de la direction
+RAYS = {direction: tuple(sum(1 << index for index in _ray(row, col, *direction))
+                         for row in range(8) for col in range(8))
+        for direction in KING_STEPS}
+
+# BETWEEN[origine][arrivée] = cases strictement entre les deux si elles sont alignées, sinon 0
+BETWEEN = tuple([0] * 64 for _ in range(64))
+for _origin in range(64):
+    for _direction in KING_STEPS:
+        _passed = 0
+        for _index in _ray(_origin // 8, _origin % 8, *_direction):
+            BETWEEN[_origin][_index] = _passed
+            _passed |= 1 << _index
+BETWEEN = tuple(tuple(row) for row in BETWEEN)
+
+_ROOK_MASKS = tuple(sum(RAYS[d][index] for d in ROOK_DIRECTIONS) for index in range(64))
+_BISHOP_MASKS = tuple(sum(RAYS[d][index] for d in BISHOP_DIRECTIONS) for index in range(64))
+
+# Cases atteignables depuis chaque origine, échiquier vide, par pièce (avance et prises du pion,
+# roque du roi depuis sa case initiale) ; les pièces glissantes sont limitées par BETWEEN
+REACH_MASKS = {
+    "wp": tuple(_pawn_mask(index // 8, index % 8, -1, 6) for index in range(64)),
+    "bp": tuple(_pawn_mask(index // 8, index % 8, 1, 1) for index in range(64)),
+    "wn": tuple(_step_mask(index // 8, index % 8, KNIGHT_STEPS) for index in range(64)),
+    "wb": _BISHOP_MASKS,
+    "wr": _ROOK_MASKS,
+    "wq": tuple(rook | bishop for rook, bishop in zip(_ROOK_MASKS, _BISHOP_MASKS)),
+    "wk": tuple(_step_mask(index // 8, index % 8, KING_STEPS) for index in range(64)),
+}
+for _piece in ("n", "b", "r", "q", "k"):
+    REACH_MASKS["b" + _piece] = REACH_MASKS["w" + _piece]
+REACH_MASKS["wk"] = tuple(mask | (0b01000100 << 56 if index == 60 else 0)
+                          for index, mask in enumerate(REACH_MASKS["wk"]))
+REACH_MASKS["bk"] = tuple(mask | (0b01000100 if index == 4 else 0)
+                          for index, mask in enumerate(REACH_MASKS["bk"]))
+
+SLIDING_PIECES = frozenset(("wb", "wr", "wq", "bb", "br", "bq"))
+
+
+def occupancy(board):
+    """
+    Masque des cases occupées d'un échiquier de l'interface.
+    :param board: Liste de 8 rangées de 8 identifiants ("" pour une case vide).
+    """
+    return sum(1 << (row * 8 + col) for row in range(8) for col in range(8) if board[row][col])
+
+
 class CheckPieces:
     def __init__(self):
         """
         Initialise la classe avec le dictionnaire des mouvements possibles.
-        :param pieces_dict: Dictionnaire contenant les mouvements possibles pour chaque type de pièce.
+        :param pieces_dict: Cases autorisées pour chaque type de pièce (dérivé de TARGET_MASKS,
+                            conservé pour les anciens appels).
         """
-        self.pieces_dict = {  
-            'pion' : ('a2','b1','a4','b3','c2','d1','a6','b5','c4','d3','e2','f1','a8','b7','c6','d5','e4','f3','g2','h1','c8','d7','e6','f5','g4','h3','e8','f7','g6','h5','g8','h7','a1','a3','b2','c1','a5','b4','c3','d2','e1','a7','b6','c5','d4','e3','f2','g1','b8','c7','d6','e5','f4','g3','h2','d8','e7','f6','g5','h4','f8','g7','h6','h8'),
-            'fou blanc' : ('a2','b1','a4','b3','c2','d1','a6','b5','c4','d3','e2','f1','a8','b7','c6','d5','e4','f3','g2','h1','c8','d7','e6','f5','g4','h3','e8','f7','g6','h5','g8','h7'),
-            'fou noir' : ('a1','a3','b2','c1','a5','b4','c3','d2','e1','a7','b6','c5','d4','e3','f2','g1','b8','c7','d6','e5','f4','g3','h2','d8','e7','f6','g5','h4','f8','g7','h6','h8'),
-            'cavalier' : ('a2','b1','a4','b3','c2','d1','a6','b5','c4','d3','e2','f1','a8','b7','c6','d5','e4','f3','g2','h1','c8','d7','e6','f5','g4','h3','e8','f7','g6','h5','g8','h7','a1','a3','b2','c1','a5','b4','c3','d2','e1','a7','b6','c5','d4','e3','f2','g1','b8','c7','d6','e5','f4','g3','h2','d8','e7','f6','g5','h4','f8','g7','h6','h8'),
-            'tour' : ('a2','b1','a4','b3','c2','d1','a6','b5','c4','d3','e2','f1','a8','b7','c6','d5','e4','f3','g2','h1','c8','d7','e6','f5','g4','h3','e8','f7','g6','h5','g8','h7','a1','a3','b2','c1','a5','b4','c3','d2','e1','a7','b6','c5','d4','e3','f2','g1','b8','c7','d6','e5','f4','g3','h2','d8','e7','f6','g5','h4','f8','g7','h6','h8'),
-            'reine' : ('a2','b1','a4','b3','c2','d1','a6','b5','c4','d3','e2','f1','a8','b7','c6','d5','e4','f3','g2','h1','c8','d7','e6','f5','g4','h3','e8','f7','g6','h5','g8','h7','a1','a3','b2','c1','a5','b4','c3','d2','e1','a7','b6','c5','d4','e3','f2','g1','b8','c7','d6','e5','f4','g3','h2','d8','e7','f6','g5','h4','f8','g7','h6','h8'),
-            'roi' : ('a2','b1','a4','b3','c2','d1','a6','b5','c4','d3','e2','f1','a8','b7','c6','d5','e4','f3','g2','h1','c8','d7','e6','f5','g4','h3','e8','f7','g6','h5','g8','h7','a1','a3','b2','c1','a5','b4','c3','d2','e1','a7','b6','c5','d4','e3','f2','g1','b8','c7','d6','e5','f4','g3','h2','d8','e7','f6','g5','h4','f8','g7','h6','h8')}
+        self.pieces_dict = {piece_type: frozenset(name for index, name in enumerate(SQUARE_NAMES)
+                                                  if mask >> index & 1)
+                            for piece_type, mask in TARGET_MASKS.items()}
 
     def is_valid_move(self, piece_type, target_square):
         """
@@ -20,9 +121,9 @@ class CheckPieces:
         :param target_square: La case cible sous forme de chaîne (par exemple, 'a3').
         :return: True si le déplacement est valide, False sinon.
         """
-        if piece_type in self.pieces_dict:
-            return target_square in self.pieces_dict[piece_type]
-        return False
+        mask = TARGET_MASKS.get(piece_type)
+        index = SQUARE_INDEX.get(target_square)
+        return mask is not None and index is not None and bool(mask >> index & 1)
 
     def get_piece_type(self, piece):
         """
@@ -30,33 +131,7 @@ class CheckPieces:
         :param piece: Identifiant de la pièce (par exemple, 'wp', 'bp').
         :return: Type de la pièce (par exemple, 'pion', 'fou blanc', etc.).
         """
-        if piece.startswith('w'):  # Pièces blanches
-            if piece == "wp":
-                return "pion"
-            elif piece == "wr":
-                return "tour"
-            elif piece == "wn":
-                return "cavalier"
-            elif piece == "wb":
-                return "fou blanc"
-            elif piece == "wq":
-                return "reine"
-            elif piece == "wk":
-                return "roi"
-        elif piece.startswith('b'):  # Pièces noires
-            if piece == "bp":
-                return "pion"
-            elif piece == "br":
-                return "tour"
-            elif piece == "bn":
-                return "cavalier"
-            elif piece == "bb":
-                return "fou noir"
-            elif piece == "bq":
-                return "reine"
-            elif piece == "bk":
-                return "roi"
-        return None
+        return PIECE_TYPES.get(piece)
 
     def get_square_name(self, row, col):
         """
@@ -65,17 +140,64 @@ class CheckPieces:
         :param col: Colonne de la case.
         :return: Nom de la case sous forme de chaîne.
         """
-        letter = chr(ord('a') + col)
-        number = str(8 - row)
-        return f"{letter}{number}"
+        if 0 <= row < 8 and 0 <= col < 8:
+            return SQUARE_NAMES[row * 8 + col]
+        return f"{chr(ord('a') + col)}{8 - row}"
+
+    def is_reachable(self, piece, source_row, source_col, target_row, target_col, occupied=0):
+        """
+        Vérifie que la pièce peut atteindre la case cible depuis sa case de départ.
+        Seule la géométrie du déplacement est contrôlée (ni échec, ni couleur des pièces prises).
+        :param occupied: Masque des cases occupées (voir occupancy) ; une pièce glissante ne peut
+                         pas traverser une case occupée.
+        """
+        masks = REACH_MASKS.get(piece)
+        if masks is None or not (0 <= source_row < 8 and 0 <= source_col < 8
+                                 and 0 <= target_row < 8 and 0 <= target_col < 8):
+            return False
+        source = source_row * 8 + source_col
+        target = target_row * 8 + target_col
+        if not masks[source] >> target & 1:
+            return False
+        return piece not in SLIDING_PIECES or not BETWEEN[source][target] & occupied
 
     # Fonction résumé pour ChessUI (en gros pour pas vous casser la tête)
-    def verify_move(self, piece, target_row, target_col):
-        piece_type = self.get_piece_type(piece)  # Obtenir le type de la pièce
-        target_square = self.get_square_name(target_row, target_col)  # Obtenir le nom de la case cible
-        if self.is_valid_move(piece_type, target_square): # Vérifier si le mouvement est valide
+    def verify_move(self, piece, target_row, target_col, source_row=None, source_col=None, occupied=0):
+        """
+        Vérifie la case d'arrivée d'une pièce ; si la case de départ est donnée, vérifie aussi
+        qu'elle est atteignable (voir is_reachable).
+        """
+        mask = PIECE_TARGETS.get(piece)
+        if mask is None or not (0 <= target_row < 8 and 0 <= target_col < 8):
+            return False
+        if not mask >> (target_row * 8 + target_col) & 1:
+            return False
+        if source_row is None:
             return True
-        return False
+        return self.is_reachable(piece, source_row, source_col, target_row, target_col, occupied)
+
+
+def benchmark(calls=200000):
+    """
+    Mesure le coût d'un appel à verify_move (case d'arrivée seule, puis avec case de départ).
+    :return: Dictionnaire {nom du cas: nanosecondes par appel}.
+    """
+    checker = CheckPieces()
+    cases = [(piece, index // 8, index % 8) for piece in PIECE_TYPES for index in range(64)]
+    cases = (cases * (calls // len(cases) + 1))[:calls]
+    occupied = 0xFFFF | 0xFFFF << 48   # Cases occupées de la position initiale
+    results = {}
+    verify = checker.verify_move
+    start = time.perf_counter()
+    for piece, row, col in cases:
+        verify(piece, row, col)
+    results["verify_move"] = (time.perf_counter() - start) / calls * 1e9
+    start = time.perf_counter()
+    for piece, row, col in cases:
+        verify(piece, row, col, 4, 3, occupied)
+    results["verify_move (départ d4)"] = (time.perf_counter() - start) / calls * 1e9
+    return results
+
 
 # Code à ajouter dans Chess UI
 
@@ -97,4 +219,4 @@ if self.checker.verify_move(piece, target_row, target_col):
     self.board[target_row][target_col] = piece
 
 self.selected_piece = None
-"""
\ No newline at end of file
+"""
@@ -1,12 +1,23 @@
 import tkinter as tk
+import traceback
 from tkinter import filedialog
-import io
-import chess
 from datetime import date
 from PIL import Image, ImageTk
 from chess_ICEA_main import *  # Contient probablement les constantes (ex : START_POSITION)
 from classes.Check_pieces import CheckPieces  # Classe pour vérifier les mouvements valides
-import random
+from classes.Position import Position, square, PIECE_INDEX, PIECE_NAMES, EMPTY, WHITE  # Modèle bitboard sans interface graphique
+from classes.Fen import parse_fen, format_fen  # Lecture / écriture de la notation FEN
+from classes.Pgn import read_game  # Lecture des parties PGN
+from classes.GameHistory import GameHistory  # Historique compact pour la navigation PGN
+from classes.GameStatus import GameStatus, CHECKMATE, CHECK, STALEMATE  # Échec, mat et nulles
+from classes.PlaybackController import PlaybackController  # Lecture animée d'une partie
+from classes.SpriteCache import SpriteCache  # Cache des images de pièces par taille de case
+from classes.Engine import Engine  # Moteur de recherche alpha-bêta
+from classes.BotWorker import BotWorker  # Recherche du bot dans un thread séparé
+from classes.Book import OpeningBook  # Livre d'ouvertures Polyglot
+from classes.Bitbase import WIN, LOSS  # Résultats des finales connues
+
+MIN_SQUARE_SIZE = 20  # Taille minimale d'une case en pixels lors d'un redimensionnement
 
 class ChessUI:
     def __init__(self, main_window, root_frame, board_size, square_size, retour_menu_callback=None):
@@ -19,9 +30,12 @@ class ChessUI:
         self.LIGHT_COLOR = LIGHT_COLOR
         self.DARK_COLOR = DARK_COLOR
         self.PIECE_SYMBOLS = PIECE_SYMBOLS
+        self.sprites = SpriteCache(PIECE_SYMBOLS)  # Images des pièces rendues une fois par taille de case
         self.FEN_SYMBOLS = FEN_SYMBOLS
         self.START_POSITION = START_POSITION
         self.board = [row[:] for row in self.START_POSITION]  # Copie de la position initiale
+        self.position = Position.from_board(self.board)  # Miroir bitboard de self.board
+        self.status = GameStatus(self.position)  # Échec, mat et nulles, mis à jour à chaque coup
 
         # Dimensions de l’échiquier
         self.BOARD_SIZE = board_size
@@ -35,7 +49,9 @@ class ChessUI:
 
         # Création du cadre principal
         frame = tk.Frame(self.root)
-        frame.pack()
+        frame.pack(fill="both", expand=True)
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
 
         # Étiquette du minuteur
         self.timer_label = tk.Label(frame, text="Temps : 00:00", font=("Arial", 12, "bold"))
@@ -47,6 +63,15 @@ class ChessUI:
         # Initialisation du vérificateur de coups
         self.checker = CheckPieces()
 
+        # Moteur de recherche utilisé pour les coups des noirs, exécuté hors du thread Tk
+        self.engine = Engine()
+        self.bot_worker = BotWorker(self.engine)
+        self.bot_after_id = None  # Tâche after() en attente (lancement ou relève du bot)
+        try:
+            self.book = OpeningBook(BOT_BOOK)  # Coups d'ouverture du bot, sans recherche
+        except OSError:
+            self.book = None
+
         #historique des coups
         self.move_history = []
         # Chargement du logo de la fenêtre
@@ -61,7 +86,7 @@ class ChessUI:
 
         # Création du canvas pour l’échiquier
         self.canvas = tk.Canvas(frame, width=canvas_width, height=canvas_height)
-        self.canvas.grid(row=0, column=0)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
 
         # Zone d’affichage de la notation FEN
         self.fen_label = tk.Label(frame, text="FEN :", font=("Arial", 12, "bold"))
@@ -80,52 +105,157 @@ class ChessUI:
         self.flip_button = tk.Button(frame, text="Tourner le plateau", command=self.flip_board)
         self.flip_button.grid(row=1, column=1, sticky="n", padx=10, pady=5)
 
+        # Bouton pour annuler le dernier coup (joueur + réponse des noirs)
+        self.undo_button = tk.Button(frame, text="Annuler le coup", command=self.undo_move)
+        self.undo_button.grid(row=2, column=1, sticky="n", padx=10, pady=5)
+
+        # Boutons nouvelle partie / retour au menu (annulent la réflexion du bot)
+        self.new_game_button = tk.Button(frame, text="Nouvelle partie", command=self.new_game)
+        self.new_game_button.grid(row=3, column=1, sticky="n", padx=10, pady=5)
+        self.menu_button = tk.Button(frame, text="Retour au menu", command=self.return_to_menu)
+        self.menu_button.grid(row=4, column=1, sticky="n", padx=10, pady=5)
+
+        # Partie PGN en cours de consultation (voir load_pgn) et commandes de lecture animée
+        self.game_history = None
+        self.playback = PlaybackController(self, frame)
+        self.playback.frame.grid(row=2, column=0, rowspan=3, sticky="n", pady=5)
+
         # Gestion de la sélection de pièce
         self.selected_piece = None
         self.canvas.bind("<Button-1>", self.on_click)  # Associe le clic gauche à on_click()
 
-        # Dessin initial
+        # Dessin initial : cases et coordonnées sont créées une seule fois, les pièces
+        # sont ensuite mises à jour case par case (voir draw_pieces)
+        self.piece_items = {}  # (ligne, colonne) -> item canvas de la pièce
+        self.square_items = {}  # (ligne, colonne) -> rectangle de la case
+        self.coordinate_items = []  # Lettres a-h puis chiffres 8-1
+        self.flipped = False  # Orientation de l'affichage (voir to_view)
+        self.drawn_board = [[""] * self.BOARD_SIZE for _ in range(self.BOARD_SIZE)]
         self.draw_board()
-        self.draw_pieces()
         self.draw_coordinates()
-        self.update_fen_display()
+        self.layout_board()
+        self.refresh_board()
+
+        # Plateau redimensionnable : la taille des cases suit celle du canvas
+        self.resize_after_id = None
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
         self.current_turn = "w"
 
     def draw_board(self):
-        """Dessine le plateau avec les cases claires et foncées."""
+        """Crée une fois pour toutes les cases claires et foncées (items conservés, tag "square")."""
         for row in range(self.BOARD_SIZE):
             for col in range(self.BOARD_SIZE):
                 color = self.LIGHT_COLOR if (row + col) % 2 == 0 else self.DARK_COLOR
-                x1 = (col + 1) * self.SQUARE_SIZE
-                y1 = row * self.SQUARE_SIZE
-                x2 = x1 + self.SQUARE_SIZE
-                y2 = y1 + self.SQUARE_SIZE
-                self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="")
+                self.square_items[(row, col)] = self.canvas.create_rectangle(
+                    0, 0, 0, 0, fill=color, outline="", tags="square")
+
+    def to_view(self, row, col):
+        """
+        Convertit des coordonnées de self.board en coordonnées d'affichage (et inversement :
+        la transformation est sa propre inverse). Seul l'affichage dépend de l'orientation.
+        """
+        if self.flipped:
+            return self.BOARD_SIZE - 1 - row, self.BOARD_SIZE - 1 - col
+        return row, col
+
+    def square_center(self, row, col):
+        """Coordonnées canvas du centre d'une case de self.board, selon l'orientation."""
+        row, col = self.to_view(row, col)
+        return (col + 1) * self.SQUARE_SIZE + self.SQUARE_SIZE // 2, row * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
 
     def draw_pieces(self):
-        """Place les pièces sur le plateau à partir de self.board."""
-        for row in range(self.BOARD_SIZE):
-            for col in range(self.BOARD_SIZE):
-                piece = self.board[row][col]
-                if piece:
-                    symbol = self.PIECE_SYMBOLS.get(piece, "")
-                    x = (col + 1) * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
-                    y = row * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
-                    self.canvas.create_text(x, y, text=symbol, font=("Arial", 32))
+        """
+        Met à jour les pièces d'après self.board en ne touchant que les cases modifiées.
+        Chaque pièce est une image persistante (tag "piece") tirée du cache de sprites : une
+        pièce qui a bougé est déplacée avec coords(), les autres cases changées sont
+        modifiées, créées ou effacées.
+        """
+        changed = [(row, col) for row in range(self.BOARD_SIZE) for col in range(self.BOARD_SIZE)
+                   if self.board[row][col] != self.drawn_board[row][col]]
+        if not changed:
+            return
+        # Items libérés par les cases modifiées, réutilisables par pièce
+        spare = {}
+        for row, col in changed:
+            item = self.piece_items.pop((row, col), None)
+            if item is not None:
+                spare.setdefault(self.drawn_board[row][col], []).append(item)
+        for row, col in changed:
+            piece = self.board[row][col]
+            self.drawn_board[row][col] = piece
+            if not piece:
+                continue
+            x, y = self.square_center(row, col)
+            if spare.get(piece):
+                item = spare[piece].pop()
+                self.canvas.coords(item, x, y)
+            else:
+                leftovers = [items for items in spare.values() if items]
+                if leftovers:
+                    item = leftovers[0].pop()
+                    self.canvas.coords(item, x, y)
+                    self.canvas.itemconfig(item, image=self.sprites.get(piece, self.SQUARE_SIZE))
+                else:
+                    item = self.canvas.create_image(x, y, image=self.sprites.get(piece, self.SQUARE_SIZE),
+                                                    tags="piece")
+            self.piece_items[(row, col)] = item
+        for items in spare.values():
+            for item in items:
+                self.canvas.delete(item)
 
     def draw_coordinates(self):
-        """Dessine les lettres et chiffres autour du plateau."""
+        """Crée une fois pour toutes les lettres et chiffres autour du plateau (tag "coordinate")."""
         for col in range(self.BOARD_SIZE):
             letter = chr(ord('a') + col)
-            x = (col + 1) * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
-            y = self.BOARD_SIZE * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
-            self.canvas.create_text(x, y, text=letter, font=("Arial", 12, "bold"))
-
+            self.coordinate_items.append(self.canvas.create_text(
+                0, 0, text=letter, font=("Arial", 12, "bold"), tags="coordinate"))
         for row in range(self.BOARD_SIZE):
             number = str(8 - row)
-            x = self.SQUARE_SIZE // 2
-            y = row * self.SQUARE_SIZE + self.SQUARE_SIZE // 2
-            self.canvas.create_text(x, y, text=number, font=("Arial", 12, "bold"))
+            self.coordinate_items.append(self.canvas.create_text(
+                0, 0, text=number, font=("Arial", 12, "bold"), tags="coordinate"))
+
+    def layout_board(self):
+        """Place cases, coordonnées et pièces selon SQUARE_SIZE (après création ou redimensionnement)."""
+        size = self.SQUARE_SIZE
+        for (row, col), item in self.square_items.items():
+            x1, y1 = (col + 1) * size, row * size
+            self.canvas.coords(item, x1, y1, x1 + size, y1 + size)
+        font = ("Arial", max(8, size // 5), "bold")
+        for index, item in enumerate(self.coordinate_items):
+            if index < self.BOARD_SIZE:  # Lettres sous le plateau
+                _, col = self.to_view(0, index)
+                self.canvas.coords(item, (col + 1) * size + size // 2, self.BOARD_SIZE * size + size // 2)
+            else:                        # Chiffres à gauche
+                row, _ = self.to_view(index - self.BOARD_SIZE, 0)
+                self.canvas.coords(item, size // 2, row * size + size // 2)
+            self.canvas.itemconfig(item, font=font)
+        for (row, col), item in self.piece_items.items():
+            self.canvas.coords(item, *self.square_center(row, col))
+            self.canvas.itemconfig(item, image=self.sprites.get(self.drawn_board[row][col], size))
+
+    def on_canvas_resize(self, event):
+        """Redimensionnement de la fenêtre : nouvelle taille de case, appliquée après une courte pause."""
+        size = max(MIN_SQUARE_SIZE, min(event.width, event.height) // (self.BOARD_SIZE + 1))
+        if size == self.SQUARE_SIZE and self.resize_after_id is None:
+            return
+        if self.resize_after_id is not None:
+            self.root.after_cancel(self.resize_after_id)
+        # Un glissement de la souris envoie de nombreux <Configure> : seul le dernier est rendu
+        self.resize_after_id = self.root.after(40, self.resize_board, size)
+
+    def resize_board(self, size):
+        """Change la taille des cases : les sprites des autres tailles sont oubliés."""
+        self.resize_after_id = None
+        if size == self.SQUARE_SIZE:
+            return
+        self.SQUARE_SIZE = size
+        self.sprites.invalidate(keep_size=size)
+        self.layout_board()
+
+    def refresh_board(self):
+        """Redessine uniquement les cases modifiées depuis le dernier affichage, puis la FEN."""
+        self.draw_pieces()
+        self.update_fen_display()
 
     def update_fen_display(self):
         """Met à jour l'affichage de la position FEN dans le champ texte."""
@@ -134,34 +264,19 @@ class ChessUI:
         self.fen_text.insert(tk.END, fen)
 
     def board_to_fen(self):
-        """Convertit self.board en notation FEN."""
-        fen_rows = []
-        for row in self.board:
-            fen_row = ""
-            empty = 0
-            for piece in row:
-                if piece == "":
-                    empty += 1
-                else:
-                    if empty:
-                        fen_row += str(empty)
-                        empty = 0
-                    fen_row += self.FEN_SYMBOLS.get(piece, "")
-            if empty:
-                fen_row += str(empty)
-            fen_rows.append(fen_row)
-        return "/".join(fen_rows) + " w KQkq - 0 1"
-        # return "/".join(fen_rows) + f" {self.current_turn} KQkq - 0 1"
-
+        """Convertit self.board en notation FEN (trait, roques et en passant tirés de self.position)."""
+        squares = [PIECE_INDEX.get(self.board[row][col], EMPTY) for row in range(7, -1, -1) for col in range(8)]
+        position = self.position
+        return format_fen(squares, position.turn, position.castling, position.ep_square,
+                          position.halfmove_clock, position.fullmove_number)
 
     def flip_board(self):
-        """Inverse l’échiquier (haut <-> bas, gauche <-> droite)."""
-        self.board = [row[::-1] for row in self.board[::-1]]
-        self.canvas.delete("all")
-        self.draw_board()
-        self.draw_pieces()
-        self.draw_coordinates()
-        self.update_fen_display()
+        """
+        Inverse l’échiquier (haut <-> bas, gauche <-> droite) à l'affichage seulement :
+        self.board, la position et le bot ne changent pas, les items existants sont déplacés.
+        """
+        self.flipped = not self.flipped
+        self.layout_board()
 
     def on_click(self, event):
         """Gère les clics pour déplacer une pièce."""
@@ -169,6 +284,9 @@ class ChessUI:
         row = event.y // self.SQUARE_SIZE
 
         if 0 <= row < self.BOARD_SIZE and 0 <= col < self.BOARD_SIZE:
+            row, col = self.to_view(row, col)  # Case d'affichage -> case de self.board
+            if self.status.is_over:
+                return  # Partie terminée : plus aucun coup
             if self.selected_piece is None:
                 # Sélectionner une pièce si c’est le bon tour
                 if self.board[row][col] and self.board[row][col][0] == self.current_turn:
@@ -178,87 +296,91 @@ class ChessUI:
                 src_row, src_col = self.selected_piece
                 piece = self.board[src_row][src_col]
 
-                if not self.board[target_row][target_col] or self.board[target_row][target_col][0] != self.current_turn:
-                    if self.is_legal_move(piece, src_row, src_col, target_row, target_col):
-                        # Déplacement valide
-                        self.board[src_row][src_col] = ""
-                        self.board[target_row][target_col] = piece
-
-                        move_str = self.format_move(piece, src_row, src_col, target_row, target_col)
-                        self.move_history.append(move_str)
-                        # Changer tour
-                        self.current_turn = "b"
-                        self.turn_label.config(text="Tour : Noir")
+                # Le coup doit figurer parmi les coups légaux générés (roque, prise en passant
+                # et promotion en dame compris)
+                move = self.position.find_move(square(src_row, src_col), square(target_row, target_col))
+                if move is not None:
+                    # Déplacement valide
+                    self.status.push(move)
+                    self.board = self.position.to_board()
 
+                    move_str = self.format_move(piece, src_row, src_col, target_row, target_col)
+                    self.move_history.append(move_str)
+                    # Changer tour
+                    self.current_turn = "b"
+                    self.update_status_label()
 
-                        self.canvas.delete("all")
-                        self.draw_board()
-                        self.draw_pieces()
-                        self.draw_coordinates()
-                        self.update_fen_display()
+                    self.refresh_board()
 
-                        self.selected_piece = None
+                    self.selected_piece = None
 
-                        
-                        self.root.after(500, self.play_random_black_move)
-                        return  
+                    if not self.status.is_over:
+                        self.bot_after_id = self.root.after(500, self.play_bot_move)
+                    return
                 self.selected_piece = None
- 
+
 
     def fen_to_board(self, fen):
-        """Convertit une chaîne FEN en matrice self.board."""
-        board = []
-        rows = fen.split(" ")[0].split("/")
-        for row in rows:
-            board_row = []
-            for char in row:
-                if char.isdigit():
-                    board_row.extend([""] * int(char))
-                else:
-                    piece = next((k for k, v in self.FEN_SYMBOLS.items() if v == char), "")
-                    board_row.append(piece)
-            board.append(board_row)
-        return board
+        """Convertit une chaîne FEN en matrice self.board (lève FenError si elle est invalide)."""
+        squares = parse_fen(fen).squares
+        return [[PIECE_NAMES[piece] if piece != EMPTY else "" for piece in squares[base:base + 8]]
+                for base in range(56, -1, -8)]
 
     def show_fen(self, fen):
         """Affiche une position spécifique à partir d’une FEN donnée."""
-        self.board = self.fen_to_board(fen)
-        self.canvas.delete("all")
-        self.draw_board()
-        self.draw_pieces()
-        self.draw_coordinates()
-        self.update_fen_display()
+        self.position = Position.from_fen(fen)
+        self.status = GameStatus(self.position)
+        self.board = self.position.to_board()
+        self.current_turn = "w" if self.position.turn == WHITE else "b"
+        self.update_status_label()
+        self.refresh_board()
 
     def pgn_to_fens(self, pgn_text):
-        """Extrait les positions FEN depuis un texte PGN (partie d’échecs)."""
-        fens = []
-        game = chess.pgn.read_game(io.StringIO(pgn_text))
-        board = game.board()
-        fens.append(board.fen())
-        for move in game.mainline_moves():
-            board.push(move)
-            fens.append(board.fen())
-        return fens
+        """
+        Extrait les positions FEN d'un texte PGN (première partie), à la demande.
+        :return: Itérateur de FEN : position initiale puis une position par demi-coup.
+        """
+        game = read_game(pgn_text)
+        return game.fens() if game is not None else iter(())
+
+    def load_pgn(self, pgn_text):
+        """Charge la première partie d'un texte PGN et affiche sa position initiale."""
+        game = read_game(pgn_text)
+        if game is not None:
+            self.load_game(game)
+
+    def load_game(self, game):
+        """Charge une partie lue par classes/Pgn.py (le bot est arrêté pendant la consultation)."""
+        self.cancel_bot()
+        self.game_history = GameHistory.from_game(game)
+        self.show_history_position()
+
+    def show_history_position(self):
+        """Affiche la position courante de self.game_history et met à jour les boutons."""
+        self.position = self.game_history.position.copy()
+        self.position.history = []   # Rien à annuler avant cette position : GameStatus part d'ici
+        self.status = GameStatus(self.position)
+        self.board = self.position.to_board()
+        self.current_turn = "w" if self.position.turn == WHITE else "b"
+        self.update_status_label()
+        self.refresh_board()
+        self.playback.update_controls()
 
     def next_move(self):
-        """Affiche le coup suivant dans une partie PGN."""
-        if self.current_move_index + 1 < len(self.pgn_moves):
-            self.current_move_index += 1
-            self.show_fen(self.pgn_moves[self.current_move_index])
-            self.update_fen_display()
-            self.prev_button.config(state="normal")
-            if self.current_move_index == len(self.pgn_moves) - 1:
-                self.next_button.config(state="disabled")
+        """Affiche le coup suivant dans une partie PGN (un seul coup joué)."""
+        if self.game_history is not None and self.game_history.forward():
+            self.show_history_position()
 
     def prev_move(self):
-        """Affiche le coup précédent dans une partie PGN."""
-        if self.current_move_index > 0:
-            self.current_move_index -= 1
-            self.show_fen(self.pgn_moves[self.current_move_index])
-            self.update_fen_display()
-            self.next_button.config(state="normal")
-            if self.current_move_index == 0:
-                self.prev_button.config(state="disabled")
+        """Affiche le coup précédent dans une partie PGN (un seul coup annulé)."""
+        if self.game_history is not None and self.game_history.back():
+            self.show_history_position()
+
+    def goto_move(self, ply):
+        """Affiche la position après `ply` demi-coups (0 = position initiale)."""
+        if self.game_history is not None:
+            self.game_history.goto(ply)
+            self.show_history_position()
 
     def start_game(self):
         """Lance la boucle principale de l’interface Tkinter."""
@@ -272,104 +394,158 @@ class ChessUI:
         self.timer_label.config(text=time_str)
         self.elapsed_seconds += 1
         self.root.after(1000, self.update_timer)  # Mise à jour chaque seconde
+
     def is_legal_move(self, piece, start_row, start_col, end_row, end_col):
         """
         Vérifie si un mouvement est légal selon les règles classiques d’échecs.
+        Le calcul est délégué au modèle bitboard (classes/Position.py).
         :param piece: identifiant comme "wp", "br", etc.
         :return: True si le coup est autorisé
         """
-        piece_type = self.checker.get_piece_type(piece)
-        dr = end_row - start_row
-        dc = end_col - start_col
-        target = self.board[end_row][end_col]
-
-        # Empêche de capturer sa propre pièce
-        if target and target[0] == piece[0]:
+        src = square(start_row, start_col)
+        if self.position.piece_at(src) != piece:
             return False
+        return self.position.is_pseudo_legal(src, square(end_row, end_col))
+
+    def undo_move(self):
+        """Annule le dernier coup des blancs et la réponse des noirs, sans recopier le plateau."""
+        if self.current_turn != "w" or self.status.ply < 2:
+            return
+        self.status.pop()
+        self.status.pop()
+        self.board = self.position.to_board()
+        self.update_status_label()
+        if self.move_history:
+            self.move_history.pop()
+        self.selected_piece = None
 
-        direction = 1 if piece.startswith('w') else -1  # Blanc vers le haut (-1), noir vers le bas (+1)
-
-        if piece_type == "pion":
-            # Avance simple
-            if dc == 0 and dr == -direction and target == "":
-                return True
-            # Premier coup (2 cases)
-            if dc == 0 and dr == -2 * direction and start_row in (6, 1) and \
-            self.board[start_row - direction][start_col] == "" and target == "":
-                return True
-            # Capture diagonale
-            if abs(dc) == 1 and dr == -direction and target != "" and target[0] != piece[0]:
-                return True
-            return False
+        self.refresh_board()
 
-        elif piece_type == "cavalier":
-            return (abs(dr), abs(dc)) in [(2, 1), (1, 2)]
+    def play_bot_move(self):
+        """
+        Joue le coup des noirs : tiré du livre d'ouvertures si la position y figure, sinon
+        recherché en arrière-plan (budget BOT_MOVE_TIME).
+        """
+        move = self.book.choose(self.position) if self.book is not None else None
+        if move is not None:
+            self.bot_after_id = None
+            self.apply_bot_move(move)
+            return
+        self.bot_worker.start(self.position, movetime=BOT_MOVE_TIME)
+        self.bot_after_id = self.root.after(20, self.poll_bot_move)
+
+    def poll_bot_move(self):
+        """Relève le résultat du bot sans bloquer la boucle Tk ; se reprogramme tant qu'il calcule."""
+        result = self.bot_worker.poll()
+        if result is None:
+            if self.bot_worker.busy:
+                self.bot_after_id = self.root.after(20, self.poll_bot_move)
+            else:
+                self.bot_after_id = None
+            return
+        self.bot_after_id = None
+
+        error = result.get("error")
+        if error is not None:
+            self.abort_bot_move(error)
+        elif result["move"] is not None:
+            print(f"Bot : profondeur {result['depth']}, {result['nodes']} nœuds, "
+                  f"{result['nps']} nœuds/s, score {result['score']}")
+            self.apply_bot_move(result["move"])
+
+    def abort_bot_move(self, error):
+        """
+        Recherche du bot en échec : trace l'exception, annule le dernier coup des blancs et
+        leur rend la main, pour que la partie ne reste pas bloquée sur le tour des noirs.
+        """
+        traceback.print_exception(type(error), error, error.__traceback__)
+        if self.status.ply:
+            self.status.pop()
+            if self.move_history:
+                self.move_history.pop()
+        self.board = self.position.to_board()
+        self.current_turn = "w" if self.position.turn == WHITE else "b"
+        self.selected_piece = None
+        self.refresh_board()
+        self.show_error(f"Erreur du bot ({type(error).__name__}: {error}) : coup annulé, rejouez")
 
-        elif piece_type.startswith("fou"):
-            if abs(dr) != abs(dc):
-                return False
-            return self.is_path_clear(start_row, start_col, end_row, end_col)
+    def apply_bot_move(self, move):
+        """Joue le coup des noirs sur la position et rend la main aux blancs."""
+        self.status.push(move)
+        self.board = self.position.to_board()
 
-        elif piece_type == "tour":
-            if dr != 0 and dc != 0:
-                return False
-            return self.is_path_clear(start_row, start_col, end_row, end_col)
+        # Changer de tour
+        self.current_turn = "w"
+        self.update_status_label()
+
+        # Redessiner l'échiquier
+        self.refresh_board()
+
+    def update_status_label(self):
+        """Affiche le camp au trait, l'échec, ou le résultat quand la partie est terminée."""
+        side = "Blanc" if self.position.turn == WHITE else "Noir"
+        status = self.status.status
+        if status == CHECKMATE:
+            winner = "Noirs" if self.position.turn == WHITE else "Blancs"
+            text = f"Échec et mat : victoire des {winner}"
+        elif status == STALEMATE:
+            text = "Pat : partie nulle"
+        elif self.status.is_over:
+            text = f"Partie nulle ({status})"
+        elif status == CHECK:
+            text = f"Tour : {side} (échec)"
+        else:
+            text = f"Tour : {side}"
+        if not self.status.is_over and self.engine.bitbases is not None:
+            value = self.engine.bitbases.probe(self.position)  # Finale connue : résultat exact
+            if value is not None:
+                outcome = {WIN: "gagnante", LOSS: "perdante"}.get(value)
+                text += f" - finale {outcome} pour les {side}s" if outcome else " - finale nulle"
+        self.turn_label.config(text=text)
+
+    def show_error(self, text):
+        """Signale une erreur dans la console et à la place du camp au trait."""
+        print(text)
+        self.turn_label.config(text=text)
+
+    def cancel_bot(self):
+        """Annule la réflexion du bot en cours ou programmée."""
+        if self.bot_after_id is not None:
+            self.root.after_cancel(self.bot_after_id)
+            self.bot_after_id = None
+        self.bot_worker.cancel()
+
+    def resume(self):
+        """Relance le bot si c'est à lui de jouer (après un retour au jeu ou une annulation)."""
+        if self.current_turn == "b" and self.bot_after_id is None and not self.status.is_over:
+            self.play_bot_move()
+
+    def new_game(self):
+        """Recommence une partie depuis la position initiale."""
+        self.cancel_bot()
+        self.playback.pause()
+        self.game_history = None
+        self.playback.update_controls()
+        self.board = [row[:] for row in self.START_POSITION]
+        self.position = Position.from_board(self.board)
+        self.status = GameStatus(self.position)
+        self.bot_worker.join()   # La recherche annulée utilise encore le moteur jusqu'à son arrêt
+        self.engine.reset()
+        self.move_history = []
+        self.selected_piece = None
+        self.current_turn = "w"
+        self.update_status_label()
+        self.elapsed_seconds = 0
 
-        elif piece_type == "reine":
-            if abs(dr) == abs(dc) or dr == 0 or dc == 0:
-                return self.is_path_clear(start_row, start_col, end_row, end_col)
-            return False
+        self.refresh_board()
 
-        elif piece_type == "roi":
-            return max(abs(dr), abs(dc)) == 1
-
-        return False
-    def is_path_clear(self, start_row, start_col, end_row, end_col):
-        """Vérifie que les cases intermédiaires sont vides entre start et end (pour tour, fou, reine)."""
-        dr = end_row - start_row
-        dc = end_col - start_col
-        step_row = (dr // abs(dr)) if dr != 0 else 0
-        step_col = (dc // abs(dc)) if dc != 0 else 0
-
-        row, col = start_row + step_row, start_col + step_col
-        while (row, col) != (end_row, end_col):
-            if self.board[row][col] != "":
-                return False
-            row += step_row
-            col += step_col
-        return True
-    
-    def play_random_black_move(self):
-        """Joue un coup aléatoire pour les noirs."""
-        possible_moves = []
+    def return_to_menu(self):
+        """Annule la réflexion du bot puis revient au menu principal."""
+        self.cancel_bot()
+        self.playback.pause()
+        if self.retour_menu_callback:
+            self.retour_menu_callback()
 
-        for row in range(self.BOARD_SIZE):
-            for col in range(self.BOARD_SIZE):
-                piece = self.board[row][col]
-                if piece.startswith("b"):
-                    for r in range(self.BOARD_SIZE):
-                        for c in range(self.BOARD_SIZE):
-                            if self.board[r][c] == "" or self.board[r][c][0] == "w":
-                                if self.is_legal_move(piece, row, col, r, c):
-                                    possible_moves.append(((row, col), (r, c)))
-
-        if possible_moves:
-            (src_row, src_col), (dst_row, dst_col) = random.choice(possible_moves)
-            piece = self.board[src_row][src_col]
-            self.board[src_row][src_col] = ""
-            self.board[dst_row][dst_col] = piece
-
-            # Changer de tour
-            self.current_turn = "w"
-            self.turn_label.config(text="Tour : Blanc")
-
-            # Redessiner l'échiquier
-            self.canvas.delete("all")
-            self.draw_board()
-            self.draw_pieces()
-            self.draw_coordinates()
-            self.update_fen_display()
-    
     def format_move(self, piece, src_row, src_col, dest_row, dest_col):
         """Retourne une notation simple du coup joué."""
         cols = "abcdefgh"
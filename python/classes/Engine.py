@@ -0,0 +1,474 @@
+"""
+Moteur de recherche d'échecs sans interface graphique.
+
+Negamax avec élagage alpha-bêta (fenêtre nulle hors PV), approfondissement itératif,
+table de transposition, recherche de quiescence, tri des coups (coup de la table,
+MVV-LVA, coups meurtriers, historique) et budget en temps, en nœuds ou en profondeur.
+Les finales présentes dans les bitbases (classes/Bitbase.py) sont évaluées sans recherche.
+"""
+import time
+
+from classes.Bitbase import DRAW, LOSS, WIN, default_bitbases
+
+from classes.Position import (
+    BISHOP, BLACK, EMPTY, KING, KNIGHT, MOVE_EN_PASSANT, MOVE_PROMOTION,
+    PAWN, QUEEN, ROOK, WHITE, iter_bits, move_to_uci,
+)
+from classes.TranspositionTable import BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, TranspositionTable
+
+INFINITE = 1000000
+MATE = 100000
+MAX_PLY = 128
+KNOWN_WIN = 20000   # Finale gagnée d'après les bitbases (en dessous des scores de mat)
+# Nœuds entre deux contrôles du budget (masques) : plus serré sous une seconde de réflexion,
+# où 1024 nœuds (~70 ms) dépasseraient le temps accordé
+CHECK_MASK = 1023
+SHORT_CHECK_MASK = 63
+
+# --- Évaluation : matériel + tables pièce-case (point de vue des blancs, a8 en premier) ---
+PIECE_VALUES = (100, 320, 330, 500, 900, 0)
+
+_PST = {
+    PAWN: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0),
+    KNIGHT: (
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50),
+    BISHOP: (
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20),
+    ROOK: (
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0),
+    QUEEN: (
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20),
+}
+_KING_MIDDLEGAME = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20)
+_KING_ENDGAME = (
+    -50, -40, -30, -20, -20, -30, -40, -50,
+    -30, -20, -10, 0, 0, -10, -20, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 30, 40, 40, 30, -10, -30,
+    -30, -10, 20, 30, 30, 20, -10, -30,
+    -30, -30, 0, 0, 0, 0, -30, -30,
+    -50, -30, -30, -30, -30, -30, -30, -50)
+
+# Phase de jeu : 24 avec toutes les pièces, 0 quand il ne reste que rois et pions
+_PHASE_WEIGHTS = (0, 1, 1, 2, 4, 0)
+_MAX_PHASE = 24
+
+
+def _square_tables(table):
+    """Convertit une table « a8 en premier » en tables indexées par case (blancs, noirs)."""
+    white = [table[(7 - (sq >> 3)) * 8 + (sq & 7)] for sq in range(64)]
+    black = [table[(sq >> 3) * 8 + (sq & 7)] for sq in range(64)]
+    return white, black
+
+
+# PIECE_SQUARE[piece][sq] : matériel + bonus de placement, pour l'index de pièce 0..11
+PIECE_SQUARE = [None] * 12
+for _kind, _table in _PST.items():
+    _white, _black = _square_tables(_table)
+    PIECE_SQUARE[_kind] = [PIECE_VALUES[_kind] + v for v in _white]
+    PIECE_SQUARE[6 + _kind] = [PIECE_VALUES[_kind] + v for v in _black]
+KING_MIDDLEGAME = _square_tables(_KING_MIDDLEGAME)
+KING_ENDGAME = _square_tables(_KING_ENDGAME)
+
+# MVV-LVA : victime la plus précieuse d'abord, puis attaquant le moins précieux
+MVV_LVA = [[10 * PIECE_VALUES[victim] - attacker for attacker in range(6)] for victim in range(6)]
+MVV_LVA[KING] = [0] * 6
+
+
+def evaluate(position):
+    """
+    Évaluation statique en centipions, du point de vue du camp au trait.
+    :param position: Position à évaluer.
+    :return: Score (positif = avantage au camp au trait).
+    """
+    pieces = position.pieces
+    score = 0
+    phase = 0
+    for piece in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+        table = PIECE_SQUARE[piece]
+        for sq in iter_bits(pieces[piece]):
+            score += table[sq]
+        table = PIECE_SQUARE[6 + piece]
+        for sq in iter_bits(pieces[6 + piece]):
+            score -= table[sq]
+        if piece != PAWN:
+            count = bin(pieces[piece] | pieces[6 + piece]).count("1")
+            phase += _PHASE_WEIGHTS[piece] * count
+    phase = min(phase, _MAX_PHASE)
+
+    king_score = 0
+    for color, sign in ((WHITE, 1), (BLACK, -1)):
+        king = pieces[color * 6 + KING].bit_length() - 1
+        if king >= 0:
+            king_score += sign * (KING_MIDDLEGAME[color][king] * phase
+                                  + KING_ENDGAME[color][king] * (_MAX_PHASE - phase)) // _MAX_PHASE
+    score += king_score
+    return score if position.turn == WHITE else -score
+
+
+def endgame_progress(position, winner):
+    """
+    Bonus d'une finale gagnée pour le camp `winner` : matériel, pions avancés, roi adverse
+    repoussé vers le bord et rois rapprochés. Départage les coups gagnants pour progresser.
+    """
+    pieces = position.pieces
+    score = 0
+    for kind in (PAWN, KNIGHT, BISHOP, ROOK, QUEEN):
+        for sq in iter_bits(pieces[winner * 6 + kind]):
+            score += PIECE_VALUES[kind]
+            if kind == PAWN:
+                score += 20 * ((sq >> 3) if winner == WHITE else 7 - (sq >> 3))
+    loser_king = position.king_square(winner ^ 1)
+    winner_king = position.king_square(winner)
+    rank, file = loser_king >> 3, loser_king & 7
+    score += 20 * (max(3 - file, file - 4) + max(3 - rank, rank - 4))
+    score -= 10 * max(abs(rank - (winner_king >> 3)), abs(file - (winner_king & 7)))
+    return score
+
+
+def score_to_tt(score, ply):
+    """Rend un score de mat relatif au nœud courant avant de le stocker dans la table."""
+    if score >= MATE - MAX_PLY:
+        return score + ply
+    if score <= -MATE + MAX_PLY:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """Inverse de score_to_tt : score de mat relatif à la racine."""
+    if score >= MATE - MAX_PLY:
+        return score - ply
+    if score <= -MATE + MAX_PLY:
+        return score + ply
+    return score
+
+
+class SearchAborted(Exception):
+    """Levée quand le budget (temps, nœuds) est épuisé ou qu'un arrêt est demandé."""
+
+
+class Engine:
+    """
+    Recherche alpha-bêta à approfondissement itératif.
+    La position reçue est modifiée par make_move/unmake_move puis restituée intacte.
+    :param hash_mb: Taille de la table de transposition en mégaoctets.
+    :param tt: Table existante à utiliser (prioritaire sur hash_mb).
+    """
+
+    def __init__(self, hash_mb=16, tt=None):
+        self.tt = tt if tt is not None else TranspositionTable(hash_mb)
+        self.bitbases = default_bitbases()   # None si aucune bitbase n'a été générée
+        self.nodes = 0
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [[0] * 64 for _ in range(12)]
+        self.pv_table = [[] for _ in range(MAX_PLY + 1)]
+        self.stopped = False
+        self.deadline = None
+        self.node_limit = None
+        self.check_mask = CHECK_MASK
+        self.stop_event = None
+
+    def stop(self):
+        """Demande l'arrêt de la recherche en cours (le meilleur coup connu est conservé)."""
+        self.stopped = True
+
+    def reset(self):
+        """Oublie les heuristiques apprises et vide la table de transposition (nouvelle partie)."""
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [[0] * 64 for _ in range(12)]
+        self.tt.clear()
+
+    def resize_hash(self, hash_mb):
+        """Remplace la table de transposition par une table vide de hash_mb mégaoctets."""
+        self.tt = TranspositionTable(hash_mb)
+
+    def search(self, position, depth=None, movetime=None, nodes=None, on_info=None, stop_event=None,
+               start_depth=1):
+        """
+        Cherche le meilleur coup de la position.
+        :param position: Position à analyser (restituée intacte à la fin).
+        :param depth: Profondeur maximale en demi-coups (par défaut illimitée si un autre budget est donné).
+        :param movetime: Budget en secondes.
+        :param nodes: Budget en nœuds.
+        :param on_info: Fonction appelée avec le rapport de chaque itération terminée.
+        :param stop_event: threading.Event optionnel permettant d'interrompre la recherche.
+        :param start_depth: Première profondeur de l'approfondissement itératif (décalée par
+                            les processus auxiliaires de la recherche parallèle).
+        :return: Dictionnaire {move, score, depth, nodes, time, nps, pv, iterations, tt}.
+        """
+        if depth is None:
+            depth = MAX_PLY - 1 if (movetime or nodes) else 4
+        start = time.perf_counter()
+        self.deadline = start + movetime if movetime else None
+        self.node_limit = nodes
+        self.check_mask = SHORT_CHECK_MASK if movetime and movetime < 1 else CHECK_MASK
+        self.stop_event = stop_event
+        self.stopped = False
+        self.nodes = 0
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        for row in self.history:
+            for sq in range(64):
+                row[sq] >>= 1
+        self.tt.new_search()
+        self.tt.reset_stats()
+
+        root_moves = position.legal_moves()
+        result = {"move": root_moves[0] if root_moves else None, "score": 0, "depth": 0,
+                  "nodes": 0, "time": 0.0, "nps": 0, "pv": [], "iterations": [], "tt": None}
+        if len(root_moves) <= 1:
+            return result
+
+        root_length = len(position.history)
+        best_move = None
+        for current_depth in range(min(start_depth, depth), depth + 1):
+            try:
+                score = self._negamax(position, current_depth, -INFINITE, INFINITE, 0, best_move)
+            except SearchAborted:
+                while len(position.history) > root_length:
+                    position.unmake_move()
+                break
+            pv = self.pv_table[0][:]
+            best_move = pv[0] if pv else best_move
+            elapsed = time.perf_counter() - start
+            info = {"depth": current_depth, "score": score, "nodes": self.nodes, "time": elapsed,
+                    "nps": int(self.nodes / elapsed) if elapsed > 0 else 0,
+                    "pv": [move_to_uci(move) for move in pv]}
+            result.update(move=best_move, score=score, depth=current_depth, pv=info["pv"])
+            result["iterations"].append(info)
+            if on_info:
+                on_info(info)
+            if abs(score) >= MATE - MAX_PLY:
+                break  # Mat trouvé : inutile d'aller plus loin
+
+        elapsed = time.perf_counter() - start
+        result.update(nodes=self.nodes, time=elapsed, nps=int(self.nodes / elapsed) if elapsed > 0 else 0,
+                      tt=self.tt.stats())
+        return result
+
+    # --- Recherche ---
+
+    def _check_limits(self):
+        """Vérifie régulièrement le budget ; lève SearchAborted s'il est dépassé."""
+        if (self.stopped
+                or (self.deadline is not None and time.perf_counter() >= self.deadline)
+                or (self.node_limit is not None and self.nodes >= self.node_limit)
+                or (self.stop_event is not None and self.stop_event.is_set())):
+            self.stopped = True
+            raise SearchAborted()
+
+    @staticmethod
+    def _is_repetition(position):
+        """True si la position est déjà apparue depuis le dernier coup irréversible."""
+        key = position.key
+        history = position.history
+        count = len(history)
+        for back in range(2, min(position.halfmove_clock, count) + 1, 2):
+            if history[count - back][5] == key:
+                return True
+        return False
+
+    def _order_moves(self, position, moves, ply, best_move):
+        """Trie les coups : coup de la table, captures (MVV-LVA), coups meurtriers, historique."""
+        squares = position.squares
+        killer1, killer2 = self.killers[ply] if ply < MAX_PLY else (0, 0)
+        history = self.history
+        scored = []
+        for move in moves:
+            if move == best_move:
+                score = 10000000
+            else:
+                dst = (move >> 6) & 63
+                victim = squares[dst]
+                flag = (move >> 12) & 3
+                if victim != EMPTY:
+                    score = 1000000 + MVV_LVA[victim % 6][squares[move & 63] % 6]
+                elif flag == MOVE_EN_PASSANT:
+                    score = 1000000 + MVV_LVA[PAWN][PAWN]
+                elif flag == MOVE_PROMOTION:
+                    score = 900000 + (move >> 14)
+                elif move == killer1:
+                    score = 800000
+                elif move == killer2:
+                    score = 799999
+                else:
+                    score = history[squares[move & 63]][dst]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def _negamax(self, position, depth, alpha, beta, ply, best_move=None):
+        """Negamax alpha-bêta ; retourne le score du point de vue du camp au trait."""
+        self.nodes += 1
+        if not self.nodes & self.check_mask:
+            self._check_limits()
+        self.pv_table[ply] = []
+
+        if ply and (position.halfmove_clock >= 100 or self._is_repetition(position)):
+            return 0
+        in_check = position.in_check()
+        if in_check and ply < MAX_PLY - 1:
+            depth += 1  # Extension d'échec
+        if ply and self.bitbases is not None:
+            score = self._probe_bitbases(position, in_check, depth, ply)
+            if score is not None:
+                return score
+        if depth <= 0 or ply >= MAX_PLY - 1:
+            return self._quiesce(position, alpha, beta, ply)
+
+        # Table de transposition : coup à essayer en premier, voire coupure immédiate
+        key = position.key
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_move, tt_score, tt_depth, tt_bound = entry
+            if tt_move:
+                best_move = tt_move
+            if ply and tt_depth >= depth and beta - alpha == 1:
+                tt_score = score_from_tt(tt_score, ply)
+                if (tt_bound == BOUND_EXACT
+                        or (tt_bound == BOUND_LOWER and tt_score >= beta)
+                        or (tt_bound == BOUND_UPPER and tt_score <= alpha)):
+                    return tt_score
+
+        moves = position.legal_moves()
+        if not moves:
+            return -MATE + ply if in_check else 0
+
+        squares = position.squares
+        original_alpha = alpha
+        best_score = -INFINITE
+        found_move = 0
+        first = True
+        for move in self._order_moves(position, moves, ply, best_move):
+            quiet = (squares[(move >> 6) & 63] == EMPTY
+                     and (move >> 12) & 3 not in (MOVE_EN_PASSANT, MOVE_PROMOTION))
+            position.make_move(move)
+            if first:
+                score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+                first = False
+            else:
+                score = -self._negamax(position, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            position.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    found_move = move
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+                    if alpha >= beta:
+                        if quiet:
+                            killers = self.killers[ply]
+                            if killers[0] != move:
+                                killers[1] = killers[0]
+                                killers[0] = move
+                            self.history[squares[move & 63]][(move >> 6) & 63] += depth * depth
+                        break
+
+        if best_score >= beta:
+            bound = BOUND_LOWER
+        elif best_score > original_alpha:
+            bound = BOUND_EXACT
+        else:
+            bound = BOUND_UPPER
+        self.tt.store(key, depth, score_to_tt(best_score, ply), bound, found_move)
+        return best_score
+
+    def _probe_bitbases(self, position, in_check, depth, ply):
+        """
+        Score d'une finale connue des bitbases : nulle immédiatement, gain ou perte seulement
+        aux feuilles (plus haut, la recherche continue pour trouver le mat ou progresser).
+        :return: Score, ou None si la recherche doit continuer.
+        """
+        value = self.bitbases.probe(position)
+        if value is None or (value != DRAW and depth > 0):
+            return None
+        if value == DRAW:
+            return 0
+        if value == LOSS and in_check and not position.legal_moves():
+            return -MATE + ply
+        winner = position.turn if value == WIN else position.turn ^ 1
+        score = KNOWN_WIN + endgame_progress(position, winner) - ply
+        return score if value == WIN else -score
+
+    def _quiesce(self, position, alpha, beta, ply):
+        """Recherche de quiescence : prolonge les captures jusqu'à une position calme."""
+        self.nodes += 1
+        if not self.nodes & self.check_mask:
+            self._check_limits()
+        self.pv_table[ply] = []
+
+        if position.in_check():
+            if ply >= MAX_PLY - 1:
+                return evaluate(position)   # Suite d'échecs trop longue : pv_table est plein
+            moves = position.legal_moves()
+            if not moves:
+                return -MATE + ply
+            best_score = -INFINITE
+        else:
+            best_score = evaluate(position)
+            if best_score >= beta or ply >= MAX_PLY - 1:
+                return best_score
+            alpha = max(alpha, best_score)
+            moves = position.legal_moves(captures_only=True)
+
+        for move in self._order_moves(position, moves, MAX_PLY, None):
+            position.make_move(move)
+            score = -self._quiesce(position, -beta, -alpha, ply + 1)
+            position.unmake_move()
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
+
@@ -0,0 +1,242 @@
+"""
+Lecture et écriture de la notation FEN (Forsyth-Edwards Notation).
+
+Les six champs sont pris en charge : placement, trait, droits de roque, case en passant,
+compteur des 50 coups et numéro du coup. Les rangées déjà rencontrées sont mises en cache
+(dans les deux sens), ce qui rend la lecture en masse de fichiers FEN rapide : les mêmes
+rangées reviennent sans cesse d'une position à l'autre.
+
+Convention des cases identique à classes/Position.py : a1 = 0, ..., h8 = 63.
+Index des pièces : couleur * 6 + type, dans l'ordre P N B R Q K p n b r q k (-1 = case vide).
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+PIECE_CHARS = "PNBRQKpnbrqk"
+CHAR_TO_PIECE = {char: index for index, char in enumerate(PIECE_CHARS)}
+_EMPTY = -1
+_WHITE_PAWN, _WHITE_ROOK, _WHITE_KING = 0, 3, 5
+_BLACK_PAWN, _BLACK_ROOK, _BLACK_KING = 6, 9, 11
+
+# Droits de roque : (bit, caractère, case du roi, case de la tour, tour, roi)
+CASTLING_FIELDS = (
+    (1, "K", 4, 7, _WHITE_ROOK, _WHITE_KING),
+    (2, "Q", 4, 0, _WHITE_ROOK, _WHITE_KING),
+    (4, "k", 60, 63, _BLACK_ROOK, _BLACK_KING),
+    (8, "q", 60, 56, _BLACK_ROOK, _BLACK_KING),
+)
+_CASTLING_BITS = {char: bit for bit, char, _, _, _, _ in CASTLING_FIELDS}
+
+FILE_NAMES = "abcdefgh"
+
+FenFields = namedtuple("FenFields", "squares turn castling ep_square halfmove_clock fullmove_number")
+FenFields.__doc__ = """
+Contenu d'une FEN décodée.
+squares : liste de 64 index de pièces (a1 ... h8), turn : 0 (blancs) ou 1 (noirs),
+castling : bits KQkq (1, 2, 4, 8), ep_square : case en passant ou -1.
+"""
+
+
+class FenError(ValueError):
+    """FEN invalide ; le message indique le champ et la raison."""
+
+    def __init__(self, message, fen=None, line=None):
+        self.fen = fen
+        self.line = line
+        where = f"ligne {line} : " if line is not None else ""
+        super().__init__(f"{where}{message}" + (f" ({fen!r})" if fen is not None else ""))
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse_rank(text):
+    """Décode une rangée (« rnbqkbnr », « 4P3 »...) en tuple de 8 index de pièces."""
+    rank = []
+    previous_digit = False
+    for char in text:
+        if char in "12345678":
+            if previous_digit:
+                raise FenError(f"rangée « {text} » : deux chiffres consécutifs")
+            rank.extend((_EMPTY,) * (ord(char) - 48))
+            previous_digit = True
+        else:
+            piece = CHAR_TO_PIECE.get(char)
+            if piece is None:
+                raise FenError(f"rangée « {text} » : caractère invalide « {char} »")
+            rank.append(piece)
+            previous_digit = False
+        if len(rank) > 8:
+            raise FenError(f"rangée « {text} » : plus de 8 cases")
+    if len(rank) < 8:
+        raise FenError(f"rangée « {text} » : {len(rank)} cases au lieu de 8")
+    return tuple(rank)
+
+
+@lru_cache(maxsize=1 << 16)
+def _format_rank(rank):
+    """Encode un tuple de 8 index de pièces en texte de rangée."""
+    parts = []
+    empty = 0
+    for piece in rank:
+        if piece == _EMPTY:
+            empty += 1
+            continue
+        if empty:
+            parts.append(str(empty))
+            empty = 0
+        parts.append(PIECE_CHARS[piece])
+    if empty:
+        parts.append(str(empty))
+    return "".join(parts)
+
+
+def parse_placement(text):
+    """
+    Décode le premier champ d'une FEN.
+    :return: Liste de 64 index de pièces (a1 ... h8).
+    """
+    ranks = text.split("/")
+    if len(ranks) != 8:
+        raise FenError(f"placement : {len(ranks)} rangées au lieu de 8")
+    squares = []
+    for rank in reversed(ranks):  # La FEN commence par la rangée 8
+        squares.extend(_parse_rank(rank))
+    return squares
+
+
+def format_placement(squares):
+    """Encode 64 index de pièces (a1 ... h8) en champ de placement."""
+    return "/".join([_format_rank(tuple(squares[base:base + 8])) for base in range(56, -1, -8)])
+
+
+def _parse_castling(text):
+    if text == "-":
+        return 0
+    castling = 0
+    for char in text:
+        bit = _CASTLING_BITS.get(char)
+        if bit is None:
+            raise FenError(f"roques : caractère invalide « {char} » dans « {text} »")
+        if castling & bit:
+            raise FenError(f"roques : « {char} » répété dans « {text} »")
+        castling |= bit
+    return castling
+
+
+def _parse_ep(text, turn):
+    if text == "-":
+        return -1
+    if len(text) != 2 or text[0] not in FILE_NAMES or text[1] not in "36":
+        raise FenError(f"en passant : case « {text} » invalide (attendu a3-h3, a6-h6 ou -)")
+    if text[1] != ("6" if turn == 0 else "3"):
+        raise FenError(f"en passant : case « {text} » incompatible avec le trait")
+    return FILE_NAMES.index(text[0]) + (40 if turn == 0 else 16)
+
+
+def _parse_counter(text, name, minimum):
+    if not text.isdigit():
+        raise FenError(f"{name} : « {text} » n'est pas un entier positif")
+    value = int(text)
+    if value < minimum:
+        raise FenError(f"{name} : {value} inférieur à {minimum}")
+    return value
+
+
+def _possible_castling(squares, castling):
+    """Droits de roque dont le roi et la tour sont encore sur leurs cases d'origine."""
+    for bit, _, king_sq, rook_sq, rook, king in CASTLING_FIELDS:
+        if castling & bit and (squares[king_sq] != king or squares[rook_sq] != rook):
+            castling &= ~bit
+    return castling
+
+
+def _check_consistency(fields):
+    """Vérifie que la position décrite est plausible (rois, pions, roques, en passant)."""
+    squares = fields.squares
+    for king, color in ((_WHITE_KING, "blanc"), (_BLACK_KING, "noir")):
+        count = squares.count(king)
+        if count != 1:
+            raise FenError(f"placement : {count} roi(s) {color}(s) au lieu d'un")
+    for sq in list(range(8)) + list(range(56, 64)):
+        if squares[sq] in (_WHITE_PAWN, _BLACK_PAWN):
+            raise FenError(f"placement : pion sur la case {FILE_NAMES[sq % 8]}{sq // 8 + 1}")
+    for bit, char, king_sq, rook_sq, rook, king in CASTLING_FIELDS:
+        if fields.castling & bit and (squares[king_sq] != king or squares[rook_sq] != rook):
+            raise FenError(f"roques : droit « {char} » sans roi ni tour sur leurs cases d'origine")
+    ep = fields.ep_square
+    if ep >= 0:
+        # Le pion adverse vient de passer par ep : il est devant, la case et celle d'origine sont vides
+        pawn_sq, origin_sq = (ep - 8, ep + 8) if fields.turn == 0 else (ep + 8, ep - 8)
+        pawn = _BLACK_PAWN if fields.turn == 0 else _WHITE_PAWN
+        if squares[pawn_sq] != pawn or squares[ep] != _EMPTY or squares[origin_sq] != _EMPTY:
+            raise FenError(f"en passant : aucun pion n'a pu avancer de deux cases par "
+                           f"{FILE_NAMES[ep % 8]}{ep // 8 + 1}")
+
+
+def parse_fen(fen, strict=True):
+    """
+    Décode une FEN complète.
+    Les champs absents en fin de chaîne prennent leur valeur par défaut (« w - - 0 1 »).
+    :param fen: Chaîne FEN.
+    :param strict: Vérifie aussi la cohérence de la position (un roi par camp, pas de pion
+                   sur les rangées 1 et 8, droits de roque et case en passant possibles).
+                   Sinon, les droits de roque sans roi ou tour sur leur case sont ignorés.
+    :return: FenFields.
+    :raises FenError: Si la chaîne est invalide ; le message précise le champ fautif.
+    """
+    fields = fen.split()
+    if not fields:
+        raise FenError("chaîne vide")
+    if len(fields) > 6:
+        raise FenError(f"{len(fields)} champs au lieu de 6", fen)
+    try:
+        squares = parse_placement(fields[0])
+        turn = 0
+        if len(fields) > 1:
+            if fields[1] not in ("w", "b"):
+                raise FenError(f"trait : « {fields[1]} » au lieu de w ou b")
+            turn = 0 if fields[1] == "w" else 1
+        castling = _parse_castling(fields[2]) if len(fields) > 2 else 0
+        if not strict:
+            castling = _possible_castling(squares, castling)
+        ep_square = _parse_ep(fields[3], turn) if len(fields) > 3 else -1
+        halfmove = _parse_counter(fields[4], "compteur des 50 coups", 0) if len(fields) > 4 else 0
+        fullmove = _parse_counter(fields[5], "numéro du coup", 1) if len(fields) > 5 else 1
+        result = FenFields(squares, turn, castling, ep_square, halfmove, fullmove)
+        if strict:
+            _check_consistency(result)
+    except FenError as e:
+        raise FenError(e.args[0], fen) from None
+    return result
+
+
+def format_fen(squares, turn=0, castling=0, ep_square=-1, halfmove_clock=0, fullmove_number=1):
+    """Encode une position en FEN complète (inverse de parse_fen)."""
+    castling_text = "".join([char for bit, char, _, _, _, _ in CASTLING_FIELDS if castling & bit]) or "-"
+    ep = f"{FILE_NAMES[ep_square % 8]}{ep_square // 8 + 1}" if ep_square >= 0 else "-"
+    return (f"{format_placement(squares)} {'wb'[turn]} {castling_text} {ep} "
+            f"{halfmove_clock} {fullmove_number}")
+
+
+def iter_fen_file(source, strict=True, skip_invalid=False):
+    """
+    Lit un fichier de FEN (une par ligne) au fil de l'eau, sans le charger en mémoire.
+    Les lignes vides et celles commençant par « # » sont ignorées.
+    :param source: Chemin du fichier ou objet fichier texte déjà ouvert.
+    :param strict: Voir parse_fen.
+    :param skip_invalid: Ignore les lignes invalides au lieu de lever FenError.
+    :return: Itérateur de (numéro de ligne, FenFields).
+    :raises FenError: Première ligne invalide (numéro de ligne dans le message) sauf si skip_invalid.
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as file:
+            yield from iter_fen_file(file, strict, skip_invalid)
+        return
+    for number, line in enumerate(source, 1):
+        line = line.strip()
+        if not line or line[0] == "#":
+            continue
+        try:
+            yield number, parse_fen(line, strict)
+        except FenError as e:
+            if not skip_invalid:
+                raise FenError(e.args[0], line=number) from None
@@ -0,0 +1,110 @@
+"""
+Historique compact d'une partie pour la navigation coup par coup.
+
+Au lieu d'une FEN par demi-coup, on garde la position initiale, la liste des coups encodés
+(4 octets par coup dans un array) et une FEN « image clé » tous les `keyframe_interval`
+demi-coups. Avancer ou reculer d'un coup joue ou annule un seul coup sur la position
+courante ; sauter à un demi-coup quelconque repart de l'image clé la plus proche, soit au
+plus keyframe_interval coups rejoués.
+"""
+from array import array
+
+from classes.Position import Position
+
+
+class GameHistory:
+    """
+    Coups d'une partie et position courante (curseur).
+    :param start: Position initiale (copiée).
+    :param moves: Coups encodés (supposés légaux) à enregistrer.
+    :param keyframe_interval: Écart en demi-coups entre deux images clés.
+    """
+
+    def __init__(self, start=None, moves=(), keyframe_interval=32):
+        start = start.copy() if start is not None else Position.from_fen()
+        start.history = []
+        self.start_fen = start.fen()
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.moves = array("I")
+        self.keyframes = {0: self.start_fen}
+        self.position = start
+        self.ply = 0
+        for move in moves:
+            self.append(move)
+        self.goto(0)
+
+    @classmethod
+    def from_game(cls, game, keyframe_interval=32):
+        """
+        Construit l'historique de la ligne principale d'une partie PGN (classes/Pgn.py).
+        :raises PgnError: Si un coup de la partie est illégal.
+        """
+        return cls(game.start_position(), [move for _, move in game.iter_moves()], keyframe_interval)
+
+    def __len__(self):
+        """Nombre de demi-coups enregistrés."""
+        return len(self.moves)
+
+    def append(self, move):
+        """
+        Joue un coup depuis la position courante et l'enregistre.
+        Si le curseur n'est pas en fin de partie, les coups suivants sont abandonnés.
+        """
+        if self.ply < len(self.moves):
+            del self.moves[self.ply:]
+            for ply in [ply for ply in self.keyframes if ply > self.ply]:
+                del self.keyframes[ply]
+        self.position.make_move(move)
+        self.moves.append(move)
+        self.ply += 1
+        if self.ply % self.keyframe_interval == 0:
+            self.keyframes[self.ply] = self.position.fen()
+
+    def forward(self):
+        """Avance d'un demi-coup ; retourne False en fin de partie."""
+        if self.ply >= len(self.moves):
+            return False
+        self.position.make_move(self.moves[self.ply])
+        self.ply += 1
+        return True
+
+    def back(self):
+        """Recule d'un demi-coup ; retourne False au début de la partie."""
+        if self.ply == 0:
+            return False
+        if self.position.history:
+            self.position.unmake_move()
+            self.ply -= 1
+        else:
+            # Position reconstruite depuis une image clé : pas d'historique avant elle
+            self.goto(self.ply - 1)
+        return True
+
+    def goto(self, ply):
+        """
+        Place le curseur sur un demi-coup (0 = position initiale).
+        Coût borné : déplacement direct si la cible est proche, sinon image clé + rejeu.
+        """
+        ply = min(max(ply, 0), len(self.moves))
+        distance = ply - self.ply
+        if 0 <= distance <= self.keyframe_interval:
+            for _ in range(distance):
+                self.forward()
+            return
+        if -len(self.position.history) <= distance < 0 and -distance <= self.keyframe_interval:
+            for _ in range(-distance):
+                self.back()
+            return
+        base = ply - ply % self.keyframe_interval
+        self.position = Position.from_fen(self.keyframes[base], strict=False)
+        self.ply = base
+        while self.ply < ply:
+            self.forward()
+
+    def fen(self):
+        """FEN de la position courante."""
+        return self.position.fen()
+
+    def last_move(self):
+        """Dernier coup joué pour arriver à la position courante (None au début)."""
+        return self.moves[self.ply - 1] if self.ply else None
@@ -0,0 +1,196 @@
+"""
+État de la partie (échec, mat, pat, nulles) tenu à jour coup par coup.
+
+GameStatus joue les coups sur une Position et met à jour incrémentalement, à chaque
+demi-coup : l'échec (échec direct de la pièce jouée ou échec à la découverte, sans balayer
+l'échiquier), le nombre d'apparitions de chaque clé de Zobrist, le compteur des 50 coups
+(tenu par Position) et une signature du matériel. Mat et pat ne génèrent la liste complète
+des coups légaux qu'en dernier recours : le plus souvent, une case libre pour le roi, un
+cavalier ou un pion non cloué suffit à prouver que la partie continue.
+"""
+from classes.Position import (BB_ALL, BB_SQUARES, BISHOP, EMPTY, KING, KING_ATTACKS, KNIGHT,
+                              KNIGHT_ATTACKS, LINE, MOVE_EN_PASSANT, MOVE_NORMAL, MOVE_PROMOTION,
+                              PAWN, QUEEN, ROOK, WHITE, Position, bishop_attacks, iter_bits,
+                              popcount, rook_attacks)
+
+ONGOING = "en cours"
+CHECK = "échec"
+CHECKMATE = "mat"
+STALEMATE = "pat"
+REPETITION = "répétition"
+FIFTY_MOVES = "50 coups"
+INSUFFICIENT_MATERIAL = "matériel insuffisant"
+
+DRAWS = frozenset((STALEMATE, REPETITION, FIFTY_MOVES, INSUFFICIENT_MATERIAL))
+
+# Signature du matériel : 4 bits (nombre de pièces) par index de pièce
+MATERIAL_BITS = 4
+_MINOR_PIECES = (KNIGHT, BISHOP, KNIGHT + 6, BISHOP + 6)
+_BISHOPS_ONLY = sum(0xF << (MATERIAL_BITS * piece) for piece in (BISHOP, BISHOP + 6))
+_KINGS = (1 << (MATERIAL_BITS * KING)) | (1 << (MATERIAL_BITS * (KING + 6)))
+LIGHT_SQUARES = 0x55AA55AA55AA55AA
+
+
+def material_signature(position):
+    """Signature du matériel calculée depuis zéro (GameStatus la met ensuite à jour en O(1))."""
+    return sum(popcount(bb) << (MATERIAL_BITS * piece) for piece, bb in enumerate(position.pieces))
+
+
+class GameStatus:
+    """
+    Suit l'état d'une partie jouée sur `position` (la position est modifiée, pas copiée).
+    Les coups doivent passer par push()/pop() pour que l'état reste cohérent.
+    :param position: Position de départ (position initiale si None).
+    """
+
+    def __init__(self, position=None):
+        self.position = position if position is not None else Position.from_fen()
+        self.in_check = self.position.in_check()
+        self.material = material_signature(self.position)
+        self.repetitions = {}
+        # Clés de la partie jusqu'à la position courante (la position de départ compte une fois)
+        self.keys = [self.position.key]
+        self.repetitions[self.position.key] = 1
+        self._undo = []
+        self.status = self._evaluate()
+
+    def push(self, move):
+        """
+        Joue un coup légal et met l'état à jour.
+        :return: Nouvel état (ONGOING, CHECK, CHECKMATE ou l'une des nulles).
+        """
+        position = self.position
+        src, dst, flag = move & 63, (move >> 6) & 63, (move >> 12) & 3
+        piece = position.squares[src]
+        captured = position.squares[dst]
+        self._undo.append((self.in_check, self.material, self.status))
+
+        position.make_move(move)
+
+        material = self.material
+        if captured != EMPTY:
+            material -= 1 << (MATERIAL_BITS * captured)
+        elif flag == MOVE_EN_PASSANT:
+            material -= 1 << (MATERIAL_BITS * ((piece // 6 ^ 1) * 6 + PAWN))
+        if flag == MOVE_PROMOTION:
+            material += (1 << (MATERIAL_BITS * position.squares[dst])) - (1 << (MATERIAL_BITS * piece))
+        self.material = material
+
+        if flag == MOVE_NORMAL or flag == MOVE_PROMOTION:
+            self.in_check = self._gives_check(src, dst)
+        else:
+            self.in_check = position.in_check()  # Roque ou prise en passant : cas rares
+
+        key = position.key
+        self.keys.append(key)
+        self.repetitions[key] = self.repetitions.get(key, 0) + 1
+        self.status = self._evaluate()
+        return self.status
+
+    @property
+    def ply(self):
+        """Nombre de coups joués par push() et encore annulables par pop()."""
+        return len(self._undo)
+
+    def pop(self):
+        """
+        Annule le dernier coup joué par push() et retourne ce coup.
+        :raises IndexError: Si aucun coup n'a été joué par push() (l'état reste inchangé).
+        """
+        if not self._undo:
+            raise IndexError("aucun coup joué par push() à annuler")
+        key = self.keys.pop()
+        count = self.repetitions[key] - 1
+        if count:
+            self.repetitions[key] = count
+        else:
+            del self.repetitions[key]
+        self.in_check, self.material, self.status = self._undo.pop()
+        return self.position.unmake_move()
+
+    def _gives_check(self, src, dst):
+        """
+        Échec après un coup normal : la pièce arrivée en dst attaque le roi adverse, ou le
+        départ de src a ouvert une ligne entre ce roi et une pièce à longue portée.
+        """
+        position = self.position
+        us = position.turn  # Camp au trait après le coup
+        king = position.king_square(us)
+        if king < 0:
+            return False
+        if position.attacks_from(dst) & BB_SQUARES[king]:
+            return True
+        line = LINE[king][src]
+        if not line or line & BB_SQUARES[dst]:
+            return False  # Départ hors des lignes du roi, ou pièce restée sur la même ligne
+        base = (us ^ 1) * 6
+        pieces = position.pieces
+        queens = pieces[base + QUEEN]
+        if (king & 7) == (src & 7) or (king >> 3) == (src >> 3):
+            return bool(rook_attacks(king, position.occupied) & (pieces[base + ROOK] | queens))
+        return bool(bishop_attacks(king, position.occupied) & (pieces[base + BISHOP] | queens))
+
+    def has_legal_move(self):
+        """True si le camp au trait a au moins un coup légal."""
+        position = self.position
+        if not self.in_check:
+            us = position.turn
+            them = us ^ 1
+            king = position.king_square(us)
+            not_own = ~position.occupied_by[us] & BB_ALL
+            # Hors échec, une case voisine non attaquée, un cavalier ou un pion non cloué
+            # ayant un coup suffit
+            if king >= 0:
+                for dst in iter_bits(KING_ATTACKS[king] & not_own):
+                    if not position.attackers_to(dst, them):
+                        return True
+            free = ~position.pinned_pieces(us)
+            for src in iter_bits(position.pieces[us * 6 + KNIGHT] & free):
+                if KNIGHT_ATTACKS[src] & not_own:
+                    return True
+            pawns = position.pieces[us * 6 + PAWN] & free
+            if (pawns << 8 if us == WHITE else pawns >> 8) & ~position.occupied & BB_ALL:
+                return True
+        return bool(position.legal_moves())
+
+    def is_insufficient_material(self):
+        """Aucun des deux camps ne peut mater : rois seuls, une pièce mineure, ou fous de même couleur."""
+        rest = self.material - _KINGS
+        if rest == 0:
+            return True
+        if rest & (rest - 1) == 0 and any(rest == 1 << (MATERIAL_BITS * piece) for piece in _MINOR_PIECES):
+            return True
+        if rest & ~_BISHOPS_ONLY:
+            return False
+        bishops = self.position.pieces[BISHOP] | self.position.pieces[BISHOP + 6]
+        return not bishops & LIGHT_SQUARES or not bishops & ~LIGHT_SQUARES
+
+    def repetition_count(self):
+        """Nombre d'apparitions de la position courante depuis le début de la partie."""
+        return self.repetitions.get(self.position.key, 0)
+
+    def _evaluate(self):
+        """État de la position courante ; les tests coûteux ne sont faits qu'en dernier."""
+        if not self.has_legal_move():
+            return CHECKMATE if self.in_check else STALEMATE
+        if self.repetitions.get(self.position.key, 0) >= 3:
+            return REPETITION
+        if self.position.halfmove_clock >= 100:
+            return FIFTY_MOVES
+        if self.is_insufficient_material():
+            return INSUFFICIENT_MATERIAL
+        return CHECK if self.in_check else ONGOING
+
+    @property
+    def is_over(self):
+        """True si la partie est terminée (mat ou nulle)."""
+        return self.status == CHECKMATE or self.status in DRAWS
+
+    def result(self):
+        """Résultat au format PGN : "1-0", "0-1", "1/2-1/2" ou "*" si la partie continue."""
+        if self.status == CHECKMATE:
+            return "0-1" if self.position.turn == WHITE else "1-0"
+        if self.status in DRAWS:
+            return "1/2-1/2"
+        return "*"
+
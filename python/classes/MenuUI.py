@@ -77,7 +77,7 @@ class MenuUI:
         Lance une nouvelle partie en masquant le menu et en affichant l’échiquier.
         """
         self.menu_frame.pack_forget()  # Cache le menu
-        self.jeu_frame.pack()          # Affiche le cadre de jeu
+        self.jeu_frame.pack(fill="both", expand=True)  # Affiche le cadre de jeu (redimensionnable)
 
         # Si l'échiquier n'a pas encore été créé, on l’instancie
         if self.chess_ui is None:
@@ -88,6 +88,8 @@ class MenuUI:
                 board_size=self.board_size,
                 square_size=self.square_size
             )
+        else:
+            self.chess_ui.resume()  # Relance le bot s'il devait jouer
 
     def show_menu(self):
         """
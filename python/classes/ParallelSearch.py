@@ -0,0 +1,186 @@
+"""
+Recherche parallèle « Lazy SMP » sur plusieurs processus.
+
+Le processus appelant mène la recherche principale (et publie les rapports d'itération) ;
+des processus auxiliaires, lancés par un ProcessPoolExecutor, cherchent la même position
+en décalant leur profondeur de départ. Tous partagent une table de transposition placée
+en mémoire partagée : les auxiliaires la remplissent, la recherche principale en profite.
+Le GIL n'est donc plus une limite : chaque processus occupe son propre cœur.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from classes.Engine import Engine
+from classes.TranspositionTable import TranspositionTable
+
+# État propre à chaque processus auxiliaire (initialisé par _init_worker)
+_worker_engine = None
+_worker_memory = []
+
+
+class _SharedFlag:
+    """Drapeau d'arrêt lisible par tous les processus (un octet en mémoire partagée)."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def is_set(self):
+        return self.buffer[0] != 0
+
+    def set(self):
+        self.buffer[0] = 1
+
+    def clear(self):
+        self.buffer[0] = 0
+
+
+def _init_worker(tt_name, flag_name):
+    """Initialise un processus auxiliaire : attache la table et le drapeau partagés."""
+    global _worker_engine
+    tt_memory = shared_memory.SharedMemory(name=tt_name)
+    flag_memory = shared_memory.SharedMemory(name=flag_name)
+    _worker_memory[:] = [tt_memory, flag_memory]
+    _worker_engine = Engine(tt=TranspositionTable(buffer=tt_memory.buf))
+
+
+def _ping():
+    """Tâche vide servant à démarrer les processus avant de chronométrer."""
+    return True
+
+
+def _helper_search(position, depth, movetime, generation, index):
+    """Recherche auxiliaire : même position, profondeur de départ décalée selon l'index."""
+    engine = _worker_engine
+    engine.tt.generation = generation
+    flag = _SharedFlag(_worker_memory[1].buf)
+    result = engine.search(position, depth=depth, movetime=movetime, stop_event=flag,
+                           start_depth=1 + index % 2)
+    return {"move": result["move"], "score": result["score"], "depth": result["depth"],
+            "nodes": result["nodes"]}
+
+
+class ParallelSearch:
+    """
+    Recherche Lazy SMP répartie sur `threads` processus (le processus courant compris).
+    À fermer avec close() (ou à utiliser dans un bloc with) pour libérer la mémoire partagée.
+    :param threads: Nombre total de processus de recherche.
+    :param hash_mb: Taille de la table de transposition partagée en mégaoctets.
+    """
+
+    def __init__(self, threads=1, hash_mb=16):
+        self.threads = max(1, threads)
+        self._tt_memory = shared_memory.SharedMemory(create=True, size=TranspositionTable.buffer_size(hash_mb))
+        self._flag_memory = shared_memory.SharedMemory(create=True, size=1)
+        self.stop_flag = _SharedFlag(self._flag_memory.buf)
+        self.stop_flag.clear()
+        self.engine = Engine(tt=TranspositionTable(buffer=self._tt_memory.buf))
+        self.executor = None
+        if self.threads > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.threads - 1,
+                initializer=_init_worker,
+                initargs=(self._tt_memory.name, self._flag_memory.name),
+            )
+            # Démarre tous les processus maintenant plutôt qu'au premier coup
+            for future in [self.executor.submit(_ping) for _ in range(self.threads - 1)]:
+                future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stop(self):
+        """Interrompt la recherche principale et les recherches auxiliaires."""
+        self.stop_flag.set()
+
+    def clear_hash(self):
+        """Vide la table partagée (avant un chronométrage, ou pour une nouvelle partie)."""
+        self.engine.tt.clear()
+
+    def search(self, position, depth=None, movetime=None, nodes=None, on_info=None, stop_event=None):
+        """
+        Lance la recherche principale et les auxiliaires, puis retient le résultat le plus profond.
+        Paramètres et résultat identiques à Engine.search ; le nombre de nœuds et les nœuds par
+        seconde cumulent tous les processus, et result["workers"] détaille chacun d'eux.
+        """
+        self.stop_flag.clear()
+        generation = self.engine.tt.generation
+        start = time.perf_counter()
+        futures = []
+        if self.executor is not None and len(position.legal_moves()) > 1:
+            helper_depth = depth
+            if helper_depth is None and not (movetime or nodes):
+                helper_depth = 4
+            futures = [self.executor.submit(_helper_search, position, helper_depth, movetime,
+                                            generation, index)
+                       for index in range(1, self.threads)]
+
+        flag = self.stop_flag
+        if stop_event is not None:
+            flag = _EitherFlag(self.stop_flag, stop_event)
+        result = self.engine.search(position, depth=depth, movetime=movetime, nodes=nodes,
+                                    on_info=on_info, stop_event=flag)
+        self.stop_flag.set()  # La recherche principale décide de la fin : on arrête les auxiliaires
+
+        workers = [{"move": result["move"], "score": result["score"], "depth": result["depth"],
+                    "nodes": result["nodes"]}]
+        workers += [future.result() for future in futures]
+        best = max(workers, key=lambda worker: worker["depth"])
+        if best["depth"] > result["depth"] and best["move"] is not None:
+            result.update(move=best["move"], score=best["score"], depth=best["depth"], pv=[])
+        elapsed = time.perf_counter() - start
+        total_nodes = sum(worker["nodes"] for worker in workers)
+        result.update(nodes=total_nodes, time=elapsed,
+                      nps=int(total_nodes / elapsed) if elapsed > 0 else 0, workers=workers)
+        return result
+
+    def close(self):
+        """Arrête les processus auxiliaires et libère la mémoire partagée."""
+        if self.executor is not None:
+            self.stop_flag.set()
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        if self._tt_memory is not None:
+            self.engine.tt.close()
+            self.stop_flag.buffer = None
+            for memory in (self._tt_memory, self._flag_memory):
+                memory.close()
+                memory.unlink()
+            self._tt_memory = self._flag_memory = None
+
+
+class _EitherFlag:
+    """Combine le drapeau partagé et un événement externe (ex : annulation par l'interface)."""
+
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+
+    def is_set(self):
+        if self.second.is_set():
+            self.first.set()
+        return self.first.is_set()
+
+
+def benchmark(position, depth, worker_counts=(1, 2, 4, 8, 16), hash_mb=64, on_result=None):
+    """
+    Mesure le temps pour atteindre `depth` selon le nombre de processus (table vidée à chaque fois).
+    :return: Liste de dictionnaires {threads, time, nodes, nps, speedup, move}.
+    """
+    rows = []
+    reference = None
+    for threads in worker_counts:
+        with ParallelSearch(threads=threads, hash_mb=hash_mb) as search:
+            search.clear_hash()
+            result = search.search(position, depth=depth)
+        reference = reference or result["time"]
+        row = {"threads": threads, "time": result["time"], "nodes": result["nodes"],
+               "nps": result["nps"], "speedup": reference / result["time"] if result["time"] else 0.0,
+               "move": result["move"]}
+        rows.append(row)
+        if on_result:
+            on_result(row)
+    return rows
@@ -0,0 +1,214 @@
+"""
+Lecture de parties au format PGN, au fil de l'eau et sans dépendance externe.
+
+iter_games() lit un fichier ligne par ligne et produit les parties une à une : la mémoire
+utilisée ne dépend que de la taille d'une partie, pas de celle de la base. Le texte des coups
+n'est analysé qu'à la première demande (en-têtes seuls = lecture très rapide), et les
+positions sont rejouées à la demande avec classes/Position.py.
+
+Sont pris en charge : en-têtes, commentaires { } et ;, variantes ( ) imbriquées,
+NAG ($n et suffixes ! ? !! ?? !? ?!), numéros de coups et résultat.
+"""
+import re
+
+from classes.Fen import FenError
+from classes.Position import Position
+
+_HEADER = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+_TOKEN = re.compile(r"""
+      \{([^}]*)\}                    # commentaire entre accolades
+    | ;([^\n]*)                      # commentaire jusqu'à la fin de ligne
+    | \$(\d+)                        # NAG
+    | ([()])                         # début / fin de variante
+    | (1-0|0-1|1/2-1/2|\*)           # résultat
+    | \d+\.+                         # numéro de coup (ignoré)
+    | ([O0]-[O0](?:-[O0])?[+\#]?|[A-Za-z][A-Za-z0-9=+\#\-]*)([!?]*)   # coup SAN et suffixe
+    """, re.VERBOSE)
+_SUFFIX_NAGS = {"!": 1, "?": 2, "!!": 3, "??": 4, "!?": 5, "?!": 6}
+RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+
+class PgnError(ValueError):
+    """Partie PGN invalide (coup illégal, parenthèse non fermée...)."""
+
+
+class PgnLine:
+    """
+    Suite de coups (ligne principale ou variante).
+    Les annotations sont rangées par nombre de coups déjà joués dans la ligne :
+    comments[0] précède le premier coup, nags[k] et comments[k] suivent le k-ième coup.
+    variations[k] contient les lignes alternatives au coup d'index k (k-ième coup = moves[k]).
+    """
+
+    def __init__(self):
+        self.moves = []
+        self.comments = {}
+        self.nags = {}
+        self.variations = {}
+
+
+class PgnGame:
+    """
+    Partie lue par iter_games() : en-têtes et texte des coups, analysé à la demande.
+    :param headers: Dictionnaire des en-têtes (dans l'ordre du fichier).
+    :param movetext: Texte des coups brut.
+    :param line_number: Ligne du fichier où commence la partie (pour les messages d'erreur).
+    """
+
+    def __init__(self, headers, movetext, line_number=None):
+        self.headers = headers
+        self.movetext = movetext
+        self.line_number = line_number
+        self._mainline = None
+        self._result = None
+
+    def _parse(self):
+        if self._mainline is None:
+            self._mainline, self._result = parse_movetext(self.movetext)
+
+    @property
+    def mainline(self):
+        """Ligne principale (PgnLine) avec commentaires, NAG et variantes."""
+        self._parse()
+        return self._mainline
+
+    @property
+    def moves(self):
+        """Coups SAN de la ligne principale."""
+        return self.mainline.moves
+
+    @property
+    def result(self):
+        """Résultat (en-tête Result, sinon marque de fin du texte des coups)."""
+        if "Result" in self.headers:
+            return self.headers["Result"]
+        self._parse()
+        return self._result or "*"
+
+    def start_position(self):
+        """
+        Position initiale : en-tête FEN s'il existe, sinon position de départ.
+        :raises PgnError: Si l'en-tête FEN est invalide.
+        """
+        fen = self.headers.get("FEN")
+        if not fen:
+            return Position.from_fen()
+        try:
+            return Position.from_fen(fen)
+        except FenError as e:
+            raise PgnError(f"en-tête FEN invalide : {e}") from e
+
+    def iter_moves(self):
+        """
+        Rejoue la ligne principale.
+        :return: Itérateur de (position avant le coup, coup encodé). La position est la même
+                 instance à chaque étape (modifiée sur place) : la copier si besoin de la garder.
+        :raises PgnError: Si un coup est illégal ou mal formé.
+        """
+        position = self.start_position()
+        for ply, san in enumerate(self.moves):
+            try:
+                move = position.parse_san(san)
+            except ValueError as e:
+                where = f" (partie ligne {self.line_number})" if self.line_number else ""
+                raise PgnError(f"demi-coup {ply + 1} : {e}{where}") from None
+            yield position, move
+            position.make_move(move)
+
+    def positions(self):
+        """
+        Itère sur la position initiale puis la position après chaque demi-coup.
+        Comme iter_moves(), la même instance est renvoyée à chaque étape.
+        """
+        position = None
+        for position, _ in self.iter_moves():
+            yield position
+        # Le générateur a joué le dernier coup en reprenant : position est la position finale
+        yield position if position is not None else self.start_position()
+
+    def fens(self):
+        """Itère sur les FEN de la position initiale et des positions après chaque demi-coup."""
+        for position in self.positions():
+            yield position.fen()
+
+
+def parse_movetext(text):
+    """
+    Analyse le texte des coups d'une partie.
+    :return: (ligne principale PgnLine, résultat ou None).
+    :raises PgnError: Si les parenthèses des variantes ne sont pas équilibrées.
+    """
+    root = PgnLine()
+    line = root
+    stack = []
+    result = None
+    for match in _TOKEN.finditer(text):
+        comment, line_comment, nag, paren, end, san, suffix = match.groups()
+        if san:
+            line.moves.append(san)
+            if suffix in _SUFFIX_NAGS:
+                line.nags.setdefault(len(line.moves), []).append(_SUFFIX_NAGS[suffix])
+        elif comment is not None or line_comment is not None:
+            text_comment = (comment if comment is not None else line_comment).strip()
+            line.comments.setdefault(len(line.moves), []).append(text_comment)
+        elif nag:
+            line.nags.setdefault(len(line.moves), []).append(int(nag))
+        elif paren == "(":
+            if not line.moves:
+                raise PgnError("variante sans coup à remplacer")
+            variation = PgnLine()
+            line.variations.setdefault(len(line.moves) - 1, []).append(variation)
+            stack.append(line)
+            line = variation
+        elif paren == ")":
+            if not stack:
+                raise PgnError("parenthèse fermante sans variante ouverte")
+            line = stack.pop()
+        elif end:
+            result = end
+    if stack:
+        raise PgnError("variante non fermée")
+    return root, result
+
+
+def iter_games(source):
+    """
+    Lit les parties d'un fichier PGN une par une (mémoire constante quelle que soit la taille).
+    :param source: Chemin du fichier ou objet fichier texte déjà ouvert.
+    :return: Itérateur de PgnGame.
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8", errors="replace") as file:
+            yield from iter_games(file)
+        return
+    headers = {}
+    movetext = []
+    start = None
+    in_comment = False
+    for number, line in enumerate(source, 1):
+        if not in_comment:
+            if line[:1] == "[":
+                if movetext:  # Un en-tête après des coups : la partie précédente est terminée
+                    yield PgnGame(headers, "".join(movetext), start)
+                    headers, movetext, start = {}, [], None
+                match = _HEADER.match(line)
+                if match:
+                    headers[match.group(1)] = match.group(2).replace('\\"', '"').replace("\\\\", "\\")
+                    start = start or number
+                continue
+            if line[:1] == "%":  # Ligne d'échappement : ignorée
+                continue
+            if not movetext and not line.strip():
+                continue
+        movetext.append(line)
+        start = start or number
+        if "{" in line or "}" in line:
+            # Les commentaires ne s'imbriquent pas : seule la dernière accolade compte
+            in_comment = line.rfind("{") > line.rfind("}")
+    if headers or movetext:
+        yield PgnGame(headers, "".join(movetext), start)
+
+
+def read_game(text):
+    """Lit la première partie d'un texte PGN (None s'il n'en contient aucune)."""
+    return next(iter_games(text.splitlines(keepends=True)), None)
@@ -0,0 +1,193 @@
+"""
+Lecture animée d'une partie chargée dans ChessUI (boutons, vitesse et barre de défilement).
+
+Un ordonnanceur basé sur after() calcule à chaque image la tête de lecture à partir de
+l'horloge (coups/seconde × temps écoulé) : si l'affichage prend du retard, les demi-coups
+intermédiaires sont sautés (GameHistory.goto) au lieu d'être rattrapés un par un. Pendant
+l'animation, seule la pièce qui bouge est déplacée avec coords().
+"""
+import time
+import tkinter as tk
+from tkinter import filedialog
+
+from classes.Pgn import iter_games
+from classes.Position import square_to_rowcol
+
+FRAME_MS = 16            # Intervalle entre deux images (~60 images/s)
+ANIMATION_TIME = 0.25    # Durée maximale du glissement d'une pièce (secondes)
+ANIMATION_SHARE = 0.7    # Part de l'intervalle entre deux coups consacrée au glissement
+
+
+class PlaybackController:
+    """
+    Commandes de lecture d'une partie : ouvrir, coup précédent/suivant, lecture/pause,
+    vitesse et position dans la partie.
+    :param ui: Instance de ChessUI (fournit game_history, canvas et show_history_position).
+    :param parent: Widget Tk dans lequel placer les commandes.
+    """
+
+    def __init__(self, ui, parent):
+        self.ui = ui
+        self.frame = tk.Frame(parent)
+        self.playing = False
+        self.after_id = None
+        self._anchor_time = 0.0   # Instant et demi-coup de référence de la tête de lecture
+        self._anchor_ply = 0.0
+        self._animated = None     # (item, départ (x, y), arrivée (x, y)) de la pièce qui glisse
+
+        self.open_button = tk.Button(self.frame, text="Ouvrir un PGN", command=self.open_file)
+        self.open_button.grid(row=0, column=0, padx=2)
+        self.prev_button = tk.Button(self.frame, text="◀", width=3, command=self.step_back)
+        self.prev_button.grid(row=0, column=1, padx=2)
+        self.play_button = tk.Button(self.frame, text="Lecture", width=7, command=self.toggle)
+        self.play_button.grid(row=0, column=2, padx=2)
+        self.next_button = tk.Button(self.frame, text="▶", width=3, command=self.step_forward)
+        self.next_button.grid(row=0, column=3, padx=2)
+        self.speed = tk.DoubleVar(value=2.0)
+        self._last_speed = self.speed.get()
+        self.speed_scale = tk.Scale(self.frame, label="Coups/s", from_=0.5, to=30, resolution=0.5,
+                                    orient="horizontal", variable=self.speed, command=self.on_speed)
+        self.speed_scale.grid(row=0, column=4, padx=2)
+        self.scrubber = tk.Scale(self.frame, from_=0, to=0, orient="horizontal", showvalue=True,
+                                 length=400, command=self.on_scrub)
+        self.scrubber.grid(row=1, column=0, columnspan=5, sticky="ew")
+        self.update_controls()
+
+    # --- Commandes ---
+
+    def open_file(self):
+        """Demande un fichier PGN et en charge la première partie."""
+        path = filedialog.askopenfilename(filetypes=[("Parties PGN", "*.pgn"), ("Tous les fichiers", "*.*")])
+        if not path:
+            return
+        self.pause()
+        try:
+            game = next(iter_games(path), None)
+            if game is None:
+                self.ui.show_error("PGN non chargé : aucune partie dans le fichier")
+                return
+            self.ui.load_game(game)
+        except (OSError, ValueError) as e:   # PgnError et FenError dérivent de ValueError
+            self.ui.show_error(f"PGN non chargé : {e}")
+
+    def step_back(self):
+        """Recule d'un demi-coup (suspend la lecture)."""
+        self.pause()
+        self.ui.prev_move()
+
+    def step_forward(self):
+        """Avance d'un demi-coup (suspend la lecture)."""
+        self.pause()
+        self.ui.next_move()
+
+    def toggle(self):
+        """Lance ou suspend la lecture."""
+        if self.playing:
+            self.pause()
+        else:
+            self.play()
+
+    def play(self):
+        """Lit la partie depuis la position affichée (reprend au début si elle est terminée)."""
+        history = self.ui.game_history
+        if history is None or not len(history):
+            return
+        if history.ply >= len(history):
+            self.ui.goto_move(0)
+        self.playing = True
+        self._set_anchor(history.ply)
+        self.play_button.config(text="Pause")
+        self.after_id = self.ui.root.after(FRAME_MS, self._tick)
+
+    def pause(self):
+        """Suspend la lecture ; la pièce en cours de glissement revient sur sa case."""
+        if self.after_id is not None:
+            self.ui.root.after_cancel(self.after_id)
+            self.after_id = None
+        self._stop_animation(reset=True)
+        self.playing = False
+        self.play_button.config(text="Lecture")
+
+    def on_speed(self, _value):
+        """Changement de vitesse : la tête de lecture repart de sa position actuelle."""
+        if self.playing:
+            self._set_anchor(self._playhead(self._last_speed))
+        self._last_speed = self.speed.get()
+
+    def on_scrub(self, value):
+        """Déplacement de la barre : affiche le demi-coup choisi (suspend la lecture)."""
+        history = self.ui.game_history
+        # scrubber.set() (update_controls) rappelle aussi cette fonction : on ignore ce cas
+        if history is None or int(value) == history.ply:
+            return
+        self.pause()
+        self.ui.goto_move(int(value))
+
+    def update_controls(self):
+        """Synchronise boutons et barre de défilement avec la position affichée."""
+        history = self.ui.game_history
+        ply, length = (history.ply, len(history)) if history is not None else (0, 0)
+        self.prev_button.config(state="normal" if ply > 0 else "disabled")
+        self.next_button.config(state="normal" if ply < length else "disabled")
+        self.play_button.config(state="normal" if length else "disabled")
+        self.scrubber.config(to=length)
+        self.scrubber.set(ply)
+
+    # --- Ordonnanceur ---
+
+    def _set_anchor(self, ply):
+        self._anchor_time = time.perf_counter()
+        self._anchor_ply = ply
+        self._last_speed = self.speed.get()
+
+    def _playhead(self, speed=None):
+        """Demi-coup (fractionnaire) que l'horloge désigne maintenant."""
+        speed = self.speed.get() if speed is None else speed
+        return self._anchor_ply + (time.perf_counter() - self._anchor_time) * speed
+
+    def _tick(self):
+        """Une image : avance la partie selon l'horloge et fait glisser la pièce du coup en cours."""
+        self.after_id = None
+        history = self.ui.game_history
+        playhead = self._playhead()
+        target = int(playhead)
+        if target >= len(history):
+            self._stop_animation()
+            self.ui.goto_move(len(history))
+            self.pause()
+            return
+        if history.ply < target:
+            # En retard : on saute directement au bon demi-coup (images intermédiaires abandonnées)
+            self._stop_animation()
+            self.ui.goto_move(target)
+        if history.ply == target:
+            speed = self.speed.get()
+            duration = min(ANIMATION_TIME, ANIMATION_SHARE / speed)
+            fraction = (playhead - target) / speed / duration
+            if fraction >= 1:
+                self._stop_animation()
+                self.ui.next_move()
+            else:
+                self._animate(history.moves[target], fraction)
+        self.after_id = self.ui.root.after(FRAME_MS, self._tick)
+
+    def _animate(self, move, fraction):
+        """Place la pièce du coup `move` à `fraction` du trajet entre ses deux cases."""
+        if self._animated is None:
+            src_row, src_col = square_to_rowcol(move & 63)
+            item = self.ui.piece_items.get((src_row, src_col))
+            if item is None:
+                return
+            start = self.ui.square_center(src_row, src_col)
+            end = self.ui.square_center(*square_to_rowcol((move >> 6) & 63))
+            self.ui.canvas.tag_raise(item)
+            self._animated = (item, start, end)
+        item, (x1, y1), (x2, y2) = self._animated
+        self.ui.canvas.coords(item, x1 + (x2 - x1) * fraction, y1 + (y2 - y1) * fraction)
+
+    def _stop_animation(self, reset=False):
+        """Termine le glissement en cours (en remettant la pièce sur sa case si reset)."""
+        if self._animated is not None and reset:
+            item, start, _ = self._animated
+            self.ui.canvas.coords(item, *start)
+        self._animated = None
@@ -0,0 +1,947 @@
+"""
+Modèle de position d'échecs sans interface graphique, basé sur des bitboards 64 bits.
+
+Convention des cases : a1 = 0, b1 = 1, ..., h8 = 63 (bit n <=> case n).
+Les coordonnées (ligne, colonne) de ChessUI (ligne 0 = rangée 8) sont converties
+avec square() / square_to_rowcol().
+"""
+from classes.Fen import parse_fen, format_fen
+
+# --- Couleurs et types de pièces ---
+WHITE, BLACK = 0, 1
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+EMPTY = -1
+
+# Index d'une pièce = couleur * 6 + type (ex : "bn" -> 7)
+PIECE_NAMES = ("wp", "wn", "wb", "wr", "wq", "wk", "bp", "bn", "bb", "br", "bq", "bk")
+PIECE_INDEX = {name: index for index, name in enumerate(PIECE_NAMES)}
+COLOR_NAMES = ("w", "b")
+
+FILE_NAMES = "abcdefgh"
+RANK_NAMES = "12345678"
+
+BB_ALL = 0xFFFFFFFFFFFFFFFF
+BB_RANK_1 = 0xFF
+BB_RANK_2 = BB_RANK_1 << 8
+BB_RANK_3 = BB_RANK_1 << 16
+BB_RANK_6 = BB_RANK_1 << 40
+BB_RANK_7 = BB_RANK_1 << 48
+BB_RANK_8 = BB_RANK_1 << 56
+BB_FILE_A = 0x0101010101010101
+BB_FILE_H = BB_FILE_A << 7
+BB_SQUARES = [1 << sq for sq in range(64)]
+
+# --- Droits de roque (bits) ---
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+
+# Droits conservés quand une pièce quitte ou atteint une case (coins et rois)
+CASTLING_MASK = [0xF] * 64
+CASTLING_MASK[0] = 0xF ^ CASTLE_WQ
+CASTLING_MASK[7] = 0xF ^ CASTLE_WK
+CASTLING_MASK[4] = 0xF ^ (CASTLE_WK | CASTLE_WQ)
+CASTLING_MASK[56] = 0xF ^ CASTLE_BQ
+CASTLING_MASK[63] = 0xF ^ CASTLE_BK
+CASTLING_MASK[60] = 0xF ^ (CASTLE_BK | CASTLE_BQ)
+
+# Roques : (droit, case du roi, case d'arrivée du roi, tour départ, tour arrivée,
+#           cases devant être vides, cases ne devant pas être attaquées)
+CASTLINGS = (
+    (CASTLE_WK, 4, 6, 7, 5, (1 << 5) | (1 << 6), (5, 6)),
+    (CASTLE_WQ, 4, 2, 0, 3, (1 << 1) | (1 << 2) | (1 << 3), (3, 2)),
+    (CASTLE_BK, 60, 62, 63, 61, (1 << 61) | (1 << 62), (61, 62)),
+    (CASTLE_BQ, 60, 58, 56, 59, (1 << 57) | (1 << 58) | (1 << 59), (59, 58)),
+)
+# Déplacement de la tour associé à la case d'arrivée du roi
+CASTLING_ROOK = {6: (7, 5), 2: (0, 3), 62: (63, 61), 58: (56, 59)}
+
+# --- Encodage des coups (entier) ---
+# bits 0-5 : départ, bits 6-11 : arrivée, bits 12-13 : type, bits 14+ : pièce de promotion
+MOVE_NORMAL, MOVE_CASTLING, MOVE_EN_PASSANT, MOVE_PROMOTION = range(4)
+PROMOTION_CHARS = {KNIGHT: "n", BISHOP: "b", ROOK: "r", QUEEN: "q"}
+SAN_PIECES = "PNBRQK"  # Lettres des pièces en notation algébrique, indexées par type
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def encode_move(src, dst, flag=MOVE_NORMAL, promotion=0):
+    """Encode un coup en entier (voir la description des bits ci-dessus)."""
+    return src | (dst << 6) | (flag << 12) | (promotion << 14)
+
+
+def move_from(move):
+    """Case de départ d'un coup encodé."""
+    return move & 63
+
+
+def move_to(move):
+    """Case d'arrivée d'un coup encodé."""
+    return (move >> 6) & 63
+
+
+def move_flag(move):
+    """Type d'un coup encodé (MOVE_NORMAL, MOVE_CASTLING, ...)."""
+    return (move >> 12) & 3
+
+
+def move_promotion(move):
+    """Type de la pièce de promotion (0 si aucune)."""
+    return move >> 14
+
+
+def move_to_uci(move):
+    """Notation UCI d'un coup (ex : 'e2e4', 'e7e8q')."""
+    text = square_name(move & 63) + square_name((move >> 6) & 63)
+    if move >> 14:
+        text += PROMOTION_CHARS[move >> 14]
+    return text
+
+
+def square(row, col):
+    """
+    Convertit des coordonnées ChessUI en index de case.
+    :param row: Ligne (0 = rangée 8).
+    :param col: Colonne (0 = colonne a).
+    :return: Index de case (a1 = 0).
+    """
+    return (7 - row) * 8 + col
+
+
+def square_to_rowcol(sq):
+    """Convertit un index de case en coordonnées (ligne, colonne) de ChessUI."""
+    return 7 - (sq >> 3), sq & 7
+
+
+def square_name(sq):
+    """Retourne le nom d'une case (ex : 0 -> 'a1')."""
+    return FILE_NAMES[sq & 7] + RANK_NAMES[sq >> 3]
+
+
+def parse_square(name):
+    """Retourne l'index d'une case à partir de son nom (ex : 'e4' -> 28)."""
+    return RANK_NAMES.index(name[1]) * 8 + FILE_NAMES.index(name[0])
+
+
+def iter_bits(bb):
+    """Itère sur les index des bits à 1 d'un bitboard (du plus faible au plus fort)."""
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+def popcount(bb):
+    """Nombre de bits à 1 d'un bitboard."""
+    return bin(bb).count("1")
+
+
+# --- Tables d'attaques précalculées (construites une seule fois à l'import) ---
+
+def _step_attacks(offsets):
+    """Construit une table d'attaques pour des déplacements à un pas (cavalier, roi, pion)."""
+    table = []
+    for sq in range(64):
+        rank, file = sq >> 3, sq & 7
+        bb = 0
+        for dr, df in offsets:
+            r, f = rank + dr, file + df
+            if 0 <= r < 8 and 0 <= f < 8:
+                bb |= 1 << (r * 8 + f)
+        table.append(bb)
+    return table
+
+
+KNIGHT_ATTACKS = _step_attacks([(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)])
+KING_ATTACKS = _step_attacks([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)])
+PAWN_ATTACKS = (
+    _step_attacks([(1, -1), (1, 1)]),    # Blancs : captures vers le haut
+    _step_attacks([(-1, -1), (-1, 1)]),  # Noirs : captures vers le bas
+)
+
+# Directions des rayons : (delta rangée, delta colonne)
+RAY_DIRECTIONS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+
+
+def _build_rays():
+    """RAYS[d][sq] : cases atteintes depuis sq dans la direction d sur un échiquier vide."""
+    rays = []
+    for dr, df in RAY_DIRECTIONS:
+        table = []
+        for sq in range(64):
+            r, f = (sq >> 3) + dr, (sq & 7) + df
+            bb = 0
+            while 0 <= r < 8 and 0 <= f < 8:
+                bb |= 1 << (r * 8 + f)
+                r, f = r + dr, f + df
+            table.append(bb)
+        rays.append(table)
+    return rays
+
+
+RAYS = _build_rays()
+
+
+def _ray_attacks(sq, occupied, direction):
+    """Attaques dans une direction, arrêtées par le premier bloqueur (inclus)."""
+    ray = RAYS[direction][sq]
+    blockers = ray & occupied
+    if blockers:
+        dr, df = RAY_DIRECTIONS[direction]
+        if dr * 8 + df > 0:
+            first = (blockers & -blockers).bit_length() - 1
+        else:
+            first = blockers.bit_length() - 1
+        ray ^= RAYS[direction][first]
+    return ray
+
+
+def _build_line_tables(directions):
+    """
+    Pour chaque case et chaque ligne (paire de directions opposées), associe chaque
+    sous-ensemble d'occupation de la ligne au bitboard d'attaques correspondant.
+    :return: (masques, tables) indexés par [ligne][case].
+    """
+    masks, tables = [], []
+    for d1, d2 in directions:
+        line_masks, line_tables = [], []
+        for sq in range(64):
+            mask = RAYS[d1][sq] | RAYS[d2][sq]
+            table = {}
+            subset = 0
+            while True:
+                table[subset] = _ray_attacks(sq, subset, d1) | _ray_attacks(sq, subset, d2)
+                subset = (subset - mask) & mask
+                if subset == 0:
+                    break
+            line_masks.append(mask)
+            line_tables.append(table)
+        masks.append(line_masks)
+        tables.append(line_tables)
+    return masks, tables
+
+
+# Lignes : rangée (E/O), colonne (N/S), diagonale (NE/SO), anti-diagonale (NO/SE)
+(_RANK_MASK, _FILE_MASK), (_RANK_TABLE, _FILE_TABLE) = _build_line_tables(((2, 6), (0, 4)))
+(_DIAG_MASK, _ANTI_MASK), (_DIAG_TABLE, _ANTI_TABLE) = _build_line_tables(((1, 5), (7, 3)))
+
+
+def rook_attacks(sq, occupied):
+    """Attaques d'une tour en sq pour une occupation donnée (deux lectures de table)."""
+    return (_RANK_TABLE[sq][occupied & _RANK_MASK[sq]]
+            | _FILE_TABLE[sq][occupied & _FILE_MASK[sq]])
+
+
+def bishop_attacks(sq, occupied):
+    """Attaques d'un fou en sq pour une occupation donnée (deux lectures de table)."""
+    return (_DIAG_TABLE[sq][occupied & _DIAG_MASK[sq]]
+            | _ANTI_TABLE[sq][occupied & _ANTI_MASK[sq]])
+
+
+def queen_attacks(sq, occupied):
+    """Attaques d'une dame en sq pour une occupation donnée."""
+    return rook_attacks(sq, occupied) | bishop_attacks(sq, occupied)
+
+
+def _build_between_and_lines():
+    """
+    BETWEEN[a][b] : cases strictement entre a et b (alignées), 0 sinon.
+    LINE[a][b] : ligne entière passant par a et b (alignées), 0 sinon.
+    """
+    between = [[0] * 64 for _ in range(64)]
+    lines = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        for direction in range(8):
+            opposite = (direction + 4) % 8
+            full_line = RAYS[direction][a] | RAYS[opposite][a] | BB_SQUARES[a]
+            for b in iter_bits(RAYS[direction][a]):
+                between[a][b] = RAYS[direction][a] & ~RAYS[direction][b] & ~BB_SQUARES[b]
+                lines[a][b] = full_line
+    return between, lines
+
+
+BETWEEN, LINE = _build_between_and_lines()
+
+
+# --- Clés de Zobrist (graine fixe : les clés sont identiques d'une exécution à l'autre) ---
+
+def _build_zobrist(seed=0x4B436865):
+    """Tire les nombres aléatoires 64 bits des pièces, roques, colonnes en passant et trait."""
+    import random
+    rng = random.Random(seed)
+    pieces = [[rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+    castling_bits = [rng.getrandbits(64) for _ in range(4)]
+    castling = []
+    for rights in range(16):
+        key = 0
+        for bit in range(4):
+            if rights & (1 << bit):
+                key ^= castling_bits[bit]
+        castling.append(key)
+    ep_files = [rng.getrandbits(64) for _ in range(8)]
+    return pieces, castling, ep_files, rng.getrandbits(64)
+
+
+ZOBRIST_PIECES, ZOBRIST_CASTLING, ZOBRIST_EP, ZOBRIST_TURN = _build_zobrist()
+
+
+class Position:
+    """
+    Position d'échecs : un bitboard par pièce, un par couleur, et un tableau
+    de 64 cases (index de pièce ou EMPTY) pour retrouver la pièce d'une case en O(1).
+    """
+
+    def __init__(self):
+        self.pieces = [0] * 12          # Bitboards par index de pièce
+        self.occupied_by = [0, 0]       # Bitboards par couleur
+        self.occupied = 0               # Toutes les pièces
+        self.squares = [EMPTY] * 64     # Pièce de chaque case
+        self.turn = WHITE
+        self.castling = 0               # Droits de roque (bits CASTLE_*)
+        self.ep_square = -1             # Case de prise en passant (-1 si aucune)
+        self.halfmove_clock = 0
+        self.fullmove_number = 1
+        self.key = 0                    # Clé de Zobrist, maintenue incrémentalement
+        self.history = []               # Pile d'annulation alimentée par make_move
+
+    @classmethod
+    def from_fen(cls, fen=START_FEN, strict=True):
+        """
+        Construit une position depuis une chaîne FEN (décodée par classes/Fen.py).
+        :param fen: Notation FEN (les champs manquants prennent leur valeur par défaut).
+        :param strict: Refuse les positions incohérentes (voir Fen.parse_fen).
+        :return: Nouvelle Position.
+        :raises FenError: Si la FEN est invalide.
+        """
+        return cls.from_fen_fields(parse_fen(fen, strict))
+
+    @classmethod
+    def from_fen_fields(cls, fields):
+        """Construit une position depuis une FEN déjà décodée (Fen.FenFields)."""
+        position = cls()
+        for sq, piece in enumerate(fields.squares):
+            if piece != EMPTY:
+                position.put_piece(piece, sq)
+        position.turn = fields.turn
+        position.castling = fields.castling
+        position.ep_square = fields.ep_square
+        position.halfmove_clock = fields.halfmove_clock
+        position.fullmove_number = fields.fullmove_number
+        position.key = position.compute_key()
+        return position
+
+    def fen(self):
+        """Retourne la notation FEN complète de la position."""
+        return format_fen(self.squares, self.turn, self.castling, self.ep_square,
+                          self.halfmove_clock, self.fullmove_number)
+
+    def copy(self):
+        """Retourne une copie indépendante de la position."""
+        position = Position.__new__(Position)
+        position.pieces = self.pieces[:]
+        position.occupied_by = self.occupied_by[:]
+        position.occupied = self.occupied
+        position.squares = self.squares[:]
+        position.turn = self.turn
+        position.castling = self.castling
+        position.ep_square = self.ep_square
+        position.halfmove_clock = self.halfmove_clock
+        position.fullmove_number = self.fullmove_number
+        position.key = self.key
+        position.history = self.history[:]
+        return position
+
+    def _ep_is_capturable(self):
+        """True si le camp au trait a un pion pouvant prendre en passant (seul cas haché)."""
+        ep = self.ep_square
+        return ep >= 0 and bool(PAWN_ATTACKS[self.turn ^ 1][ep] & self.pieces[self.turn * 6 + PAWN])
+
+    def compute_key(self):
+        """Calcule la clé de Zobrist depuis zéro (les coups la mettent ensuite à jour en O(1))."""
+        key = ZOBRIST_CASTLING[self.castling]
+        for sq, piece in enumerate(self.squares):
+            if piece != EMPTY:
+                key ^= ZOBRIST_PIECES[piece][sq]
+        if self._ep_is_capturable():
+            key ^= ZOBRIST_EP[self.ep_square & 7]
+        if self.turn == BLACK:
+            key ^= ZOBRIST_TURN
+        return key
+
+    @classmethod
+    def from_board(cls, board, turn="w"):
+        """
+        Construit une position depuis la matrice de ChessUI.
+        Les droits de roque sont déduits de la place des rois et des tours.
+        :param board: Liste de 8 listes de chaînes ("wp", "bk", "" ...), ligne 0 = rangée 8.
+        :param turn: Trait ("w" ou "b").
+        :return: Nouvelle Position.
+        """
+        position = cls()
+        for row, pieces in enumerate(board):
+            for col, name in enumerate(pieces):
+                if name:
+                    position.put_piece(PIECE_INDEX[name], square(row, col))
+        position.turn = WHITE if turn == "w" else BLACK
+        # Sans historique, on accorde les roques dont le roi et la tour sont sur leurs cases d'origine
+        for right, king_from, _, rook_from, _, _, _ in CASTLINGS:
+            color = WHITE if king_from < 8 else BLACK
+            if (position.squares[king_from] == color * 6 + KING
+                    and position.squares[rook_from] == color * 6 + ROOK):
+                position.castling |= right
+        position.key = position.compute_key()
+        return position
+
+    def to_board(self):
+        """Retourne la matrice équivalente au format de ChessUI."""
+        board = []
+        for row in range(8):
+            base = (7 - row) * 8
+            board.append([PIECE_NAMES[p] if p != EMPTY else "" for p in self.squares[base:base + 8]])
+        return board
+
+    def put_piece(self, piece, sq):
+        """Pose une pièce (index) sur une case vide."""
+        bb = BB_SQUARES[sq]
+        self.pieces[piece] |= bb
+        self.occupied_by[piece // 6] |= bb
+        self.occupied |= bb
+        self.squares[sq] = piece
+        self.key ^= ZOBRIST_PIECES[piece][sq]
+
+    def remove_piece(self, sq):
+        """Retire la pièce d'une case et retourne son index (EMPTY si vide)."""
+        piece = self.squares[sq]
+        if piece != EMPTY:
+            bb = BB_SQUARES[sq]
+            self.pieces[piece] ^= bb
+            self.occupied_by[piece // 6] ^= bb
+            self.occupied ^= bb
+            self.squares[sq] = EMPTY
+            self.key ^= ZOBRIST_PIECES[piece][sq]
+        return piece
+
+    def piece_at(self, sq):
+        """Retourne le nom de la pièce d'une case ("" si vide)."""
+        piece = self.squares[sq]
+        return PIECE_NAMES[piece] if piece != EMPTY else ""
+
+    def king_square(self, color):
+        """Case du roi de la couleur donnée (-1 s'il est absent)."""
+        return self.pieces[color * 6 + KING].bit_length() - 1
+
+    def attackers_to(self, sq, color, occupied=None):
+        """
+        Bitboard des pièces de `color` qui attaquent la case sq.
+        :param occupied: Occupation à utiliser pour les pièces glissantes (par défaut, l'actuelle).
+        """
+        if occupied is None:
+            occupied = self.occupied
+        base = color * 6
+        pieces = self.pieces
+        attackers = (PAWN_ATTACKS[color ^ 1][sq] & pieces[base + PAWN]
+                     | KNIGHT_ATTACKS[sq] & pieces[base + KNIGHT]
+                     | KING_ATTACKS[sq] & pieces[base + KING])
+        queens = pieces[base + QUEEN]
+        diagonal = pieces[base + BISHOP] | queens
+        if diagonal:
+            attackers |= bishop_attacks(sq, occupied) & diagonal
+        straight = pieces[base + ROOK] | queens
+        if straight:
+            attackers |= rook_attacks(sq, occupied) & straight
+        return attackers
+
+    def is_attacked(self, sq, color):
+        """True si la case sq est attaquée par une pièce de `color`."""
+        return self.attackers_to(sq, color) != 0
+
+    def attacks_from(self, sq):
+        """Bitboard des cases attaquées par la pièce située en sq (0 si vide)."""
+        piece = self.squares[sq]
+        if piece == EMPTY:
+            return 0
+        color, kind = divmod(piece, 6)
+        if kind == PAWN:
+            return PAWN_ATTACKS[color][sq]
+        if kind == KNIGHT:
+            return KNIGHT_ATTACKS[sq]
+        if kind == BISHOP:
+            return bishop_attacks(sq, self.occupied)
+        if kind == ROOK:
+            return rook_attacks(sq, self.occupied)
+        if kind == QUEEN:
+            return queen_attacks(sq, self.occupied)
+        return KING_ATTACKS[sq]
+
+    def is_pseudo_legal(self, src, dst):
+        """
+        Vérifie que la pièce en src peut aller en dst selon son mode de déplacement
+        (trajet libre, pas de capture d'une pièce alliée), sans tenir compte des échecs.
+        :param src: Case de départ.
+        :param dst: Case d'arrivée.
+        :return: True si le déplacement respecte les règles de la pièce.
+        """
+        piece = self.squares[src]
+        if piece == EMPTY:
+            return False
+        color = piece // 6
+        dst_bb = BB_SQUARES[dst]
+        if self.occupied_by[color] & dst_bb:
+            return False
+        if piece % 6 != PAWN:
+            return bool(self.attacks_from(src) & dst_bb)
+
+        # Pion : capture en diagonale, avance simple ou double depuis la rangée de départ
+        if PAWN_ATTACKS[color][src] & dst_bb:
+            return bool(self.occupied_by[color ^ 1] & dst_bb)
+        step = 8 if color == WHITE else -8
+        if self.occupied & dst_bb:
+            return False
+        if dst == src + step:
+            return True
+        start_rank = BB_RANK_2 if color == WHITE else BB_RANK_7
+        return (dst == src + 2 * step and bool(BB_SQUARES[src] & start_rank)
+                and not self.occupied & BB_SQUARES[src + step])
+
+    def in_check(self):
+        """True si le camp au trait est en échec."""
+        return self.attackers_to(self.king_square(self.turn), self.turn ^ 1) != 0
+
+    # --- Génération des coups ---
+
+    def _add_pawn_moves(self, moves, src, dst, flag=MOVE_NORMAL):
+        """Ajoute un coup de pion, décliné en quatre promotions sur la dernière rangée."""
+        if dst >= 56 or dst < 8:
+            for promotion in (QUEEN, ROOK, BISHOP, KNIGHT):
+                moves.append(src | (dst << 6) | (MOVE_PROMOTION << 12) | (promotion << 14))
+        else:
+            moves.append(src | (dst << 6) | (flag << 12))
+
+    def _pawn_targets(self, color):
+        """
+        Cibles des pions par décalage de bitboards.
+        :return: Liste de (delta, bitboard d'arrivée) ; départ = arrivée - delta.
+        """
+        pawns = self.pieces[color * 6 + PAWN]
+        empty = ~self.occupied & BB_ALL
+        enemy = self.occupied_by[color ^ 1]
+        if color == WHITE:
+            single = (pawns << 8) & empty
+            double = ((single & BB_RANK_3) << 8) & empty
+            left = ((pawns & ~BB_FILE_A) << 7) & enemy
+            right = ((pawns & ~BB_FILE_H) << 9) & enemy
+            return ((8, single), (16, double), (7, left), (9, right))
+        single = (pawns >> 8) & empty
+        double = ((single & BB_RANK_6) >> 8) & empty
+        left = ((pawns & ~BB_FILE_A) >> 9) & enemy
+        right = ((pawns & ~BB_FILE_H) >> 7) & enemy
+        return ((-8, single), (-16, double), (-9, left), (-7, right))
+
+    def _castling_moves(self, moves):
+        """Ajoute les roques possibles (cases libres, roi ni en échec ni traversant une case attaquée)."""
+        them = self.turn ^ 1
+        king, rook = self.turn * 6 + KING, self.turn * 6 + ROOK
+        for right, king_from, king_to, rook_from, _, empty_mask, safe_squares in CASTLINGS[self.turn * 2:self.turn * 2 + 2]:
+            if (self.castling & right and self.squares[king_from] == king and self.squares[rook_from] == rook
+                    and not self.occupied & empty_mask
+                    and not self.attackers_to(king_from, them)
+                    and not any(self.attackers_to(sq, them) for sq in safe_squares)):
+                moves.append(king_from | (king_to << 6) | (MOVE_CASTLING << 12))
+
+    def pseudo_legal_moves(self):
+        """
+        Coups pseudo-légaux du camp au trait : chaque pièce n'émet que ses cases atteignables,
+        sans vérifier que le roi reste hors d'échec (les roques sont toutefois vérifiés).
+        :return: Liste de coups encodés.
+        """
+        us = self.turn
+        base = us * 6
+        pieces = self.pieces
+        occupied = self.occupied
+        not_own = ~self.occupied_by[us] & BB_ALL
+        moves = []
+
+        for delta, targets in self._pawn_targets(us):
+            for dst in iter_bits(targets):
+                self._add_pawn_moves(moves, dst - delta, dst)
+        if self.ep_square >= 0:
+            for src in iter_bits(PAWN_ATTACKS[us ^ 1][self.ep_square] & pieces[base + PAWN]):
+                moves.append(src | (self.ep_square << 6) | (MOVE_EN_PASSANT << 12))
+
+        for src in iter_bits(pieces[base + KNIGHT]):
+            for dst in iter_bits(KNIGHT_ATTACKS[src] & not_own):
+                moves.append(src | (dst << 6))
+        for src in iter_bits(pieces[base + BISHOP]):
+            for dst in iter_bits(bishop_attacks(src, occupied) & not_own):
+                moves.append(src | (dst << 6))
+        for src in iter_bits(pieces[base + ROOK]):
+            for dst in iter_bits(rook_attacks(src, occupied) & not_own):
+                moves.append(src | (dst << 6))
+        for src in iter_bits(pieces[base + QUEEN]):
+            for dst in iter_bits(queen_attacks(src, occupied) & not_own):
+                moves.append(src | (dst << 6))
+        for src in iter_bits(pieces[base + KING]):
+            for dst in iter_bits(KING_ATTACKS[src] & not_own):
+                moves.append(src | (dst << 6))
+        self._castling_moves(moves)
+        return moves
+
+    def pinned_pieces(self, color):
+        """Bitboard des pièces de `color` clouées sur leur roi."""
+        king = self.king_square(color)
+        if king < 0:
+            return 0
+        base = (color ^ 1) * 6
+        pieces = self.pieces
+        queens = pieces[base + QUEEN]
+        snipers = (rook_attacks(king, 0) & (pieces[base + ROOK] | queens)
+                   | bishop_attacks(king, 0) & (pieces[base + BISHOP] | queens))
+        pinned = 0
+        own = self.occupied_by[color]
+        for sniper in iter_bits(snipers):
+            blockers = BETWEEN[king][sniper] & self.occupied
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+        return pinned
+
+    def legal_moves(self, captures_only=False):
+        """
+        Coups légaux du camp au trait (roques, prise en passant et promotions compris).
+        Les échecs et les clouages sont traités par masques, sans jouer les coups.
+        :param captures_only: Ne génère que les captures et les promotions (recherche de quiescence).
+        :return: Liste de coups encodés.
+        """
+        us, them = self.turn, self.turn ^ 1
+        base = us * 6
+        pieces = self.pieces
+        occupied = self.occupied
+        not_own = ~self.occupied_by[us] & BB_ALL
+        if captures_only:
+            not_own &= self.occupied_by[them]
+        king = self.king_square(us)
+        moves = []
+        if king < 0:
+            return self.pseudo_legal_moves()
+
+        # Roi : la case d'arrivée ne doit pas être attaquée une fois le roi parti
+        without_king = occupied ^ BB_SQUARES[king]
+        for dst in iter_bits(KING_ATTACKS[king] & not_own):
+            if not self.attackers_to(dst, them, without_king):
+                moves.append(king | (dst << 6))
+
+        checkers = self.attackers_to(king, them)
+        if checkers & (checkers - 1):
+            return moves  # Échec double : seul le roi peut bouger
+        if checkers:
+            target_mask = checkers | BETWEEN[king][checkers.bit_length() - 1]
+        else:
+            target_mask = BB_ALL
+            if not captures_only:
+                self._castling_moves(moves)
+
+        pinned = self.pinned_pieces(us)
+        line = LINE[king]
+        allowed = not_own & target_mask
+
+        for src in iter_bits(pieces[base + KNIGHT] & ~pinned):
+            for dst in iter_bits(KNIGHT_ATTACKS[src] & allowed):
+                moves.append(src | (dst << 6))
+        for kind, attacks in ((BISHOP, bishop_attacks), (ROOK, rook_attacks), (QUEEN, queen_attacks)):
+            for src in iter_bits(pieces[base + kind]):
+                targets = attacks(src, occupied) & allowed
+                if pinned & BB_SQUARES[src]:
+                    targets &= line[src]
+                for dst in iter_bits(targets):
+                    moves.append(src | (dst << 6))
+
+        pawn_mask = target_mask
+        if captures_only:
+            pawn_mask &= self.occupied_by[them] | BB_RANK_1 | BB_RANK_8
+        for delta, targets in self._pawn_targets(us):
+            for dst in iter_bits(targets & pawn_mask):
+                src = dst - delta
+                if pinned & BB_SQUARES[src] and not line[src] & BB_SQUARES[dst]:
+                    continue
+                self._add_pawn_moves(moves, src, dst)
+
+        # Prise en passant : vérifiée en simulant l'occupation après la prise
+        ep = self.ep_square
+        if ep >= 0:
+            captured = ep - 8 if us == WHITE else ep + 8
+            for src in iter_bits(PAWN_ATTACKS[them][ep] & pieces[base + PAWN]):
+                after = occupied ^ BB_SQUARES[src] ^ BB_SQUARES[captured] | BB_SQUARES[ep]
+                if not self.attackers_to(king, them, after) & ~BB_SQUARES[captured]:
+                    moves.append(src | (ep << 6) | (MOVE_EN_PASSANT << 12))
+        return moves
+
+    def is_legal(self, move):
+        """True si le coup encodé fait partie des coups légaux de la position."""
+        return move in self.legal_moves()
+
+    def find_move(self, src, dst, promotion=QUEEN):
+        """
+        Retrouve le coup légal allant de src à dst (utile pour les clics de l'interface).
+        :param promotion: Pièce choisie si le coup est une promotion.
+        :return: Coup encodé, ou None si le déplacement est illégal.
+        """
+        found = None
+        for move in self.legal_moves():
+            if move & 63 == src and (move >> 6) & 63 == dst:
+                if move >> 14 in (0, promotion):
+                    return move
+                found = move
+        return found
+
+    def parse_uci(self, text):
+        """
+        Convertit un coup UCI ('e2e4', 'a7a8q') en coup légal encodé.
+        :raises ValueError: si le coup est mal formé ou illégal.
+        """
+        try:
+            src, dst = parse_square(text[0:2]), parse_square(text[2:4])
+            promotion = {"n": KNIGHT, "b": BISHOP, "r": ROOK, "q": QUEEN}[text[4]] if len(text) > 4 else 0
+        except (ValueError, IndexError, KeyError):
+            raise ValueError(f"Coup UCI invalide : {text!r}")
+        for move in self.legal_moves():
+            if move & 63 == src and (move >> 6) & 63 == dst and move >> 14 == promotion:
+                return move
+        raise ValueError(f"Coup illégal dans cette position : {text}")
+
+    def parse_san(self, text):
+        """
+        Convertit un coup en notation algébrique standard ('Nf3', 'exd5', 'O-O', 'e8=Q+')
+        en coup légal encodé. Les suffixes d'échec et d'annotation (+ # ! ?) sont ignorés.
+        :raises ValueError: si le coup est mal formé, illégal ou ambigu.
+        """
+        san = text.rstrip("+#!?")
+        if san in ("O-O", "0-0", "O-O-O", "0-0-0"):
+            dst = self.king_square(self.turn) + (2 if len(san) == 3 else -2)
+            for move in self.legal_moves():
+                if (move >> 12) & 3 == MOVE_CASTLING and (move >> 6) & 63 == dst:
+                    return move
+            raise ValueError(f"Roque illégal dans cette position : {text}")
+        try:
+            promotion = 0
+            if "=" in san:
+                san, letter = san.split("=")
+                promotion = SAN_PIECES.index(letter)
+            elif san[-1] in "NBRQ" and san[-2] in "18":
+                san, promotion = san[:-1], SAN_PIECES.index(san[-1])
+            if san[0] in SAN_PIECES:
+                piece_type, san = SAN_PIECES.index(san[0]), san[1:]
+            else:
+                piece_type = PAWN
+            san = san.replace("x", "").replace("-", "")
+            dst = parse_square(san[-2:])
+            from_file = from_rank = -1
+            for char in san[:-2]:
+                if char in FILE_NAMES:
+                    from_file = FILE_NAMES.index(char)
+                else:
+                    from_rank = RANK_NAMES.index(char)
+        except (ValueError, IndexError):
+            raise ValueError(f"Coup SAN invalide : {text!r}")
+        piece = self.turn * 6 + piece_type
+        src = self._san_source(piece_type, dst, from_file, from_rank) if not promotion else -1
+        if src >= 0:
+            return src | (dst << 6)
+        found = None
+        for move in self.legal_moves():
+            src = move & 63
+            if ((move >> 6) & 63 != dst or self.squares[src] != piece or move >> 14 != promotion
+                    or from_file not in (-1, src & 7) or from_rank not in (-1, src >> 3)):
+                continue
+            if found is not None:
+                raise ValueError(f"Coup SAN ambigu : {text}")
+            found = move
+        if found is None:
+            raise ValueError(f"Coup illégal dans cette position : {text}")
+        return found
+
+    def _san_source(self, piece_type, dst, from_file, from_rank):
+        """
+        Chemin rapide de parse_san pour les coups simples (ni roque, ni promotion, ni prise en
+        passant) : la case de départ se lit dans les tables d'attaques, et hors échec seul un
+        clouage peut rendre le coup illégal.
+        :return: Case de départ, ou -1 s'il faut passer par la liste des coups légaux.
+        """
+        us = self.turn
+        piece = us * 6 + piece_type
+        dst_bb = BB_SQUARES[dst]
+        if self.occupied_by[us] & dst_bb or piece_type == KING:
+            return -1
+        if piece_type == PAWN:
+            step = 8 if us == WHITE else -8
+            if from_file < 0:
+                if self.occupied & dst_bb:
+                    return -1
+                src = dst - step
+                if self.squares[src] == EMPTY and dst >> 3 == (3 if us == WHITE else 4):
+                    src -= step
+            elif abs(from_file - (dst & 7)) == 1 and self.occupied_by[us ^ 1] & dst_bb:
+                src = dst - step + from_file - (dst & 7)
+            else:
+                return -1
+            if not 0 <= src < 64 or self.squares[src] != piece:
+                return -1
+            sources = BB_SQUARES[src]
+        else:
+            if piece_type == KNIGHT:
+                sources = KNIGHT_ATTACKS[dst]
+            else:
+                sources = (bishop_attacks, rook_attacks, queen_attacks)[piece_type - BISHOP](dst, self.occupied)
+            sources &= self.pieces[piece]
+            if from_file >= 0:
+                sources &= BB_FILE_A << from_file
+            if from_rank >= 0:
+                sources &= BB_RANK_1 << (8 * from_rank)
+            if not sources or sources & (sources - 1):
+                return -1
+            src = sources.bit_length() - 1
+        king = self.king_square(us)
+        if king < 0 or self.attackers_to(king, us ^ 1):
+            return -1
+        if self.pinned_pieces(us) & sources and not LINE[king][src] & dst_bb:
+            return -1
+        return src
+
+    def make_move(self, move):
+        """
+        Joue un coup encodé (supposé légal) en O(1) : met à jour les bitboards, le trait,
+        les roques, la case en passant, les compteurs et la clé de Zobrist.
+        L'état nécessaire à unmake_move() est empilé dans self.history.
+        """
+        src, dst, flag = move & 63, (move >> 6) & 63, (move >> 12) & 3
+        us = self.turn
+        them = us ^ 1
+        pieces, squares, occupied_by = self.pieces, self.squares, self.occupied_by
+        piece = squares[src]
+        ep = self.ep_square
+        key = self.key
+
+        if flag == MOVE_EN_PASSANT:
+            capture_sq = dst - 8 if us == WHITE else dst + 8
+        else:
+            capture_sq = dst
+        captured = squares[capture_sq]
+        self.history.append((move, captured, self.castling, ep, self.halfmove_clock, key))
+
+        if ep >= 0 and PAWN_ATTACKS[them][ep] & pieces[us * 6 + PAWN]:
+            key ^= ZOBRIST_EP[ep & 7]
+        if captured != EMPTY:
+            bb = BB_SQUARES[capture_sq]
+            pieces[captured] ^= bb
+            occupied_by[them] ^= bb
+            squares[capture_sq] = EMPTY
+            key ^= ZOBRIST_PIECES[captured][capture_sq]
+
+        src_bb, dst_bb = BB_SQUARES[src], BB_SQUARES[dst]
+        placed = us * 6 + (move >> 14) if flag == MOVE_PROMOTION else piece
+        pieces[piece] ^= src_bb
+        pieces[placed] |= dst_bb
+        occupied_by[us] ^= src_bb | dst_bb
+        squares[src] = EMPTY
+        squares[dst] = placed
+        key ^= ZOBRIST_PIECES[piece][src] ^ ZOBRIST_PIECES[placed][dst]
+
+        if flag == MOVE_CASTLING:
+            rook_from, rook_to = CASTLING_ROOK[dst]
+            rook = us * 6 + ROOK
+            bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            pieces[rook] ^= bb
+            occupied_by[us] ^= bb
+            squares[rook_from] = EMPTY
+            squares[rook_to] = rook
+            key ^= ZOBRIST_PIECES[rook][rook_from] ^ ZOBRIST_PIECES[rook][rook_to]
+        self.occupied = occupied_by[0] | occupied_by[1]
+
+        castling = self.castling & CASTLING_MASK[src] & CASTLING_MASK[dst]
+        if castling != self.castling:
+            key ^= ZOBRIST_CASTLING[self.castling] ^ ZOBRIST_CASTLING[castling]
+            self.castling = castling
+
+        self.ep_square = -1
+        if piece % 6 == PAWN:
+            self.halfmove_clock = 0
+            if dst - src == 16 or src - dst == 16:
+                ep = (src + dst) >> 1
+                self.ep_square = ep
+                if PAWN_ATTACKS[us][ep] & pieces[them * 6 + PAWN]:
+                    key ^= ZOBRIST_EP[ep & 7]
+        elif captured != EMPTY:
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if us == BLACK:
+            self.fullmove_number += 1
+        self.turn = them
+        self.key = key ^ ZOBRIST_TURN
+
+    def unmake_move(self):
+        """Annule le dernier coup joué par make_move() et retourne ce coup."""
+        move, captured, castling, ep, halfmove_clock, key = self.history.pop()
+        src, dst, flag = move & 63, (move >> 6) & 63, (move >> 12) & 3
+        them = self.turn
+        us = them ^ 1
+        pieces, squares, occupied_by = self.pieces, self.squares, self.occupied_by
+
+        placed = squares[dst]
+        piece = us * 6 + PAWN if flag == MOVE_PROMOTION else placed
+        src_bb, dst_bb = BB_SQUARES[src], BB_SQUARES[dst]
+        pieces[placed] ^= dst_bb
+        pieces[piece] |= src_bb
+        occupied_by[us] ^= src_bb | dst_bb
+        squares[dst] = EMPTY
+        squares[src] = piece
+
+        if flag == MOVE_CASTLING:
+            rook_from, rook_to = CASTLING_ROOK[dst]
+            rook = us * 6 + ROOK
+            bb = BB_SQUARES[rook_from] | BB_SQUARES[rook_to]
+            pieces[rook] ^= bb
+            occupied_by[us] ^= bb
+            squares[rook_to] = EMPTY
+            squares[rook_from] = rook
+        if captured != EMPTY:
+            if flag == MOVE_EN_PASSANT:
+                capture_sq = dst - 8 if us == WHITE else dst + 8
+            else:
+                capture_sq = dst
+            bb = BB_SQUARES[capture_sq]
+            pieces[captured] |= bb
+            occupied_by[them] |= bb
+            squares[capture_sq] = captured
+        self.occupied = occupied_by[0] | occupied_by[1]
+
+        self.castling = castling
+        self.ep_square = ep
+        self.halfmove_clock = halfmove_clock
+        if us == BLACK:
+            self.fullmove_number -= 1
+        self.turn = us
+        self.key = key
+        return move
+
+    # --- Perft (comptage des feuilles de l'arbre des coups légaux) ---
+
+    def perft(self, depth):
+        """
+        Nombre de positions atteignables en exactement `depth` demi-coups.
+        Sert à valider le générateur contre les valeurs de référence connues.
+        """
+        moves = self.legal_moves()
+        if depth <= 1:
+            return len(moves) if depth == 1 else 1
+        nodes = 0
+        for move in moves:
+            self.make_move(move)
+            nodes += self.perft(depth - 1)
+            self.unmake_move()
+        return nodes
+
+    def perft_divide(self, depth):
+        """Perft détaillé par coup racine : dictionnaire {coup UCI: nombre de feuilles}."""
+        result = {}
+        for move in self.legal_moves():
+            self.make_move(move)
+            result[move_to_uci(move)] = self.perft(depth - 1)
+            self.unmake_move()
+        return result
@@ -0,0 +1,82 @@
+"""
+Images des pièces pré-calculées pour chaque taille de case.
+
+Chaque pièce est rendue une seule fois par taille (depuis un fichier images/pieces/<pièce>.png
+s'il existe, sinon depuis le glyphe unicode dessiné avec PIL), puis gardée dans un cache LRU
+de PhotoImage. Redessiner ou retourner l'échiquier réutilise les mêmes images ; seul un
+changement de taille de case provoque un nouveau rendu.
+"""
+import os
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+
+PIECES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "images", "pieces")
+
+# Polices contenant les symboles d'échecs, par ordre de préférence (Windows, Linux, macOS)
+GLYPH_FONTS = ("seguisym.ttf", "DejaVuSans.ttf", "NotoSansSymbols2-Regular.ttf",
+               "/System/Library/Fonts/Apple Symbols.ttf", "arialuni.ttf")
+GLYPH_SCALE = 0.8  # Hauteur du glyphe par rapport à la case
+
+
+def _load_font(size):
+    """Première police disponible de GLYPH_FONTS, sinon la police par défaut de PIL."""
+    for name in GLYPH_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def render_sprite(piece, size, symbols, image_dir=PIECES_DIR):
+    """
+    Rend l'image d'une pièce pour une case de `size` pixels.
+    :param piece: Identifiant ("wp", "bk"...).
+    :param symbols: Glyphes unicode par pièce (PIECE_SYMBOLS), utilisés sans fichier image.
+    :return: Image PIL RGBA de size × size pixels, fond transparent.
+    """
+    path = os.path.join(image_dir, f"{piece}.png")
+    if os.path.exists(path):
+        with Image.open(path) as source:
+            return source.convert("RGBA").resize((size, size), Image.LANCZOS)
+    sprite = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite)
+    draw.text((size / 2, size / 2), symbols[piece], font=_load_font(max(1, int(size * GLYPH_SCALE))),
+              fill="black", anchor="mm")
+    return sprite
+
+
+class SpriteCache:
+    """
+    Cache LRU de PhotoImage indexé par (pièce, taille de case).
+    Les images sont gardées ici : Tk efface une image dès que Python n'y fait plus référence.
+    :param symbols: Glyphes unicode par pièce (PIECE_SYMBOLS).
+    :param max_entries: Nombre maximal d'images conservées (12 pièces par taille).
+    """
+
+    def __init__(self, symbols, max_entries=48, image_dir=PIECES_DIR):
+        self.symbols = symbols
+        self.max_entries = max_entries
+        self.image_dir = image_dir
+        self.images = OrderedDict()
+        self.renders = 0
+
+    def get(self, piece, size):
+        """PhotoImage de la pièce pour une case de `size` pixels (rendue au premier appel)."""
+        key = (piece, size)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            return image
+        image = ImageTk.PhotoImage(render_sprite(piece, size, self.symbols, self.image_dir))
+        self.renders += 1
+        self.images[key] = image
+        if len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+        return image
+
+    def invalidate(self, keep_size=None):
+        """Oublie les images des autres tailles que keep_size (toutes si None) après un redimensionnement."""
+        for key in [key for key in self.images if key[1] != keep_size]:
+            del self.images[key]
@@ -0,0 +1,153 @@
+"""
+Table de transposition à taille fixe, indexée par la clé de Zobrist de la position.
+
+Chaque seau contient deux entrées : la première est réservée à la recherche la plus
+profonde (« depth-preferred »), la seconde est remplacée à chaque écriture
+(« always-replace »). Une entrée occupe 16 octets : la clé XOR les données, puis les
+données compactées dans un entier 64 bits (coup, score, profondeur, borne, génération).
+Stocker la clé XOR les données permet de détecter une entrée écrite à moitié quand la
+mémoire est partagée entre plusieurs processus.
+"""
+from array import array
+
+BOUND_NONE, BOUND_UPPER, BOUND_LOWER, BOUND_EXACT = range(4)
+
+ENTRY_BYTES = 16
+_SCORE_OFFSET = 1 << 21           # Scores signés stockés sur 22 bits
+_MOVE_MASK = (1 << 20) - 1
+
+
+def _pack(move, score, depth, bound, generation):
+    """Compacte une entrée dans un entier 64 bits."""
+    return (move & _MOVE_MASK
+            | (score + _SCORE_OFFSET) << 20
+            | min(max(depth, 0), 255) << 42
+            | bound << 50
+            | (generation & 0xFF) << 52)
+
+
+class TranspositionTable:
+    """
+    Table de transposition bornée en mémoire.
+    :param size_mb: Mémoire allouée en mégaoctets (arrondie à une puissance de deux de seaux).
+    :param buffer: Zone mémoire optionnelle (ex : multiprocessing.shared_memory) à utiliser
+                   à la place de tableaux privés ; sa taille fixe alors celle de la table.
+    """
+
+    def __init__(self, size_mb=16, buffer=None):
+        if buffer is not None:
+            raw = memoryview(buffer).cast("B")
+            words = raw.cast("Q")
+            buckets = 1 << max(0, (len(words) // 4).bit_length() - 1)
+            self.keys = words[:buckets * 2]
+            self.data = words[buckets * 2:buckets * 4]
+            self._views = [raw, words]  # Libérées par close() avant de fermer la zone partagée
+        else:
+            entries = max(2, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+            buckets = 1 << max(0, (entries // 2).bit_length() - 1)
+            self.keys = array("Q", bytes(buckets * 2 * 8))
+            self.data = array("Q", bytes(buckets * 2 * 8))
+            self._views = []
+        self.mask = buckets - 1
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    @staticmethod
+    def buffer_size(size_mb):
+        """Taille en octets d'une zone partagée pour une table de size_mb mégaoctets."""
+        entries = max(2, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        buckets = 1 << max(0, (entries // 2).bit_length() - 1)
+        return buckets * 2 * ENTRY_BYTES
+
+    @property
+    def size(self):
+        """Nombre d'entrées de la table."""
+        return (self.mask + 1) * 2
+
+    def clear(self):
+        """Vide la table et remet les compteurs à zéro."""
+        if self._views:
+            raw = self._views[0]
+            raw[:] = bytes(len(raw))
+        else:
+            self.keys = array("Q", bytes(self.size * 8))
+            self.data = array("Q", bytes(self.size * 8))
+        self.generation = 0
+        self.reset_stats()
+
+    def close(self):
+        """Libère les vues sur une zone partagée (nécessaire avant SharedMemory.close())."""
+        for view in [self.keys, self.data] + self._views[::-1]:
+            if isinstance(view, memoryview):
+                view.release()
+        self._views = []
+
+    def reset_stats(self):
+        """Remet à zéro les compteurs de succès, d'échecs et de collisions."""
+        self.hits = self.misses = self.collisions = 0
+
+    def new_search(self):
+        """Change de génération : les entrées des recherches précédentes deviennent remplaçables."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        """
+        Cherche une position dans la table.
+        :param key: Clé de Zobrist.
+        :return: (coup, score, profondeur, borne) ou None si la position est absente.
+        """
+        index = (key & self.mask) << 1
+        keys, data = self.keys, self.data
+        for slot in (index, index + 1):
+            value = data[slot]
+            if value and keys[slot] ^ value == key:
+                self.hits += 1
+                return (value & _MOVE_MASK,
+                        ((value >> 20) & 0x3FFFFF) - _SCORE_OFFSET,
+                        (value >> 42) & 0xFF,
+                        (value >> 50) & 3)
+        if data[index] or data[index + 1]:
+            self.collisions += 1
+        else:
+            self.misses += 1
+        return None
+
+    def store(self, key, depth, score, bound, move=0):
+        """
+        Enregistre le résultat d'une recherche.
+        L'entrée prioritaire n'est remplacée que par une recherche au moins aussi profonde,
+        par la même position ou si elle date d'une recherche précédente ; sinon l'écriture
+        va dans l'entrée « toujours remplacée ».
+        """
+        index = (key & self.mask) << 1
+        keys, data = self.keys, self.data
+        old = data[index]
+        same = old and keys[index] ^ old == key
+        if same and not move:
+            move = old & _MOVE_MASK  # Conserve le meilleur coup connu
+        if (not old or same or depth >= (old >> 42) & 0xFF
+                or (old >> 52) & 0xFF != self.generation):
+            slot = index
+        else:
+            slot = index + 1
+            old = data[slot]
+            if not move and old and keys[slot] ^ old == key:
+                move = old & _MOVE_MASK
+        value = _pack(move, score, depth, bound, self.generation)
+        data[slot] = value
+        keys[slot] = key ^ value
+
+    def hashfull(self):
+        """Taux de remplissage en pour mille, estimé sur les 1000 premières entrées (comme UCI)."""
+        sample = min(1000, self.size)
+        used = sum(1 for index in range(sample)
+                   if self.data[index] and (self.data[index] >> 52) & 0xFF == self.generation)
+        return used * 1000 // sample
+
+    def stats(self):
+        """Compteurs d'accès : succès, échecs, collisions et taux de succès."""
+        probes = self.hits + self.misses + self.collisions
+        return {"hits": self.hits, "misses": self.misses, "collisions": self.collisions,
+                "hit_rate": self.hits / probes if probes else 0.0, "hashfull": self.hashfull()}
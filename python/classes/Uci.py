@@ -0,0 +1,252 @@
+"""
+Protocole UCI : le moteur piloté sans interface Tk, par une interface graphique d'échecs
+ou un gestionnaire de tournois.
+
+Les commandes sont lues ligne par ligne sur l'entrée standard. La recherche tourne dans un
+thread : pendant qu'elle calcule, « stop », « isready » et « quit » restent traités
+immédiatement, et chaque itération terminée est publiée par une ligne « info ».
+
+Commandes reconnues : uci, isready, ucinewgame, setoption (Hash, Threads), position,
+go (depth, nodes, movetime, wtime, btime, winc, binc, movestogo, infinite), stop, quit.
+
+Exemple :
+    python chess_engine_cli.py uci
+"""
+import os
+import sys
+import threading
+
+from classes.Engine import MATE, MAX_PLY, Engine
+from classes.ParallelSearch import ParallelSearch
+from classes.Position import START_FEN, Position, move_to_uci
+
+ENGINE_NAME = "kChess 2025"
+ENGINE_AUTHOR = "kChess2025"
+DEFAULT_HASH = 16
+MAX_HASH = 4096
+MOVE_OVERHEAD = 0.1    # Marge (secondes) : dépassement du dernier contrôle du budget et communication
+DEFAULT_MOVES_TO_GO = 30
+
+
+def format_score(score):
+    """Score du moteur -> « cp N » ou « mate N » (en coups, négatif si le moteur est maté)."""
+    if abs(score) >= MATE - MAX_PLY:
+        plies = MATE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+def time_budget(time_left, increment=0, moves_to_go=None):
+    """
+    Temps à consacrer au coup d'après la pendule (en secondes).
+    :param time_left: Temps restant du camp au trait.
+    :param increment: Incrément par coup.
+    :param moves_to_go: Coups avant le prochain contrôle (par défaut, DEFAULT_MOVES_TO_GO).
+    """
+    budget = time_left / (moves_to_go or DEFAULT_MOVES_TO_GO) + increment * 0.75
+    budget = min(budget, time_left * 0.5) - MOVE_OVERHEAD
+    return max(0.01, budget)
+
+
+class UciEngine:
+    """
+    État d'une session UCI : position courante, options et recherche en cours.
+    :param output: Flux où écrire les réponses (sortie standard par défaut).
+    """
+
+    def __init__(self, output=None):
+        self.output = output or sys.stdout
+        self.hash_mb = DEFAULT_HASH
+        self.threads = 1
+        self.position = Position.from_fen()   # None après une commande « position » invalide
+        self.engine = Engine(hash_mb=self.hash_mb)
+        self.parallel = None          # ParallelSearch, créée au « go » suivant si Threads > 1
+        self.stop_event = threading.Event()
+        self.search_thread = None
+        self.infinite = False
+        self._output_lock = threading.Lock()
+
+    def send(self, line):
+        """Écrit une ligne de réponse (depuis le thread principal ou celui de la recherche)."""
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, source=None):
+        """Traite les commandes de `source` (entrée standard par défaut) jusqu'à « quit »."""
+        for line in source or sys.stdin:
+            if not self.handle(line):
+                break
+        self.quit()
+
+    def handle(self, line):
+        """
+        Exécute une commande.
+        :return: False pour « quit », True sinon.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {DEFAULT_HASH} min 1 max {MAX_HASH}")
+            self.send(f"option name Threads type spin default 1 min 1 max {os.cpu_count() or 1}")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.wait()
+            self.engine.reset()
+            if self.parallel is not None:
+                self.parallel.clear_hash()
+            self.position = Position.from_fen()
+        elif command == "setoption":
+            self.set_option(args)
+        elif command == "position":
+            self.set_position(args)
+        elif command == "go":
+            self.go(args)
+        elif command == "stop":
+            self.wait(stop=True)
+        elif command == "quit":
+            return False
+        elif command != "ponderhit":
+            self.send(f"info string commande inconnue : {command}")
+        return True
+
+    def set_option(self, args):
+        """setoption name <nom> value <valeur> (Hash en Mo, Threads en processus)."""
+        if "name" not in args:
+            return
+        value_at = args.index("value") if "value" in args else len(args)
+        name = " ".join(args[args.index("name") + 1:value_at]).lower()
+        value = " ".join(args[value_at + 1:])
+        try:
+            number = int(value)
+        except ValueError:
+            self.send(f"info string valeur invalide : {value!r}")
+            return
+        self.wait()
+        if name == "hash":
+            self.hash_mb = min(max(1, number), MAX_HASH)
+            self.engine.resize_hash(self.hash_mb)
+            self._close_parallel()
+        elif name == "threads":
+            self.threads = max(1, number)
+            self._close_parallel()
+        else:
+            self.send(f"info string option inconnue : {name}")
+
+    def set_position(self, args):
+        """position startpos | fen <FEN> [moves <coups UCI>...]"""
+        moves_at = args.index("moves") if "moves" in args else len(args)
+        try:
+            if args and args[0] == "fen":
+                position = Position.from_fen(" ".join(args[1:moves_at]), strict=False)
+            else:
+                position = Position.from_fen(START_FEN)
+            for text in args[moves_at + 1:]:
+                position.make_move(position.parse_uci(text))
+        except ValueError as e:   # FenError dérive de ValueError
+            # Pas de retour silencieux à l'ancienne position : le « go » suivant est refusé
+            position = None
+            self.send(f"info string position invalide : {e}")
+        self.wait()
+        self.position = position
+
+    def go(self, args):
+        """Lance la recherche dans un thread ; « bestmove » est envoyé quand elle se termine."""
+        self.wait()
+        if self.position is None:
+            self.send("info string aucune position valide : envoyer « position » avant « go »")
+            self.send("bestmove 0000")
+            return
+        limits = {}
+        for name, value in zip(args, args[1:]):
+            if name in ("depth", "nodes", "movetime", "wtime", "btime", "winc", "binc", "movestogo"):
+                try:
+                    limits[name] = int(value)
+                except ValueError:
+                    pass
+        infinite = self.infinite = "infinite" in args
+        depth = limits.get("depth")
+        nodes = limits.get("nodes")
+        movetime = limits["movetime"] / 1000 if "movetime" in limits else None
+        clock = "wtime" if self.position.turn == 0 else "btime"
+        if movetime is None and clock in limits:
+            increment = limits.get("winc" if clock == "wtime" else "binc", 0)
+            movetime = time_budget(limits[clock] / 1000, increment / 1000, limits.get("movestogo"))
+        if infinite or not (depth or nodes or movetime):
+            depth = depth or MAX_PLY - 1   # Jusqu'à « stop »
+
+        if self.threads > 1 and self.parallel is None:
+            # Créée ici, pas dans le thread de recherche : un processus lancé pendant que le
+            # thread principal attend sur l'entrée standard resterait bloqué en la fermant
+            self.parallel = ParallelSearch(threads=self.threads, hash_mb=self.hash_mb)
+        self.stop_event.clear()
+        self.search_thread = threading.Thread(
+            target=self._search, args=(self.position.copy(), depth, movetime, nodes, infinite), daemon=True)
+        self.search_thread.start()
+
+    def _search(self, position, depth, movetime, nodes, infinite):
+        """Corps du thread de recherche : lignes « info » puis « bestmove »."""
+        try:
+            if self.parallel is not None:
+                result = self.parallel.search(position, depth=depth, movetime=movetime, nodes=nodes,
+                                              on_info=self._info, stop_event=self.stop_event)
+            else:
+                result = self.engine.search(position, depth=depth, movetime=movetime, nodes=nodes,
+                                            on_info=self._info, stop_event=self.stop_event)
+        except Exception as e:
+            self.send(f"info string erreur de recherche : {type(e).__name__}: {e}")
+            result = {"move": None, "pv": []}
+        if infinite:
+            self.stop_event.wait()   # En mode infini, « bestmove » n'est envoyé qu'après « stop »
+        if result["move"] is None:
+            self.send("bestmove 0000")
+        else:
+            best = move_to_uci(result["move"])
+            pv = result.get("pv") or []
+            if len(pv) > 1 and pv[0] == best:
+                self.send(f"bestmove {best} ponder {pv[1]}")
+            else:
+                self.send(f"bestmove {best}")
+
+    def _info(self, info):
+        """Publie le rapport d'une itération terminée."""
+        self.send(f"info depth {info['depth']} score {format_score(info['score'])} nodes {info['nodes']} "
+                  f"nps {info['nps']} time {int(info['time'] * 1000)} pv {' '.join(info['pv'])}".rstrip())
+
+    def wait(self, stop=False):
+        """
+        Attend la fin de la recherche en cours (et son « bestmove »).
+        :param stop: Interrompt la recherche au lieu de la laisser atteindre ses limites
+                     (toujours le cas pour « go infinite »).
+        """
+        if self.search_thread is not None:
+            if stop or self.infinite:
+                self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+    def _close_parallel(self):
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+    def quit(self):
+        """Fin de session : arrête la recherche et libère les processus auxiliaires."""
+        self.wait(stop=True)
+        self._close_parallel()
+
+
+def main():
+    UciEngine().run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())